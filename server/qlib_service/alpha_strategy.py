@@ -1,22 +1,64 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Tuple
 import numpy as np
 import pandas as pd
 from qlib.model.base import BaseModel
 from qlib.data.dataset import DatasetH
 from qlib.data.dataset.handler import DataHandlerLP
+from qlib.data import D
 from qlib.workflow import R
 from qlib.workflow.record_temp import SignalRecord
 import torch
 import torch.nn as nn
+from .rolling import rolling_mean, rolling_std, rolling_sum, rolling_corr, pct_change
 
 class AlphaStrategy:
     def __init__(self):
         self.model = None
         self.data_handler = None
+        # Every factor declares its group and how many trailing bars it reads
+        # (a window over returns needs one extra price), so latest-value
+        # evaluation touches only those bars and the fetch can be bounded
+        self.factors: Dict[str, Tuple[str, int, Callable[[Dict[str, pd.DataFrame]], pd.DataFrame]]] = {
+            'momentum_1m': ('momentum', 21, lambda p: self._momentum(p, 20)),
+            'momentum_3m': ('momentum', 61, lambda p: self._momentum(p, 60)),
+            'momentum_6m': ('momentum', 121, lambda p: self._momentum(p, 120)),
+            'momentum_12m': ('momentum', 241, lambda p: self._momentum(p, 240)),
+            'volatility_1m': ('volatility', 21, lambda p: self._volatility(p, 20)),
+            'volatility_3m': ('volatility', 61, lambda p: self._volatility(p, 60)),
+            'parkinson_volatility': ('volatility', 20, self._parkinson_volatility),
+            'price_to_volume': ('value', 20, self._price_to_volume),
+            'turnover_ratio': ('value', 20, self._turnover_ratio),
+            'sharpe_ratio': ('quality', 241, self._sharpe_ratio),
+            'sortino_ratio': ('quality', 241, self._sortino_ratio),
+            'volume_trend': ('market_sentiment', 21, lambda p: self._trend_direction(p['$volume'])),
+            'price_trend': ('market_sentiment', 21, lambda p: self._trend_direction(p['$close'])),
+            'volume_price_correlation': ('market_sentiment', 240, self._volume_price_correlation)
+        }
+
+    @property
+    def max_lookback(self) -> int:
+        """Bars of history needed to evaluate every registered factor"""
+        return max(lookback for _, lookback, _ in self.factors.values())
         
-    async def generate_alpha_signals(self, instruments: List[str], start_time: str, end_time: str) -> Dict[str, Any]:
-        """Generate alpha signals for given instruments"""
+    async def generate_alpha_signals(self,
+                                     instruments: List[str],
+                                     start_time: str,
+                                     end_time: str,
+                                     mode: str = 'latest') -> Dict[str, Any]:
+        """Generate alpha signals for given instruments
+
+        In ``'latest'`` mode only the last ``max_lookback`` bars up to
+        ``end_time`` are fetched and each factor is evaluated on its own
+        lookback, giving one value per instrument. ``'series'`` mode
+        evaluates every factor over the full requested range.
+        """
         try:
+            if mode == 'latest':
+                calendar = D.calendar(end_time=end_time, freq='day')[-self.max_lookback:]
+                start_time = max(pd.Timestamp(start_time), pd.Timestamp(calendar[0]))
+            elif mode != 'series':
+                raise ValueError(f"Unknown mode {mode}")
+
             data = R.get_data(
                 instruments=instruments,
                 start_time=start_time,
@@ -26,17 +68,25 @@ class AlphaStrategy:
                        '$vwap', '$turn']
             )
             
-            # Calculate technical indicators
-            signals = {}
-            for instrument in instruments:
-                instrument_data = data.loc[(slice(None), instrument), :]
-                signals[instrument] = {
-                    'momentum': self._calculate_momentum(instrument_data),
-                    'volatility': self._calculate_volatility(instrument_data),
-                    'value': self._calculate_value_factors(instrument_data),
-                    'quality': self._calculate_quality_factors(instrument_data),
-                    'market_sentiment': self._analyze_market_sentiment(instrument_data)
+            # Evaluate every factor for the whole universe at once on
+            # [time, instrument] panels instead of slicing per instrument
+            panel = self._to_panel(data, instruments)
+            factors = {}
+            for name, (group, lookback, compute) in self.factors.items():
+                if mode == 'latest':
+                    tail = {field: frame.iloc[-lookback:] for field, frame in panel.items()}
+                    values = compute(tail).iloc[-1].to_dict()
+                else:
+                    values = {instrument: series for instrument, series in compute(panel).items()}
+                factors.setdefault(group, {})[name] = values
+
+            signals = {
+                instrument: {
+                    group: {name: values[instrument] for name, values in group_factors.items()}
+                    for group, group_factors in factors.items()
                 }
+                for instrument in instruments
+            }
             
             return {
                 'status': 'success',
@@ -49,49 +99,53 @@ class AlphaStrategy:
                 'message': str(e)
             }
             
-    def _calculate_momentum(self, data: pd.DataFrame) -> Dict[str, float]:
-        """Calculate momentum factors"""
-        returns = data['$close'].pct_change()
-        return {
-            'momentum_1m': returns.rolling(20).mean().iloc[-1],
-            'momentum_3m': returns.rolling(60).mean().iloc[-1],
-            'momentum_6m': returns.rolling(120).mean().iloc[-1],
-            'momentum_12m': returns.rolling(240).mean().iloc[-1]
-        }
-        
-    def _calculate_volatility(self, data: pd.DataFrame) -> Dict[str, float]:
-        """Calculate volatility metrics"""
-        returns = data['$close'].pct_change()
-        return {
-            'volatility_1m': returns.rolling(20).std().iloc[-1],
-            'volatility_3m': returns.rolling(60).std().iloc[-1],
-            'parkinson_volatility': np.sqrt(
-                (np.log(data['$high'] / data['$low']) ** 2).rolling(20).mean() / (4 * np.log(2))
-            ).iloc[-1]
-        }
-        
-    def _calculate_value_factors(self, data: pd.DataFrame) -> Dict[str, float]:
-        """Calculate value-based factors"""
-        return {
-            'price_to_volume': (data['$close'] / data['$volume'].rolling(20).mean()).iloc[-1],
-            'turnover_ratio': data['$turn'].rolling(20).mean().iloc[-1]
-        }
-        
-    def _calculate_quality_factors(self, data: pd.DataFrame) -> Dict[str, float]:
-        """Calculate quality factors"""
-        returns = data['$close'].pct_change()
+    def _to_panel(self, data: pd.DataFrame, instruments: List[str]) -> Dict[str, pd.DataFrame]:
+        """Pivot (datetime, instrument) rows into one [time, instrument] frame per field"""
         return {
-            'sharpe_ratio': (returns.mean() / returns.std()) * np.sqrt(252),
-            'sortino_ratio': (returns.mean() / returns[returns < 0].std()) * np.sqrt(252)
-        }
-        
-    def _analyze_market_sentiment(self, data: pd.DataFrame) -> Dict[str, Any]:
-        """Analyze market sentiment using price action and volume"""
-        volume_ma = data['$volume'].rolling(20).mean()
-        price_ma = data['$close'].rolling(20).mean()
-        
-        return {
-            'volume_trend': 'bullish' if volume_ma.iloc[-1] > volume_ma.iloc[-2] else 'bearish',
-            'price_trend': 'bullish' if price_ma.iloc[-1] > price_ma.iloc[-2] else 'bearish',
-            'volume_price_correlation': data['$volume'].corr(data['$close'])
+            field: data[field].unstack(level=1).reindex(columns=instruments)
+            for field in data.columns
         }
+
+    def _momentum(self, panel: Dict[str, pd.DataFrame], window: int) -> pd.DataFrame:
+        """Mean return over the window"""
+        return rolling_mean(pct_change(panel['$close']), window)
+
+    def _volatility(self, panel: Dict[str, pd.DataFrame], window: int) -> pd.DataFrame:
+        """Return volatility over the window"""
+        return rolling_std(pct_change(panel['$close']), window)
+
+    def _parkinson_volatility(self, panel: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """High-low range volatility estimator"""
+        parkinson = np.log(panel['$high'] / panel['$low']) ** 2
+        return np.sqrt(rolling_mean(parkinson, 20) / (4 * np.log(2)))
+
+    def _price_to_volume(self, panel: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """Price relative to average volume"""
+        return panel['$close'] / rolling_mean(panel['$volume'], 20)
+
+    def _turnover_ratio(self, panel: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """Average turnover"""
+        return rolling_mean(panel['$turn'], 20)
+
+    def _sharpe_ratio(self, panel: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """Annualized Sharpe ratio over the trailing 240 bars"""
+        returns = pct_change(panel['$close'])
+        return rolling_mean(returns, 240) / rolling_std(returns, 240) * np.sqrt(252)
+
+    def _sortino_ratio(self, panel: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """Annualized Sortino ratio over the trailing 240 bars"""
+        returns = pct_change(panel['$close'])
+        downside = returns.where(returns < 0, 0.0)
+        count = rolling_sum((returns < 0).astype(float), 240)
+        total = rolling_sum(downside, 240)
+        downside_std = np.sqrt((rolling_sum(downside ** 2, 240) - total ** 2 / count) / (count - 1))
+        return rolling_mean(returns, 240) / downside_std * np.sqrt(252)
+
+    def _volume_price_correlation(self, panel: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """Correlation of volume and price over the trailing 240 bars"""
+        return rolling_corr(panel['$volume'], panel['$close'], 240)
+
+    def _trend_direction(self, values: pd.DataFrame) -> pd.DataFrame:
+        """Label each bar by the direction of the 20-bar moving average"""
+        rising = rolling_mean(values, 20).diff() > 0
+        return pd.DataFrame(np.where(rising, 'bullish', 'bearish'), index=values.index, columns=values.columns)
@@ -0,0 +1,153 @@
+import time
+from typing import List, Dict, Any
+import numpy as np
+import pandas as pd
+
+BACKTEST_DEFAULTS = {
+    "account": 100000.0,
+    "open_cost": 0.0005,
+    "close_cost": 0.0015,
+    "min_cost": 5.0,
+    "limit_threshold": 0.095,
+    "trade_unit": None,
+    "signal_lag": 1,
+    "rebalance": "on_change"
+}
+
+
+def strategy_signal(signals: Dict[str, Any], names: List[str] = None) -> np.ndarray:
+    """Average of signal arrays from AdvancedStrategyEngine.generate_alpha_signals
+
+    ``signals`` is the ``"signals"`` payload, grouped as
+    ``{"technical_signals": {"trend_signal": array, ...}, ...}``; ``names``
+    picks signals by name, defaulting to every signal in every group.
+    """
+    arrays = [
+        np.asarray(values, dtype=float).ravel()
+        for group in signals.values()
+        for name, values in group.items()
+        if names is None or name in names
+    ]
+    if not arrays:
+        raise ValueError("No matching signals")
+    return np.nanmean(np.vstack(arrays), axis=0)
+
+
+def signals_to_weights(signals: pd.DataFrame, long_only: bool = False) -> pd.DataFrame:
+    """Target weights proportional to the signal, scaled to unit gross exposure per bar"""
+    signals = signals.clip(lower=0) if long_only else signals
+    gross = signals.abs().sum(axis=1)
+    return signals.div(gross.where(gross > 0), axis=0).fillna(0.0)
+
+
+def run_backtest(close: pd.DataFrame, weights: pd.DataFrame, config: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Simulate trading a [time, instrument] panel of target weights at the close
+
+    Weights from bar ``t - signal_lag`` are traded at the close of bar ``t``.
+    Buys pay ``open_cost`` and sells ``close_cost`` of the traded value, at
+    least ``min_cost`` per order. Orders in an instrument whose return
+    reached ``limit_threshold`` (limit up for buys, limit down for sells) or
+    that has no price are not filled and are retried on the next bar.
+
+    Everything that does not depend on the portfolio state (returns, limit
+    and tradability masks, lagged targets, mark-to-market between trading
+    days) is computed on the whole panel at once. Only bars with orders to
+    work are stepped through one by one, since order sizes depend on the
+    compounded value and on which earlier orders were blocked. A panel
+    with no bars raises ``ValueError``.
+    """
+    started = time.perf_counter()
+    if not len(close.index):
+        raise ValueError("No bars to backtest")
+    config = {**BACKTEST_DEFAULTS, **(config or {})}
+    weights = weights.reindex(index=close.index, columns=close.columns)
+
+    prices = close.to_numpy(dtype=float)
+    marks = np.nan_to_num(close.ffill().to_numpy(dtype=float))
+    returns = close.pct_change(fill_method=None).to_numpy(dtype=float)
+    tradable = np.isfinite(prices) & (prices > 0)
+    can_buy = tradable & ~(returns >= config["limit_threshold"])
+    can_sell = tradable & ~(returns <= -config["limit_threshold"])
+
+    target = weights.shift(config["signal_lag"]).fillna(0.0).to_numpy(dtype=float)
+    if config["rebalance"] == "always":
+        orders = np.ones_like(target, dtype=bool)
+    elif config["rebalance"] == "on_change":
+        orders = np.vstack([np.ones((1, target.shape[1]), dtype=bool), np.diff(target, axis=0) != 0])
+    else:
+        raise ValueError(f"Unknown rebalance mode {config['rebalance']}")
+    order_days = orders.any(axis=1)
+
+    n_bars, n_instruments = prices.shape
+    nav = np.empty(n_bars)
+    turnover = np.zeros(n_bars)
+    costs = np.zeros(n_bars)
+    shares = np.zeros(n_instruments)
+    pending = np.zeros(n_instruments, dtype=bool)
+    cash = float(config["account"])
+    n_orders = n_blocked = 0
+
+    t = 0
+    while t < n_bars:
+        if not (order_days[t] or pending.any()):
+            # Nothing to trade until the next order day: mark the whole span at once
+            following = np.flatnonzero(order_days[t:])
+            end = t + following[0] if len(following) else n_bars
+            nav[t:end] = cash + marks[t:end] @ shares
+            t = end
+            continue
+
+        price = marks[t]
+        value = cash + price @ shares
+        working = orders[t] | pending
+        with np.errstate(divide="ignore", invalid="ignore"):
+            desired = np.where(working & (price > 0), target[t] * value / price, shares)
+        delta = desired - shares
+        if config["trade_unit"]:
+            delta = np.round(delta / config["trade_unit"]) * config["trade_unit"]
+        fillable = np.where(delta > 0, can_buy[t], can_sell[t])
+        # Orders for instruments that have not listed yet wait for a first price
+        unpriced = (price <= 0) & (target[t] != 0)
+        blocked = working & ~fillable & ((delta != 0) | unpriced)
+        delta = np.where(fillable, delta, 0.0)
+
+        traded = np.abs(delta) * price
+        fees = np.where(delta > 0, config["open_cost"], config["close_cost"]) * traded
+        fees = np.where(delta != 0, np.maximum(fees, config["min_cost"]), 0.0)
+
+        shares += delta
+        cash -= delta @ price + fees.sum()
+        pending = blocked
+        n_orders += int(np.count_nonzero(delta))
+        n_blocked += int(np.count_nonzero(blocked))
+
+        nav[t] = cash + price @ shares
+        turnover[t] = traded.sum() / value if value else 0.0
+        costs[t] = fees.sum()
+        t += 1
+
+    nav = pd.Series(nav, index=close.index, name="nav")
+    daily_returns = nav.pct_change().fillna(nav.iloc[0] / config["account"] - 1)
+    drawdown = nav / nav.cummax() - 1
+    years = n_bars / 252
+
+    return {
+        "nav": nav,
+        "returns": daily_returns,
+        "turnover": pd.Series(turnover, index=close.index, name="turnover"),
+        "costs": pd.Series(costs, index=close.index, name="costs"),
+        "positions": pd.Series(shares, index=close.columns, name="shares"),
+        "metrics": {
+            "total_return": float(nav.iloc[-1] / config["account"] - 1),
+            "annualized_return": float((nav.iloc[-1] / config["account"]) ** (1 / years) - 1) if years else 0.0,
+            "annualized_volatility": float(daily_returns.std() * np.sqrt(252)),
+            "sharpe_ratio": float(daily_returns.mean() / daily_returns.std() * np.sqrt(252))
+            if daily_returns.std() > 0 else 0.0,
+            "max_drawdown": float(drawdown.min()),
+            "total_costs": float(costs.sum()),
+            "average_turnover": float(turnover.mean()),
+            "orders": n_orders,
+            "blocked_orders": n_blocked
+        },
+        "elapsed": time.perf_counter() - started
+    }
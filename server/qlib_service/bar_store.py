@@ -0,0 +1,304 @@
+import os
+import shutil
+import tempfile
+import time
+from typing import List, Dict, Tuple, Iterable, Set
+from urllib.parse import quote, unquote
+import numpy as np
+import pandas as pd
+
+DATETIME_COLUMN = "_datetime"
+# Session dates (int64 nanoseconds at midnight) a partition is complete for
+SESSIONS_COLUMN = "_sessions"
+
+DAILY_FREQS = ("day", "1d", "1day")
+# Key of the single partition per instrument used for daily bars
+INSTRUMENT_PARTITION = "all"
+
+
+def _session_index(sessions: Iterable[pd.Timestamp]) -> pd.DatetimeIndex:
+    """Sessions as a nanosecond DatetimeIndex, converting only when needed"""
+    if not isinstance(sessions, pd.DatetimeIndex):
+        sessions = pd.DatetimeIndex(list(sessions))
+    return sessions if sessions.unit == "ns" else sessions.as_unit("ns")
+
+
+def _in_sorted(values: np.ndarray, sorted_values: np.ndarray) -> np.ndarray:
+    """``np.isin`` for a sorted second argument, by binary search"""
+    if not len(sorted_values):
+        return np.zeros(len(values), dtype=bool)
+    position = np.minimum(np.searchsorted(sorted_values, values), len(sorted_values) - 1)
+    return sorted_values[position] == values
+
+
+class ColumnarBarStore:
+    """Local columnar bar store partitioned by instrument
+
+    Layout: ``<root>/<freq>/<instrument>/<key>@<generation>@<fields>/<field>.npy``.
+    Intraday bars get one partition per session (``key`` is ``YYYYMMDD``);
+    daily bars get one partition per instrument (``key`` is ``all``), so a
+    decade of daily history is a handful of files rather than one
+    directory per day. Every partition holds an int64 nanosecond timestamp
+    column and the sessions it is complete for, which may have no rows
+    (halts). Columns are opened with ``mmap_mode="r"``.
+
+    The stored fields are part of the directory name, so one listing per
+    instrument tells which sessions and fields are on disk. Partitions are
+    written to a temporary directory and renamed into place under a new
+    generation; older generations of the same key are removed afterwards.
+    """
+
+    def __init__(self, root: str, freq: str = "1min"):
+        self.root = os.path.join(os.path.expanduser(root), freq)
+        self.freq = freq
+        self.per_instrument = freq in DAILY_FREQS
+        os.makedirs(self.root, exist_ok=True)
+
+    def _instrument_dir(self, instrument: str) -> str:
+        return os.path.join(self.root, quote(instrument, safe=""))
+
+    def _key(self, session: pd.Timestamp) -> str:
+        return INSTRUMENT_PARTITION if self.per_instrument else session.strftime("%Y%m%d")
+
+    @staticmethod
+    def _column_file(partition: str, field: str) -> str:
+        return os.path.join(partition, quote(field, safe="") + ".npy")
+
+    def _listing(self, instrument: str) -> Dict[str, Tuple[str, Set[str]]]:
+        """Newest partition directory and its fields for each key, from one listing"""
+        try:
+            names = os.listdir(self._instrument_dir(instrument))
+        except FileNotFoundError:
+            return {}
+        latest = {}
+        for name in names:
+            parts = name.split("@", 2)
+            if name.startswith(".") or len(parts) != 3:
+                continue
+            key, generation, fields = parts
+            if key not in latest or int(generation) > latest[key][0]:
+                latest[key] = (int(generation), name, {unquote(f) for f in fields.split(",") if f})
+        return {key: (name, fields) for key, (_, name, fields) in latest.items()}
+
+    def _coverage(self, partition: str, key: str) -> np.ndarray:
+        if not self.per_instrument:
+            return np.array([pd.Timestamp(key).value], dtype=np.int64)
+        return np.load(self._column_file(partition, SESSIONS_COLUMN), mmap_mode="r")
+
+    def stored_fields(self, instrument: str) -> Set[str]:
+        """Fields stored in any partition of an instrument"""
+        return set().union(*[fields for _, fields in self._listing(instrument).values()])
+
+    def missing_sessions(self,
+                         instrument: str,
+                         sessions: Iterable[pd.Timestamp],
+                         fields: List[str]) -> List[pd.Timestamp]:
+        """Return the sessions that still have to be fetched from the provider
+
+        A partition lacking one of ``fields`` is refetched whole: besides
+        the requested sessions in it, every session it already covers is
+        returned, so the rewritten partition has all fields for all of them.
+        """
+        sessions = _session_index(sessions)
+        listing = self._listing(instrument)
+        if not self.per_instrument:
+            # One session per partition, so a complete partition is a stored session
+            complete = [key for key, (_, stored) in listing.items() if set(fields) <= stored]
+            return list(sessions[~sessions.strftime("%Y%m%d").isin(complete)])
+
+        if INSTRUMENT_PARTITION not in listing:
+            return list(sessions)
+        name, stored = listing[INSTRUMENT_PARTITION]
+        covered = np.asarray(self._coverage(os.path.join(self._instrument_dir(instrument), name), INSTRUMENT_PARTITION))
+        if not set(fields) <= stored:
+            return list(sessions.union(pd.DatetimeIndex(covered.view("datetime64[ns]"))))
+        return list(sessions[~_in_sorted(sessions.asi8, covered)])
+
+    def write(self,
+              data: pd.DataFrame,
+              instruments: List[str],
+              sessions: Iterable[pd.Timestamp],
+              fields: List[str]) -> None:
+        """Persist provider bars for the given sessions
+
+        ``data`` is indexed by (instrument, datetime) as returned by
+        ``D.features``. Only sessions the provider returned bars for (for
+        any instrument) are marked complete; an instrument without rows in
+        such a session is stored as halted. Sessions with no bars at all may
+        just not be published yet, so they are left to be fetched again.
+        Columns not in ``fields`` are dropped from rewritten partitions.
+        """
+        sessions = [pd.Timestamp(s).normalize() for s in sessions]
+        days = set(data.index.get_level_values(1).normalize()) if len(data) else set()
+        published = [s for s in sessions if s in days]
+        if not published:
+            return
+        available = set(data.index.get_level_values(0))
+        empty = pd.DataFrame({field: np.empty(0, dtype=np.float32) for field in fields},
+                             index=pd.DatetimeIndex([]))
+
+        for instrument in instruments:
+            bars = data.xs(instrument, level=0)[fields] if instrument in available else empty
+            bar_days = bars.index.normalize()
+            by_key: Dict[str, List[pd.Timestamp]] = {}
+            for session in published:
+                by_key.setdefault(self._key(session), []).append(session)
+            for key, key_sessions in by_key.items():
+                rows = bars[bar_days.isin(key_sessions)]
+                self._write_partition(instrument, key, rows, key_sessions, fields)
+
+    def _write_partition(self,
+                         instrument: str,
+                         key: str,
+                         bars: pd.DataFrame,
+                         sessions: List[pd.Timestamp],
+                         fields: List[str]) -> None:
+        instrument_dir = self._instrument_dir(instrument)
+        os.makedirs(instrument_dir, exist_ok=True)
+        timestamps = bars.index.values.astype("datetime64[ns]").view(np.int64)
+        columns = {field: bars[field].to_numpy() for field in fields}
+        covered = np.array([s.value for s in sessions], dtype=np.int64)
+
+        # Merge sessions already stored that this write does not replace;
+        # they can only be kept if they have every field being written
+        previous = self._listing(instrument).get(key)
+        if previous is not None and self.per_instrument and set(fields) <= previous[1]:
+            stored = self._load_partition(os.path.join(instrument_dir, previous[0]), key, fields)
+            stored_days = stored[DATETIME_COLUMN] - stored[DATETIME_COLUMN] % (86400 * 10 ** 9)
+            keep = ~np.isin(stored_days, covered)
+            timestamps = np.concatenate([stored[DATETIME_COLUMN][keep], timestamps])
+            columns = {field: np.concatenate([stored[field][keep], columns[field]]) for field in fields}
+            covered = np.union1d(stored[SESSIONS_COLUMN], covered)
+            order = np.argsort(timestamps, kind="stable")
+            timestamps = timestamps[order]
+            columns = {field: values[order] for field, values in columns.items()}
+
+        tmp = tempfile.mkdtemp(dir=instrument_dir, prefix=".tmp-")
+        name = f"{key}@{time.time_ns()}@{','.join(quote(f, safe='') for f in sorted(fields))}"
+        try:
+            np.save(self._column_file(tmp, DATETIME_COLUMN), timestamps)
+            np.save(self._column_file(tmp, SESSIONS_COLUMN), covered)
+            for field, values in columns.items():
+                np.save(self._column_file(tmp, field), values)
+            os.rename(tmp, os.path.join(instrument_dir, name))
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            return
+
+        for old in os.listdir(instrument_dir):
+            if old != name and old.split("@", 1)[0] == key and "@" in old:
+                shutil.rmtree(os.path.join(instrument_dir, old), ignore_errors=True)
+
+    def _load_partition(self,
+                        partition: str,
+                        key: str,
+                        fields: List[str],
+                        mmap: bool = True) -> Dict[str, np.ndarray]:
+        # Each memory map holds a file descriptor until it is released
+        columns = {
+            field: np.load(self._column_file(partition, field), mmap_mode="r" if mmap else None)
+            for field in [DATETIME_COLUMN] + list(fields)
+        }
+        columns[SESSIONS_COLUMN] = self._coverage(partition, key)
+        return columns
+
+    def read_columns(self,
+                     instrument: str,
+                     sessions: Iterable[pd.Timestamp],
+                     fields: List[str],
+                     mmap: bool = True) -> Dict[str, np.ndarray]:
+        """Read the given sessions of one instrument as a dict of column arrays
+
+        With ``mmap`` single-partition columns are returned without a copy;
+        without it every column is read into memory and no file stays open.
+        """
+        sessions = _session_index(sessions)
+        keys = {INSTRUMENT_PARTITION} if self.per_instrument else set(sessions.strftime("%Y%m%d"))
+        for attempt in range(2):
+            listing = self._listing(instrument)
+            try:
+                parts = [
+                    self._load_partition(
+                        os.path.join(self._instrument_dir(instrument), listing[key][0]), key, fields, mmap
+                    )
+                    for key in sorted(keys) if key in listing and set(fields) <= listing[key][1]
+                ]
+                break
+            except FileNotFoundError:
+                # A newer generation replaced the partition after the listing
+                if attempt:
+                    raise
+
+        columns = {}
+        for field in [DATETIME_COLUMN] + list(fields):
+            chunks = [p[field] for p in parts if len(p[field])]
+            if not chunks:
+                columns[field] = np.empty(0, dtype=np.int64 if field == DATETIME_COLUMN else np.float32)
+            elif len(chunks) == 1:
+                columns[field] = chunks[0]
+            else:
+                columns[field] = np.concatenate(chunks)
+
+        if self.per_instrument and len(columns[DATETIME_COLUMN]):
+            # The partition spans the instrument's whole history
+            timestamps = columns[DATETIME_COLUMN]
+            mask = _in_sorted(timestamps - timestamps % (86400 * 10 ** 9), np.sort(sessions.asi8))
+            if not mask.all():
+                columns = {field: values[mask] for field, values in columns.items()}
+        return columns
+
+    def read(self,
+             instruments: List[str],
+             sessions: Iterable[pd.Timestamp],
+             fields: List[str]) -> pd.DataFrame:
+        """Read the given sessions as a frame indexed by (instrument, datetime)"""
+        sessions = _session_index(sessions)
+        names, lengths, chunks = [], [], {field: [] for field in [DATETIME_COLUMN] + list(fields)}
+        for instrument in instruments:
+            # Columns are copied into the combined frame anyway, and keeping
+            # thousands of instruments mapped would exhaust file descriptors
+            columns = self.read_columns(instrument, sessions, fields, mmap=len(instruments) == 1)
+            if not len(columns[DATETIME_COLUMN]):
+                continue
+            names.append(instrument)
+            lengths.append(len(columns[DATETIME_COLUMN]))
+            for field, values in columns.items():
+                chunks[field].append(values)
+
+        if not names:
+            index = pd.MultiIndex.from_arrays([[], pd.DatetimeIndex([])], names=["instrument", "datetime"])
+            return pd.DataFrame(columns=fields, index=index, dtype=np.float32)
+
+        # One index and one copy per column for all instruments, rather than
+        # a frame per instrument concatenated afterwards
+        columns = {
+            field: parts[0] if len(parts) == 1 else np.concatenate(parts)
+            for field, parts in chunks.items()
+        }
+        timestamps = columns.pop(DATETIME_COLUMN)
+        datetime_codes, datetimes = pd.factorize(timestamps, sort=True)
+        index = pd.MultiIndex(
+            levels=[pd.Index(names, dtype=object), pd.DatetimeIndex(datetimes.view("datetime64[ns]"))],
+            codes=[np.repeat(np.arange(len(names)), lengths), datetime_codes],
+            names=["instrument", "datetime"],
+            verify_integrity=False
+        )
+        return pd.DataFrame(columns, index=index, copy=False)
+
+
+def contiguous_runs(sessions: List[pd.Timestamp],
+                    calendar: List[pd.Timestamp]) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+    """Group sessions into (first, last) runs that are contiguous on the calendar
+
+    Sessions that are not on ``calendar`` (covered by a partition but
+    outside the requested range) start runs of their own.
+    """
+    if not len(sessions):
+        return []
+    sessions = pd.DatetimeIndex(list(sessions))
+    position = pd.DatetimeIndex(list(calendar)).get_indexer(sessions)
+    step = np.diff(position)
+    breaks = np.flatnonzero((step != 1) | (position[1:] < 0) | (position[:-1] < 0)) + 1
+    starts = np.concatenate([[0], breaks])
+    ends = np.concatenate([breaks, [len(sessions)]]) - 1
+    return [(sessions[i], sessions[j]) for i, j in zip(starts, ends)]
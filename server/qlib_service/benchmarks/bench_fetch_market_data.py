@@ -0,0 +1,80 @@
+"""Peak memory and wall time of fetch_market_data output modes
+
+Run from the repository root:
+
+    python -m server.qlib_service.benchmarks.bench_fetch_market_data --days 252
+    python -m server.qlib_service.benchmarks.bench_fetch_market_data --freq day --days 2520 --instruments 3000
+
+The bar store is pre-populated with synthetic 1-minute (or daily) bars,
+so the provider is never hit and only reading and materialization are
+measured. Without a calendar every weekday is a session.
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from ..data_manager import AdvancedDataManager, DEFAULT_FIELDS
+
+
+def populate_store(manager: AdvancedDataManager, instruments, sessions):
+    if manager.freq == "day":
+        offsets = pd.TimedeltaIndex([0])
+    else:
+        offsets = pd.timedelta_range("09:30:00", periods=390, freq="1min")
+    rng = np.random.default_rng(0)
+    for instrument in instruments:
+        index = pd.DatetimeIndex((np.asarray(sessions, dtype="datetime64[ns]")[:, None] + offsets.values).ravel())
+        bars = pd.DataFrame(
+            {field: rng.random(len(index), dtype=np.float32) + 100 for field in DEFAULT_FIELDS},
+            index=pd.MultiIndex.from_product([[instrument], index], names=["instrument", "datetime"])
+        )
+        manager.bar_store.write(bars, [instrument], sessions, DEFAULT_FIELDS)
+
+
+async def records_round_trip(manager, instruments, start, end):
+    # Previous behaviour: list of dicts rebuilt into a DataFrame by the caller
+    result = await manager.fetch_market_data(instruments, start, end)
+    return pd.DataFrame(result["data"])
+
+
+async def frame(manager, instruments, start, end):
+    result = await manager.fetch_market_data(instruments, start, end, output="frame")
+    return result["data"]
+
+
+def measure(label, coroutine):
+    tracemalloc.start()
+    started = time.perf_counter()
+    asyncio.run(coroutine)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<20} {elapsed:>8.3f} s {peak / 2 ** 20:>10.1f} MiB peak")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=252)
+    parser.add_argument("--instruments", type=int, default=3)
+    parser.add_argument("--freq", default="1min", choices=["1min", "day"])
+    args = parser.parse_args()
+
+    instruments = [f"SYM{i}" for i in range(args.instruments)]
+    sessions = list(pd.bdate_range(end="2024-12-31", periods=args.days))
+    start, end = sessions[0].strftime("%Y-%m-%d"), sessions[-1].strftime("%Y-%m-%d")
+
+    with tempfile.TemporaryDirectory() as store_dir:
+        manager = AdvancedDataManager(store_dir=store_dir, freq=args.freq)
+        populate_store(manager, instruments, sessions)
+        bars = 1 if args.freq == "day" else 390
+        print(f"{len(instruments)} instruments x {len(sessions)} sessions x {bars} bars")
+        if len(instruments) * len(sessions) * bars <= 5_000_000:
+            measure("records + DataFrame", records_round_trip(manager, instruments, start, end))
+        measure("frame", frame(manager, instruments, start, end))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Latency of QuoteBoard.get against a fake upstream
+
+Run from the repository root:
+
+    python -m server.qlib_service.benchmarks.bench_quotes --requests 2000 --latency 0.5
+
+The fake provider sleeps ``--latency`` seconds per call, standing in for
+Yahoo. All requests are issued at once while the board is cold, then again
+once the snapshot is warm.
+"""
+import argparse
+import asyncio
+import time
+import numpy as np
+from ..quotes import QuoteBoard
+
+
+def fake_provider(latency: float):
+    calls = []
+
+    async def provider(symbols):
+        calls.append(len(symbols))
+        await asyncio.sleep(latency)
+        return {symbol: {"price": 100.0, "change": 0.0, "volume": 1000} for symbol in symbols}
+
+    return provider, calls
+
+
+async def timed(board: QuoteBoard, symbols) -> float:
+    started = time.perf_counter()
+    await board.get(symbols)
+    return time.perf_counter() - started
+
+
+async def run(args):
+    provider, calls = fake_provider(args.latency)
+    board = QuoteBoard(provider, symbols=(), refresh_interval=3600)
+    symbols = [f"SYM{i}" for i in range(args.symbols)]
+    for label in ("cold", "warm"):
+        latencies = np.array(await asyncio.gather(*[
+            timed(board, symbols[i % len(symbols):][:3] or symbols[:3]) for i in range(args.requests)
+        ])) * 1000
+        print(f"{label:<6} p50 {np.percentile(latencies, 50):>9.3f} ms  "
+              f"p99 {np.percentile(latencies, 99):>9.3f} ms  upstream calls {len(calls)}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.5)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
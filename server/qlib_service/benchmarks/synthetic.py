@@ -0,0 +1,12 @@
+"""Synthetic inputs shared by the benchmarks"""
+import numpy as np
+import pandas as pd
+
+
+def synthetic_returns(days: int, assets: int, seed: int = 0) -> pd.DataFrame:
+    """Daily returns from a five-factor model with idiosyncratic noise"""
+    rng = np.random.default_rng(seed)
+    loadings = rng.normal(size=(assets, 5))
+    factors = rng.normal(0, 0.01, (days, 5))
+    noise = rng.normal(0, 0.02, (days, assets))
+    return pd.DataFrame(factors @ loadings.T + noise, columns=[f"SYM{i}" for i in range(assets)])
@@ -1,4 +1,6 @@
-from typing import List, Dict, Any
+import os
+import re
+from typing import List, Dict, Any, Tuple
 import numpy as np
 import pandas as pd
 from qlib.data import D
@@ -7,16 +9,37 @@ from qlib.data.dataset.handler import DataHandlerLP
 import exchange_calendars as xcals
 from datetime import datetime, timedelta
 import pytz
+from .bar_store import DAILY_FREQS, ColumnarBarStore, contiguous_runs
+from .rolling import RollingFeatureEngine, rolling_mean, rolling_std, rolling_corr, pct_change, derive_inputs
+
+# Provider timestamps are naive exchange-local times
+EXCHANGE_TZ = "America/New_York"
+REGULAR_CLOSE = pd.Timedelta(hours=16)
+
+# Window of the technical features, shared by the batch and streaming paths
+FEATURE_WINDOW = 20
+
+DEFAULT_FIELDS = [
+    "$close", "$volume", "$factor",
+    "$high", "$low", "$open",
+    "$vwap", "$turn"
+]
 
 class AdvancedDataManager:
-    def __init__(self):
+    def __init__(self, store_dir: str = None, freq: str = "1min"):
         self.data_handler = None
-        self.cache = {}
+        self.calendar = None
+        self.freq = freq
+        self.bar_store = ColumnarBarStore(
+            store_dir or os.environ.get("QLIB_BAR_STORE", "~/.qlib/bar_store"),
+            freq=freq
+        )
+        self.feature_engines = {}
 
     async def initialize_data(self, region: str = "us"):
         """Initialize data sources and handlers"""
         try:
-            calendar = xcals.get_calendar("XNYS")  # US market calendar
+            self.calendar = xcals.get_calendar("XNYS")  # US market calendar
             self.data_handler = DataHandlerLP()
 
             return {
@@ -33,27 +56,36 @@ class AdvancedDataManager:
                               instruments: List[str],
                               start_time: str,
                               end_time: str,
-                              fields: List[str] = None) -> Dict[str, Any]:
-        """Fetch and process market data"""
+                              fields: List[str] = None,
+                              output: str = "records") -> Dict[str, Any]:
+        """Fetch and process market data
+
+        ``output`` selects the shape of ``data``: ``"records"`` (list of
+        dicts, kept for JSON endpoints), ``"frame"`` (the DataFrame indexed
+        by (instrument, datetime)) or ``"columns"`` (dict of NumPy arrays).
+        """
         try:
             if fields is None:
-                fields = [
-                    "$close", "$volume", "$factor",
-                    "$high", "$low", "$open",
-                    "$vwap", "$turn"
-                ]
+                fields = DEFAULT_FIELDS
 
-            data = D.features(
-                instruments,
-                fields,
-                start_time=start_time,
-                end_time=end_time,
-                freq="1min"  # High-frequency data
-            )
+            data = self._load_bars(instruments, start_time, end_time, fields)
+
+            if output == "frame":
+                payload = data
+            elif output == "columns":
+                payload = {
+                    "instrument": data.index.get_level_values(0).to_numpy(),
+                    "datetime": data.index.get_level_values(1).to_numpy(),
+                    **{field: data[field].to_numpy() for field in fields}
+                }
+            elif output == "records":
+                payload = data.to_dict("records")
+            else:
+                raise ValueError(f"Unknown output mode {output}")
 
             return {
                 "status": "success",
-                "data": data.to_dict("records")
+                "data": payload
             }
         except Exception as e:
             return {
@@ -61,29 +93,130 @@ class AdvancedDataManager:
                 "message": str(e)
             }
 
+    def _load_bars(self,
+                   instruments: List[str],
+                   start_time: str,
+                   end_time: str,
+                   fields: List[str]) -> pd.DataFrame:
+        """Read bars from the local store, fetching only missing sessions from the provider"""
+        start, end = self._resolve_time_range(start_time, end_time)
+        sessions = self._sessions(start, end)
+
+        # A session that has not closed yet is still forming, so it is never persisted
+        closed = self._closed_sessions(sessions)
+        pending = {}
+        for instrument in instruments:
+            missing = self.bar_store.missing_sessions(instrument, closed, fields)
+            if not missing:
+                continue
+            # Fields stored for other requests are fetched too, so rewritten
+            # partitions keep them
+            fetch_fields = tuple(sorted(set(fields) | self.bar_store.stored_fields(instrument)))
+            # Refetching a partition can reach sessions outside the request
+            calendar = sessions if sessions[0] <= missing[0] and missing[-1] <= sessions[-1] \
+                else self._sessions(min(missing[0], sessions[0]), max(missing[-1], sessions[-1]))
+            for run in contiguous_runs(missing, calendar):
+                pending.setdefault((run, fetch_fields), []).append(instrument)
+
+        for ((first, last), fetch_fields), run_instruments in pending.items():
+            fetched = D.features(
+                run_instruments,
+                list(fetch_fields),
+                start_time=first.strftime("%Y-%m-%d"),
+                end_time=(last + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)).strftime("%Y-%m-%d %H:%M:%S"),
+                freq=self.freq
+            )
+            run_sessions = self._sessions(first, last)
+            self.bar_store.write(fetched, run_instruments, run_sessions, list(fetch_fields))
+
+        data = self.bar_store.read(instruments, closed, fields)
+        if len(closed) < len(sessions):
+            live = D.features(
+                instruments,
+                fields,
+                start_time=max(start, sessions[len(closed)]).strftime("%Y-%m-%d %H:%M:%S"),
+                end_time=end.strftime("%Y-%m-%d %H:%M:%S"),
+                freq=self.freq
+            )
+            data = pd.concat([data, live]).sort_index()
+
+        # Sessions are read whole; an intraday start or end must not leak
+        # bars from outside the requested range
+        datetimes = data.index.get_level_values(1)
+        inside = (datetimes >= start) & (datetimes <= end)
+        return data if inside.all() else data[inside]
+
+    def _now(self) -> pd.Timestamp:
+        """Current exchange-local wall time, naive like the provider's timestamps"""
+        return pd.Timestamp.now(tz=EXCHANGE_TZ).tz_localize(None)
+
+    def _closed_sessions(self, sessions: List[pd.Timestamp]) -> pd.DatetimeIndex:
+        """The sessions whose close has passed, by the exchange calendar"""
+        now = pd.Timestamp.now(tz="UTC")
+        sessions = pd.DatetimeIndex(sessions).as_unit("ns")
+        if self.calendar is not None:
+            closes = self.calendar.closes.reindex(sessions)
+            return sessions[(closes <= now).to_numpy()]
+        # Without a calendar assume the regular 16:00 New York close
+        return sessions[(sessions + REGULAR_CLOSE).tz_localize(EXCHANGE_TZ) <= now]
+
+    def _resolve_time_range(self, start_time: str, end_time: str) -> Tuple[pd.Timestamp, pd.Timestamp]:
+        """Resolve absolute dates as well as relative ranges such as ("1y", "now")"""
+        end = self._now() if end_time in (None, "now") else pd.Timestamp(end_time)
+        match = re.fullmatch(r"(\d+)([dwmy])", str(start_time))
+        if match:
+            amount, unit = int(match.group(1)), match.group(2)
+            offset = {
+                "d": pd.DateOffset(days=amount),
+                "w": pd.DateOffset(weeks=amount),
+                "m": pd.DateOffset(months=amount),
+                "y": pd.DateOffset(years=amount)
+            }[unit]
+            start = end.normalize() - offset
+        else:
+            start = pd.Timestamp(start_time)
+        # A bare end date means the whole of that day
+        if end_time not in (None, "now") and end == end.normalize() and self.freq not in DAILY_FREQS:
+            end = end + pd.Timedelta(days=1) - pd.Timedelta(nanoseconds=1)
+        return start, end
+
+    def _sessions(self, start: pd.Timestamp, end: pd.Timestamp) -> List[pd.Timestamp]:
+        """Trading sessions between two timestamps, inclusive"""
+        if self.calendar is not None:
+            sessions = pd.DatetimeIndex(self.calendar.sessions_in_range(start.normalize(), end.normalize()))
+            if sessions.tz is not None:
+                sessions = sessions.tz_localize(None)
+            return list(sessions)
+        return list(pd.bdate_range(start.normalize(), end.normalize()))
+
     async def calculate_technical_features(self, data: pd.DataFrame) -> Dict[str, Any]:
-        """Calculate advanced technical features"""
+        """Calculate advanced technical features for every bar
+
+        Windowed features use ``FEATURE_WINDOW`` bars; ``update_features``
+        returns the same features for the newest bar only.
+        """
         try:
             features = {}
+            dollar_volume = data["$volume"] * data["$close"]
 
             # Volume-price correlation
-            features["volume_price_correlation"] = data["$volume"].corr(data["$close"])
+            features["volume_price_correlation"] = rolling_corr(data["$volume"], data["$close"], FEATURE_WINDOW)
 
             # Volatility measures
-            log_returns = np.log(data["$close"]).diff()
-            features["realized_volatility"] = log_returns.std() * np.sqrt(252)
+            log_returns = derive_inputs(data)["log_returns"]
+            features["realized_volatility"] = rolling_std(log_returns, FEATURE_WINDOW) * np.sqrt(252)
 
             # Momentum indicators
             features["momentum"] = {
-                "daily": data["$close"].pct_change(1).mean(),
-                "weekly": data["$close"].pct_change(5).mean(),
-                "monthly": data["$close"].pct_change(21).mean()
+                "daily": pct_change(data["$close"], 1),
+                "weekly": pct_change(data["$close"], 5),
+                "monthly": pct_change(data["$close"], 21)
             }
 
             # Liquidity measures
             features["liquidity"] = {
-                "amihud": abs(data["$close"].pct_change()) / (data["$volume"] * data["$close"]),
-                "turnover": data["$volume"] * data["$close"] / data["$volume"].rolling(20).mean()
+                "amihud": abs(pct_change(data["$close"])) / dollar_volume,
+                "turnover": dollar_volume / rolling_mean(data["$volume"], FEATURE_WINDOW)
             }
 
             return {
@@ -102,15 +235,15 @@ class AdvancedDataManager:
             signals = {}
 
             # Trend strength
-            sma_20 = data["$close"].rolling(20).mean()
-            sma_50 = data["$close"].rolling(50).mean()
+            sma_20 = rolling_mean(data["$close"], 20)
+            sma_50 = rolling_mean(data["$close"], 50)
             signals["trend_strength"] = (sma_20 - sma_50) / sma_50
 
             # Volume analysis
-            signals["volume_trend"] = data["$volume"].rolling(20).mean().diff()
+            signals["volume_trend"] = rolling_mean(data["$volume"], 20).diff()
 
             # Price momentum
-            signals["momentum"] = data["$close"].pct_change(20)
+            signals["momentum"] = pct_change(data["$close"], 20)
 
             # Volatility regime
             signals["volatility_regime"] = self._calculate_volatility_regime(data)
@@ -127,9 +260,9 @@ class AdvancedDataManager:
 
     def _calculate_volatility_regime(self, data: pd.DataFrame) -> str:
         """Calculate volatility regime using advanced metrics"""
-        returns = data["$close"].pct_change()
+        returns = derive_inputs(data)["returns"]
         current_vol = returns.std() * np.sqrt(252)
-        hist_vol = returns.rolling(252).std() * np.sqrt(252)
+        hist_vol = rolling_std(returns, 252) * np.sqrt(252)
 
         if current_vol > hist_vol.mean() + hist_vol.std():
             return "high_volatility"
@@ -138,6 +271,53 @@ class AdvancedDataManager:
         else:
             return "normal_volatility"
 
+    async def update_features(self, instrument: str, bar: Dict[str, float]) -> Dict[str, Any]:
+        """Append one bar and return the latest technical features and signals
+
+        Uses the instrument's RollingFeatureEngine, so every window is updated
+        in O(1) instead of being recomputed over the full history. The
+        features are the last row of ``calculate_technical_features`` on the
+        same bars. Seed an engine with
+        ``self.feature_engines[instrument].extend(history)``.
+        """
+        try:
+            engine = self.feature_engines.setdefault(instrument, RollingFeatureEngine())
+            engine.update(bar)
+
+            sma_20 = engine.mean("$close", 20)
+            sma_50 = engine.mean("$close", 50)
+            dollar_volume = engine.latest("$volume") * engine.latest("$close")
+            features = {
+                "volume_price_correlation": engine.corr("$volume", "$close", FEATURE_WINDOW),
+                "realized_volatility": engine.std("log_returns", FEATURE_WINDOW) * np.sqrt(252),
+                "momentum": {
+                    "daily": engine.pct_change("$close", 1),
+                    "weekly": engine.pct_change("$close", 5),
+                    "monthly": engine.pct_change("$close", 21)
+                },
+                "liquidity": {
+                    "amihud": abs(engine.pct_change("$close", 1)) / dollar_volume,
+                    "turnover": dollar_volume / engine.mean("$volume", FEATURE_WINDOW)
+                }
+            }
+            signals = {
+                "trend_strength": (sma_20 - sma_50) / sma_50,
+                # Change of the 20-bar mean is the entering minus the leaving bar over 20
+                "volume_trend": (engine.latest("$volume") - engine.latest("$volume", 20)) / 20,
+                "momentum": engine.pct_change("$close", 20)
+            }
+
+            return {
+                "status": "success",
+                "features": features,
+                "signals": signals
+            }
+        except Exception as e:
+            return {
+                "status": "error",
+                "message": str(e)
+            }
+
     async def analyze_market_microstructure(self, data: pd.DataFrame) -> Dict[str, Any]:
         """Analyze market microstructure"""
         try:
@@ -0,0 +1,221 @@
+import asyncio
+import zlib
+from typing import List, Dict, Any, Tuple
+import numpy as np
+import pandas as pd
+
+FIXED_COST_BPS = 0.0001  # 1 bps per share traded
+
+
+def _sinh_ratio(a: np.ndarray, b: float) -> np.ndarray:
+    """sinh(a) / sinh(b) for 0 <= a <= b without overflowing for large b"""
+    return np.exp(a - b) * -np.expm1(-2 * a) / -np.expm1(-2 * b)
+
+
+def almgren_chriss_schedule(total_volume: float,
+                            time_slots: int,
+                            volatility: float,
+                            temporary_impact: float,
+                            permanent_impact: float = 0.0,
+                            fixed_cost: float = 0.0,
+                            risk_aversion: float = 1e-6,
+                            horizon: float = 1.0,
+                            lot_size: float = 1.0) -> Dict[str, Any]:
+    """Optimal liquidation schedule under the Almgren-Chriss model
+
+    ``volatility`` is the price volatility per unit of ``horizon`` (in
+    currency), ``temporary_impact`` (eta) and ``permanent_impact`` (gamma)
+    are the linear impact coefficients and ``fixed_cost`` (epsilon) is the
+    per-share cost. Holdings follow the closed form
+    ``x_j = X sinh(kappa (T - t_j)) / sinh(kappa T)`` and are rounded to
+    ``lot_size`` while keeping the total exact, so the cost is independent
+    of the order size. Non-finite inputs raise ``ValueError``.
+    """
+    inputs = [total_volume, volatility, temporary_impact, permanent_impact, fixed_cost, risk_aversion, horizon]
+    if not np.all(np.isfinite(inputs)):
+        raise ValueError(f"Schedule inputs must be finite, got {inputs}")
+    n_slots = max(int(time_slots), 1)
+    tau = horizon / n_slots
+    eta = temporary_impact - 0.5 * permanent_impact * tau
+    if eta <= 0:
+        raise ValueError("Temporary impact must exceed half the permanent impact per slot")
+
+    kappa_tilde_sq = risk_aversion * volatility ** 2 / eta
+    kappa = np.arccosh(1 + 0.5 * kappa_tilde_sq * tau ** 2) / tau
+
+    times = np.arange(n_slots + 1) * tau
+    if kappa * horizon < 1e-8:
+        # Risk-neutral limit: trade at a constant rate
+        holdings = total_volume * (1 - times / horizon)
+    else:
+        holdings = total_volume * _sinh_ratio(kappa * (horizon - times), kappa * horizon)
+
+    # Discretize to whole lots; the first and last slices absorb any remainder.
+    # Rounding keeps holdings non-increasing, and clipping stops a lot rounded
+    # up past an odd-sized order from making the first trade negative
+    if lot_size > 0:
+        holdings[1:-1] = np.clip(np.round(holdings[1:-1] / lot_size) * lot_size, 0.0, total_volume)
+    holdings[0], holdings[-1] = total_volume, 0.0
+    trades = -np.diff(holdings)
+
+    slot_costs = fixed_cost * np.abs(trades) + (eta / tau) * trades ** 2
+    expected_cost = 0.5 * permanent_impact * total_volume ** 2 + slot_costs.sum()
+    cost_variance = volatility ** 2 * tau * np.sum(holdings[1:] ** 2)
+
+    return {
+        "holdings": holdings,
+        "trades": trades,
+        "slot_costs": slot_costs,
+        "expected_cost": float(expected_cost),
+        "cost_variance": float(cost_variance),
+        "kappa": float(kappa)
+    }
+
+
+def schedule_to_trajectory(schedule: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Per-slot view of a schedule, in execution order"""
+    return [
+        {
+            "time_slot": slot + 1,
+            "volume": float(volume),
+            "remaining": float(remaining),
+            "expected_impact": float(cost)
+        }
+        for slot, (volume, remaining, cost) in enumerate(
+            zip(schedule["trades"], schedule["holdings"][1:], schedule["slot_costs"])
+        )
+    ]
+
+
+def intraday_volume_profile(bars: pd.DataFrame, slots: int) -> Tuple[np.ndarray, float]:
+    """Share of daily volume traded in each of ``slots`` equal intraday buckets
+
+    ``bars`` holds intraday ``$volume`` bars for one instrument indexed by
+    datetime. Returns the normalized curve and the mean daily volume; with no
+    bars the curve is flat and the daily volume is NaN.
+    """
+    if bars is None or not len(bars):
+        return np.full(slots, 1.0 / slots), np.nan
+
+    volume = bars["$volume"]
+    index = pd.DatetimeIndex(volume.index)
+    minute_of_day = index.hour * 60 + index.minute
+    by_minute = volume.groupby(minute_of_day).mean()
+    positions = np.arange(len(by_minute)) * slots // len(by_minute)
+    curve = by_minute.groupby(positions).sum().reindex(range(slots), fill_value=0).to_numpy(dtype=float)
+    total = curve.sum()
+    curve = curve / total if total > 0 else np.full(slots, 1.0 / slots)
+
+    daily_volume = float(volume.groupby(index.normalize()).sum().mean())
+    return curve, daily_volume
+
+
+def split_quantity(quantity: float, weights: np.ndarray, lot_size: float = 1.0) -> np.ndarray:
+    """Split a parent quantity by weights into lot-sized children summing exactly to it
+
+    Children are never negative: a lot rounded up past an odd-sized parent
+    is clipped back to the parent quantity, as in ``almgren_chriss_schedule``.
+    """
+    cumulative = quantity * np.cumsum(weights) / np.sum(weights)
+    if lot_size > 0:
+        cumulative[:-1] = np.clip(np.round(cumulative[:-1] / lot_size) * lot_size, 0.0, quantity)
+    cumulative[-1] = quantity
+    return np.diff(np.concatenate([[0.0], cumulative]))
+
+
+class SimulatedExchange:
+    """Local exchange simulator for child-order execution
+
+    Each symbol gets a seeded random-walk price path and a per-slot market
+    volume derived from its intraday volume curve. Child orders fill in full
+    at the slot price plus half the spread and a temporary impact linear in
+    the order's participation of that slot's volume. ``slot_seconds`` makes
+    every submission wait on the event loop, so many parent orders can be
+    worked concurrently as coroutines without a thread per order.
+    """
+
+    def __init__(self,
+                 volatility: float = 0.02,
+                 half_spread_bps: float = 1.0,
+                 impact: float = 0.1,
+                 slot_seconds: float = 0.0,
+                 seed: int = 0):
+        self.volatility = volatility
+        self.half_spread = half_spread_bps / 1e4
+        self.impact = impact
+        self.slot_seconds = slot_seconds
+        self.seed = seed
+        self.markets = {}
+
+    def register(self,
+                 symbol: str,
+                 price: float,
+                 daily_volume: float,
+                 volume_curve: np.ndarray) -> Dict[str, np.ndarray]:
+        """Simulated market for a symbol and slot count, rebuilt when the arrival price or daily volume changes
+
+        Parent orders already working keep the market they were given.
+        """
+        slots = len(volume_curve)
+        key = (symbol, slots)
+        market = self.markets.get(key)
+        if market is None or market["arrival"] != (price, daily_volume):
+            rng = np.random.default_rng([self.seed, zlib.crc32(symbol.encode())])
+            steps = rng.normal(0.0, self.volatility / np.sqrt(slots), slots)
+            market = self.markets[key] = {
+                "symbol": symbol,
+                "arrival": (price, daily_volume),
+                "prices": price * np.exp(np.cumsum(steps) - steps[0]),
+                "volumes": daily_volume * np.asarray(volume_curve, dtype=float)
+            }
+        return market
+
+    async def submit(self, market: Dict[str, Any], side: int, quantity: float, slot: int) -> Dict[str, Any]:
+        """Fill a child order in the given slot of a registered market"""
+        if self.slot_seconds:
+            await asyncio.sleep(self.slot_seconds)
+        price = market["prices"][slot]
+        participation = quantity / market["volumes"][slot] if market["volumes"][slot] > 0 else 0.0
+        fill_price = price * (1 + side * (self.half_spread + self.impact * participation))
+        return {"slot": slot, "quantity": float(quantity), "price": float(fill_price)}
+
+
+async def work_parent_order(exchange: SimulatedExchange,
+                            market: Dict[str, Any],
+                            side: int,
+                            children: np.ndarray,
+                            style: str) -> Dict[str, Any]:
+    """Send child orders slot by slot and report slippage against arrival and VWAP"""
+    fills = []
+    for slot, quantity in enumerate(children):
+        if quantity > 0:
+            fills.append(await exchange.submit(market, side, quantity, slot))
+
+    filled = sum(fill["quantity"] for fill in fills)
+    arrival_price = float(market["prices"][0])
+    active = slice(fills[0]["slot"], fills[-1]["slot"] + 1) if fills else slice(0, 0)
+    active_volume = market["volumes"][active].sum()
+    market_vwap = float(
+        np.dot(market["prices"][active], market["volumes"][active]) / active_volume
+    ) if active_volume > 0 else arrival_price
+
+    # Without fills there is no average price to measure slippage from
+    average_price = slippage_vs_arrival = slippage_vs_vwap = None
+    if filled:
+        average_price = sum(fill["quantity"] * fill["price"] for fill in fills) / filled
+        slippage_vs_arrival = float(side * (average_price - arrival_price) / arrival_price * 1e4)
+        slippage_vs_vwap = float(side * (average_price - market_vwap) / market_vwap * 1e4)
+
+    return {
+        "symbol": market["symbol"],
+        "side": "buy" if side > 0 else "sell",
+        "style": style,
+        "quantity": float(np.sum(children)),
+        "filled": float(filled),
+        "average_price": average_price,
+        "arrival_price": arrival_price,
+        "market_vwap": market_vwap,
+        "slippage_vs_arrival_bps": slippage_vs_arrival,
+        "slippage_vs_vwap_bps": slippage_vs_vwap,
+        "fills": fills
+    }
@@ -0,0 +1,114 @@
+from typing import Dict, Any
+import numpy as np
+import pandas as pd
+
+RISK_FACTORS = ("beta", "momentum", "volatility", "liquidity", "size")
+
+# Universes larger than this use the factor risk model under risk_model="auto"
+FACTOR_MODEL_MIN_ASSETS = 500
+
+# Per-asset variance floor so specific risk never makes the model singular
+MIN_SPECIFIC_VARIANCE = 1e-10
+
+
+def _zscore(values: pd.Series) -> pd.Series:
+    std = values.std()
+    centred = values - values.mean()
+    return (centred / std if std > 0 else centred * 0.0).fillna(0.0)
+
+
+def factor_exposures(returns: pd.DataFrame, volume: pd.DataFrame = None, close: pd.DataFrame = None) -> pd.DataFrame:
+    """Cross-sectionally standardized style exposures, one row per asset
+
+    ``returns`` (and ``volume`` / ``close`` when given) are [time, asset]
+    frames. Beta is to the equal-weighted market, momentum is the
+    cumulative return skipping the latest 21 periods when the history
+    allows, and volatility the return standard deviation. Liquidity (log
+    mean turnover over mean absolute return) and size (log median
+    turnover) need volume and close and are left out without them.
+    """
+    market = returns.mean(axis=1)
+    centred = returns - returns.mean()
+    market_centred = market - market.mean()
+    market_variance = (market_centred ** 2).sum()
+    beta = (centred.mul(market_centred, axis=0).sum() / market_variance
+            if market_variance > 0 else pd.Series(1.0, index=returns.columns))
+
+    skip = 21 if len(returns) > 2 * 21 else 0
+    momentum = np.log1p(returns.iloc[:len(returns) - skip].fillna(0.0)).sum()
+
+    exposures = {"beta": beta, "momentum": momentum, "volatility": returns.std()}
+    if volume is not None and close is not None:
+        turnover = (volume * close).reindex_like(returns)
+        exposures["liquidity"] = np.log1p(turnover.mean()) - np.log(returns.abs().mean() + 1e-12)
+        exposures["size"] = np.log1p(turnover.median())
+    return pd.DataFrame({name: _zscore(values) for name, values in exposures.items()})
+
+
+class FactorCovariance:
+    """Covariance in factor form, B F B' + diag(D), without the N x N matrix
+
+    ``exposures`` is [asset, factor] (B), ``factor_covariance`` the K x K
+    factor covariance (F) and ``specific_variance`` the per-asset residual
+    variance (D). Products with it cost O(NK), and ``@`` works like it does
+    on the dense matrix so the two can be used interchangeably.
+    """
+
+    # Makes numpy defer ``weights @ covariance`` to __rmatmul__
+    __array_ufunc__ = None
+
+    def __init__(self, exposures: np.ndarray, factor_covariance: np.ndarray, specific_variance: np.ndarray):
+        self.exposures = np.asarray(exposures, dtype=np.float64)
+        self.factor_covariance = np.asarray(factor_covariance, dtype=np.float64)
+        self.specific_variance = np.asarray(specific_variance, dtype=np.float64)
+
+    @property
+    def shape(self):
+        n = len(self.specific_variance)
+        return (n, n)
+
+    def __matmul__(self, weights: np.ndarray) -> np.ndarray:
+        return self.exposures @ (self.factor_covariance @ (self.exposures.T @ weights)) + self.specific_variance * weights
+
+    def __rmatmul__(self, weights: np.ndarray) -> np.ndarray:
+        # Symmetric, so w' S is (S w)'
+        return self @ weights
+
+    def variance(self, weights: np.ndarray) -> float:
+        factor_exposure = self.exposures.T @ weights
+        return float(factor_exposure @ self.factor_covariance @ factor_exposure
+                     + self.specific_variance @ weights ** 2)
+
+    def factor_root(self) -> np.ndarray:
+        """G with G' G = B F B', K x N, so w' B F B' w = ||G w||^2"""
+        eigenvalues, eigenvectors = np.linalg.eigh(self.factor_covariance)
+        root = np.sqrt(np.clip(eigenvalues, 0, None))[:, None] * eigenvectors.T
+        return root @ self.exposures.T
+
+    def dense(self) -> np.ndarray:
+        """The full N x N matrix; only sensible for small universes"""
+        return self.exposures @ self.factor_covariance @ self.exposures.T + np.diag(self.specific_variance)
+
+
+def fit_factor_model(returns: pd.DataFrame, exposures: pd.DataFrame) -> FactorCovariance:
+    """Estimate F and D from per-period cross-sectional regressions on B
+
+    A market column of ones is added to ``exposures`` so the factor
+    returns also pick up the common move. Missing returns count as zero.
+    """
+    exposures = exposures.reindex(returns.columns).fillna(0.0)
+    b = np.column_stack([np.ones(len(exposures)), exposures.to_numpy(dtype=np.float64)])
+    r = returns.to_numpy(dtype=np.float64, na_value=0.0)
+
+    # All T regressions at once: [T, N] @ [N, K] -> [T, K] factor returns
+    factor_returns = r @ np.linalg.pinv(b).T
+    residuals = r - factor_returns @ b.T
+    factor_covariance = np.atleast_2d(np.cov(factor_returns, rowvar=False))
+    specific_variance = np.maximum(residuals.var(axis=0, ddof=1), MIN_SPECIFIC_VARIANCE)
+    return FactorCovariance(b, factor_covariance, specific_variance)
+
+
+def factor_risk_model(returns: pd.DataFrame, volume: pd.DataFrame = None, close: pd.DataFrame = None) -> Dict[str, Any]:
+    """Exposures and the fitted factor covariance for a [time, asset] return panel"""
+    exposures = factor_exposures(returns, volume, close)
+    return {"exposures": exposures, "covariance": fit_factor_model(returns, exposures)}
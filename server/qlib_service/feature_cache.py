@@ -0,0 +1,192 @@
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Callable, Optional
+import numpy as np
+import pandas as pd
+
+COLUMNS_FILE = "columns.json"
+
+# Part of every cache key. Bump it when something the builders depend on
+# changes (rolling helpers, derived inputs, dtypes) without their own
+# source changing, so entries computed the old way are not reused
+FEATURE_VERSION = "1"
+
+
+def spec_hash(compute: Callable[[pd.DataFrame], pd.DataFrame]) -> str:
+    """Hash of a feature builder's source, so editing the builder invalidates its cache"""
+    # Bound methods hash by their function so the source is read once per builder
+    return _source_hash(getattr(compute, "__func__", compute))
+
+
+@lru_cache(maxsize=None)
+def _source_hash(compute: Callable) -> str:
+    try:
+        source = inspect.getsource(compute)
+    except (OSError, TypeError):
+        source = getattr(compute, "__qualname__", repr(compute))
+    return hashlib.blake2b(source.encode(), digest_size=16).hexdigest()
+
+
+def bars_fingerprint(data: pd.DataFrame) -> str:
+    """Hash of the bar values and their index, which changes whenever the source bars do"""
+    hashes = pd.util.hash_pandas_object(data, index=True).to_numpy()
+    digest = hashlib.blake2b(hashes.tobytes(), digest_size=16)
+    digest.update(",".join(map(str, data.columns)).encode())
+    return digest.hexdigest()
+
+
+class FeatureCache:
+    """Content-addressed cache of engineered feature matrices
+
+    The key hashes ``FEATURE_VERSION``, the caller's ``version`` and the
+    builder's source together with the instrument, the date range and a
+    fingerprint of the input bars, so a changed builder or revised bars
+    simply miss instead of returning stale features. Matrices are stored as
+    float32 ``.npy`` columns under ``<root>/<key>/`` (written to a temporary
+    directory and renamed, like the bar store) and the most recently used
+    ones are kept in memory up to ``max_bytes``.
+
+    On disk, entries are kept up to ``max_disk_bytes``: a disk hit touches
+    the entry's directory, and after each write the least recently used
+    entries are removed until the rest fit.
+    """
+
+    def __init__(self, root: str, max_bytes: int = 256 * 2 ** 20, max_disk_bytes: int = 4 * 2 ** 30):
+        self.root = os.path.expanduser(root)
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.frames: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "disk_evictions": 0}
+        os.makedirs(self.root, exist_ok=True)
+
+    def key(self,
+            compute: Callable[[pd.DataFrame], pd.DataFrame],
+            data: pd.DataFrame,
+            instrument: Optional[str] = None,
+            version: str = None) -> str:
+        """Cache key for the features ``compute`` builds from ``data``"""
+        index = data.index.get_level_values(-1) if isinstance(data.index, pd.MultiIndex) else data.index
+        date_range = [str(index.min()), str(index.max())] if len(index) else []
+        parts = [
+            FEATURE_VERSION, str(version), spec_hash(compute), str(instrument), *date_range, bars_fingerprint(data)
+        ]
+        return hashlib.blake2b("|".join(parts).encode(), digest_size=20).hexdigest()
+
+    def get(self,
+            compute: Callable[[pd.DataFrame], pd.DataFrame],
+            data: pd.DataFrame,
+            fields: List[str] = None,
+            instrument: Optional[str] = None,
+            version: str = None) -> pd.DataFrame:
+        """Return ``compute(data)`` as float32, from memory, disk or by computing it
+
+        Only ``fields`` (the inputs the builder reads) are fingerprinted, so
+        unrelated columns such as targets do not invalidate the entry.
+        ``version`` is the builder's own version, for changes its source
+        hash cannot see.
+        """
+        source = data[[field for field in fields if field in data]] if fields is not None else data
+        key = self.key(compute, source, instrument, version)
+
+        with self.lock:
+            frame = self.frames.get(key)
+            if frame is not None:
+                self.frames.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return frame.copy(deep=False)
+
+        path = os.path.join(self.root, key)
+        if os.path.exists(os.path.join(path, COLUMNS_FILE)):
+            frame = self._read(path, data.index)
+            self._touch(path)
+            self.stats["disk_hits"] += 1
+        else:
+            frame = compute(data).astype(np.float32)
+            self._write(path, frame)
+            self._sweep(keep=key)
+            self.stats["misses"] += 1
+
+        self._remember(key, frame)
+        return frame.copy(deep=False)
+
+    def _read(self, path: str, index: pd.Index) -> pd.DataFrame:
+        with open(os.path.join(path, COLUMNS_FILE)) as f:
+            columns = json.load(f)
+        return pd.DataFrame(
+            {column: np.load(os.path.join(path, f"{i}.npy"), mmap_mode="r") for i, column in enumerate(columns)},
+            index=index,
+            columns=columns
+        )
+
+    def _write(self, path: str, frame: pd.DataFrame) -> None:
+        tmp = tempfile.mkdtemp(dir=self.root, prefix=".tmp-")
+        try:
+            for i, column in enumerate(frame.columns):
+                np.save(os.path.join(tmp, f"{i}.npy"), frame[column].to_numpy(dtype=np.float32))
+            with open(os.path.join(tmp, COLUMNS_FILE), "w") as f:
+                json.dump([str(column) for column in frame.columns], f)
+            os.replace(tmp, path)
+        except OSError:
+            # Another worker stored the same features first
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    @staticmethod
+    def _touch(path: str) -> None:
+        # The directory's mtime is the entry's last use, shared by every process
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _sweep(self, keep: str = None) -> None:
+        """Remove least recently used entries until the disk cache fits ``max_disk_bytes``"""
+        entries = []
+        for entry in os.scandir(self.root):
+            if entry.name.startswith(".") or not entry.is_dir():
+                continue
+            try:
+                size = sum(f.stat().st_size for f in os.scandir(entry.path))
+                entries.append((entry.stat().st_mtime, size, entry.name))
+            except FileNotFoundError:
+                # Removed by another process's sweep
+                continue
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            if name == keep:
+                continue
+            shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+            total -= size
+            self.stats["disk_evictions"] += 1
+
+    def _remember(self, key: str, frame: pd.DataFrame) -> None:
+        size = int(frame.memory_usage(index=False).sum())
+        with self.lock:
+            if key in self.frames:
+                self.total_bytes -= int(self.frames.pop(key).memory_usage(index=False).sum())
+            self.frames[key] = frame
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes and len(self.frames) > 1:
+                _, evicted = self.frames.popitem(last=False)
+                self.total_bytes -= int(evicted.memory_usage(index=False).sum())
+                self.stats["evictions"] += 1
+
+    def clear(self, disk: bool = False) -> None:
+        """Drop the in-memory entries, and the stored matrices as well if ``disk``"""
+        with self.lock:
+            self.frames.clear()
+            self.total_bytes = 0
+        if disk:
+            for name in os.listdir(self.root):
+                shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
@@ -0,0 +1,186 @@
+import asyncio
+import io
+import time
+from collections import OrderedDict, Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable
+import numpy as np
+import torch
+import torch.nn as nn
+
+BACKENDS = ("eager", "torchscript", "onnx")
+
+
+def compile_predictor(model: Any, n_features: int, backend: str = "eager") -> Callable[[np.ndarray], np.ndarray]:
+    """Turn a trained model into a function from a float32 feature matrix to predictions
+
+    Torch modules are put in eval mode and run without autograd, optionally
+    traced to TorchScript or exported to ONNX (needs ``onnxruntime``).
+    Ensembles stored as a dict of fitted estimators average their members.
+    """
+    if isinstance(model, dict):
+        members = list(model.values())
+        return lambda X: np.mean([member.predict(X) for member in members], axis=0)
+
+    if not isinstance(model, nn.Module):
+        return lambda X: np.asarray(model.predict(X)).ravel()
+
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend {backend}")
+    model.eval()
+    example = torch.zeros(2, n_features)
+
+    if backend == "onnx":
+        import onnxruntime
+
+        buffer = io.BytesIO()
+        torch.onnx.export(model, example, buffer, input_names=["X"], output_names=["y"],
+                          dynamic_axes={"X": {0: "batch"}, "y": {0: "batch"}})
+        session = onnxruntime.InferenceSession(buffer.getvalue(), providers=["CPUExecutionProvider"])
+        return lambda X: session.run(None, {"X": X})[0].ravel()
+
+    if backend == "torchscript":
+        with torch.no_grad():
+            model = torch.jit.optimize_for_inference(torch.jit.trace(model, example))
+
+    def predict(X: np.ndarray) -> np.ndarray:
+        with torch.inference_mode():
+            return model(torch.from_numpy(X)).numpy().ravel()
+
+    return predict
+
+
+class InferenceServer:
+    """Micro-batching inference for trained models
+
+    Concurrent ``predict`` calls for the same model are queued and served
+    by one forward pass over their concatenated rows. A batch is closed once
+    it holds ``max_batch_size`` rows or ``max_wait`` seconds after its first
+    request arrived. Compiled models stay warm, least recently used first,
+    until they hold more than ``max_bytes``; ``size_of`` gives a model's
+    size (the registry's artifact bytes), otherwise its parameters and
+    buffers are counted. Models are loaded and compiled in the default
+    thread pool and forward passes run on a single worker thread, so the
+    event loop keeps queueing the next batch meanwhile.
+    """
+
+    def __init__(self,
+                 loader: Callable[[str], Any],
+                 backend: str = "eager",
+                 max_batch_size: int = 512,
+                 max_wait: float = 0.002,
+                 max_bytes: int = 512 * 2 ** 20,
+                 max_samples: int = 10000,
+                 size_of: Callable[[str], int] = None):
+        self.loader = loader
+        self.backend = backend
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_bytes = max_bytes
+        self.size_of = size_of
+        self.predictors: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.total_bytes = 0
+        self.queues: Dict[str, asyncio.Queue] = {}
+        self.batchers: Dict[str, asyncio.Task] = {}
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.latencies = deque(maxlen=max_samples)
+        self.batch_sizes = Counter()
+        self.requests = 0
+
+    def _compile(self, model_id: str, n_features: int) -> Dict[str, Any]:
+        model = self.loader(model_id)
+        if self.size_of is not None:
+            size = self.size_of(model_id)
+        elif isinstance(model, nn.Module):
+            size = sum(tensor.nbytes for tensor in [*model.parameters(), *model.buffers()])
+        else:
+            size = 0
+        return {"predict": compile_predictor(model, n_features, self.backend), "bytes": size}
+
+    async def _predictor(self, model_id: str, n_features: int) -> Callable[[np.ndarray], np.ndarray]:
+        entry = self.predictors.get(model_id)
+        if entry is None:
+            entry = await asyncio.get_running_loop().run_in_executor(None, self._compile, model_id, n_features)
+            self.evict(model_id)
+            self.predictors[model_id] = entry
+            self.total_bytes += entry["bytes"]
+            # Always keep the model just loaded, even if it alone exceeds the cap
+            while self.total_bytes > self.max_bytes and len(self.predictors) > 1:
+                _, evicted = self.predictors.popitem(last=False)
+                self.total_bytes -= evicted["bytes"]
+        self.predictors.move_to_end(model_id)
+        return entry["predict"]
+
+    def evict(self, model_id: str = None) -> None:
+        """Drop compiled models so the next request reloads them"""
+        if model_id is None:
+            self.predictors.clear()
+            self.total_bytes = 0
+        elif model_id in self.predictors:
+            self.total_bytes -= self.predictors.pop(model_id)["bytes"]
+
+    async def predict(self, model_id: str, X: np.ndarray) -> np.ndarray:
+        """Predict one feature matrix, batched with concurrent requests for the same model"""
+        started = time.perf_counter()
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        future = asyncio.get_running_loop().create_future()
+        queue = self.queues.get(model_id)
+        if queue is None:
+            queue = self.queues[model_id] = asyncio.Queue()
+        await queue.put((X, future))
+
+        if model_id not in self.batchers or self.batchers[model_id].done():
+            self.batchers[model_id] = asyncio.create_task(self._batch_loop(model_id, queue))
+
+        predictions = await future
+        self.latencies.append(time.perf_counter() - started)
+        self.requests += 1
+        return predictions
+
+    async def _batch_loop(self, model_id: str, queue: asyncio.Queue) -> None:
+        loop = asyncio.get_running_loop()
+        while not queue.empty():
+            batch = [queue.get_nowait()]
+            rows = len(batch[0][0])
+            deadline = loop.time() + self.max_wait
+            while rows < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    request = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(request)
+                rows += len(request[0])
+
+            inputs = [X for X, _ in batch]
+            try:
+                predictor = await self._predictor(model_id, inputs[0].shape[1])
+                predictions = await loop.run_in_executor(
+                    self.executor, predictor, np.concatenate(inputs) if len(inputs) > 1 else inputs[0]
+                )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batch_sizes[1 << max(rows - 1, 0).bit_length()] += 1
+            offsets = np.cumsum([0] + [len(X) for X in inputs])
+            for (_, future), start, end in zip(batch, offsets[:-1], offsets[1:]):
+                if not future.done():
+                    future.set_result(predictions[start:end])
+
+    def stats(self) -> Dict[str, Any]:
+        """Latency percentiles in milliseconds and the batch-size histogram"""
+        latencies = np.asarray(self.latencies) * 1e3
+        return {
+            "requests": self.requests,
+            "p50_latency_ms": float(np.percentile(latencies, 50)) if len(latencies) else None,
+            "p99_latency_ms": float(np.percentile(latencies, 99)) if len(latencies) else None,
+            # Rows per forward pass, bucketed by the next power of two
+            "batch_size_histogram": dict(sorted(self.batch_sizes.items())),
+            "warm_models": list(self.predictors),
+            "warm_bytes": self.total_bytes
+        }
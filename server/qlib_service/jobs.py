@@ -0,0 +1,310 @@
+import asyncio
+import functools
+import json
+import math
+import multiprocessing
+import numbers
+import os
+import sqlite3
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Callable, Awaitable, Optional, AsyncIterator
+from .quantum_service import QuantumTradingService
+
+TERMINAL_STATES = ("succeeded", "failed", "cancelled")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT,
+    result TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+)
+"""
+
+
+def _finite(value: Any) -> Any:
+    """Non-finite floats as None, since API responses are serialized with allow_nan=False"""
+    if isinstance(value, numbers.Real) and not isinstance(value, numbers.Integral):
+        # numpy floats included, which json would otherwise stringify
+        value = float(value)
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(item) for item in value]
+    return value
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when cancellation was requested"""
+
+
+class JobStore:
+    """Job state in a SQLite file shared by the API process and the job workers"""
+
+    def __init__(self, path: str):
+        self.path = os.path.expanduser(path)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def create(self, kind: str, params: Dict[str, Any]) -> str:
+        job_id = uuid.uuid4().hex
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT INTO jobs (id, kind, status, params, created_at) VALUES (?, ?, 'queued', ?, ?)",
+                (job_id, kind, json.dumps(params, default=str), time.time())
+            )
+        return job_id
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        if "result" in fields:
+            fields["result"] = json.dumps(_finite(fields["result"]), default=str, allow_nan=False)
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as connection:
+            connection.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as connection:
+            row = connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row is not None else None
+
+    def list(self, status: str = None, limit: int = 100) -> List[Dict[str, Any]]:
+        query, args = "SELECT * FROM jobs", ()
+        if status is not None:
+            query, args = query + " WHERE status = ?", (status,)
+        with self._connect() as connection:
+            rows = connection.execute(query + " ORDER BY created_at DESC LIMIT ?", (*args, limit)).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def cancel_requested(self, job_id: str) -> bool:
+        with self._connect() as connection:
+            row = connection.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row["cancel_requested"])
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+
+async def _train_model(service: QuantumTradingService,
+                       params: Dict[str, Any],
+                       progress: Callable[[float], None]) -> Dict[str, Any]:
+    return await service.train_model(params, on_progress=progress)
+
+
+async def _backtest(service: QuantumTradingService,
+                    params: Dict[str, Any],
+                    progress: Callable[[float], None]) -> Dict[str, Any]:
+    return await service.run_backtest(params)
+
+
+async def _parameter_sweep(service: QuantumTradingService,
+                           params: Dict[str, Any],
+                           progress: Callable[[float], None]) -> Dict[str, Any]:
+    total = 1
+    for values in params["grid"].values():
+        total *= len(values)
+    finished = []
+    return await service.run_parameter_sweep(
+        params, on_result=lambda record: (finished.append(record), progress(len(finished) / total))
+    )
+
+
+async def _optimize_portfolio(service: QuantumTradingService,
+                              params: Dict[str, Any],
+                              progress: Callable[[float], None]) -> Dict[str, Any]:
+    return await service.optimize_portfolio(params.get("portfolio_id"), params.get("constraints", {}))
+
+
+async def _efficient_frontier(service: QuantumTradingService,
+                              params: Dict[str, Any],
+                              progress: Callable[[float], None]) -> Dict[str, Any]:
+    return await service.efficient_frontier(params)
+
+
+JOB_HANDLERS: Dict[str, Callable[..., Awaitable[Dict[str, Any]]]] = {
+    "train_model": _train_model,
+    "backtest": _backtest,
+    "parameter_sweep": _parameter_sweep,
+    "optimize_portfolio": _optimize_portfolio,
+    "efficient_frontier": _efficient_frontier
+}
+
+# One service and event loop per worker process, reused by every job it runs
+_WORKER: Dict[str, Any] = {}
+
+
+def _worker_service() -> QuantumTradingService:
+    if "service" not in _WORKER:
+        _WORKER["loop"] = asyncio.new_event_loop()
+        _WORKER["service"] = QuantumTradingService()
+        _WORKER["loop"].run_until_complete(_WORKER["service"].initialize_services())
+    return _WORKER["service"]
+
+
+def _run_job(db_path: str, job_id: str, kind: str, params: Dict[str, Any]) -> None:
+    """Run one job in a worker process, recording progress and the outcome in the store"""
+    store = JobStore(db_path)
+    if store.cancel_requested(job_id):
+        store.update(job_id, status="cancelled", finished_at=time.time())
+        return
+    store.update(job_id, status="running", started_at=time.time())
+
+    def progress(fraction: float) -> None:
+        store.update(job_id, progress=min(max(float(fraction), 0.0), 1.0))
+        if store.cancel_requested(job_id):
+            raise JobCancelled(job_id)
+
+    try:
+        service = _worker_service()
+        result = _WORKER["loop"].run_until_complete(JOB_HANDLERS[kind](service, params, progress))
+    except JobCancelled:
+        store.update(job_id, status="cancelled", finished_at=time.time())
+        return
+    except Exception as e:
+        store.update(job_id, status="failed", message=str(e), finished_at=time.time())
+        return
+
+    # Service methods report errors in their result, which is also where a
+    # cancellation raised from a progress callback ends up
+    if store.cancel_requested(job_id):
+        store.update(job_id, status="cancelled", finished_at=time.time())
+    elif result.get("status") == "error":
+        store.update(job_id, status="failed", message=result.get("message"), finished_at=time.time())
+    else:
+        store.update(job_id, status="succeeded", progress=1.0, result=result, finished_at=time.time())
+
+
+class JobQueue:
+    """Background jobs run in a bounded process pool with their state kept in SQLite
+
+    ``submit`` returns a job id straight away. Workers each keep one
+    ``QuantumTradingService`` and write progress to the store, where the API
+    process reads it; cancellation is a flag that queued jobs check before
+    starting and running jobs check whenever they report progress. On
+    ``start`` jobs left queued or running by a previous process are
+    submitted again. Store calls made from the event loop run in the
+    default thread pool so SQLite never blocks it.
+    """
+
+    def __init__(self, db_path: str = None, max_workers: int = 2, poll_interval: float = 0.5):
+        self.db_path = os.path.expanduser(
+            db_path or os.environ.get("QLIB_JOB_DB", "~/.qlib/jobs.sqlite")
+        )
+        self.store = JobStore(self.db_path)
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+        self.pool = None
+        self.futures: Dict[str, asyncio.Future] = {}
+
+    async def _in_thread(self, call: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(call, *args))
+
+    async def start(self) -> None:
+        """Create the worker pool and resubmit jobs interrupted by a restart"""
+        if self.pool is not None:
+            return
+        # Spawned workers do not inherit the API process's event loop and threads
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        interrupted = await self._in_thread(self._requeue_interrupted)
+        for job in interrupted:
+            self._dispatch(job["id"], job["kind"], job["params"])
+
+    def _requeue_interrupted(self) -> List[Dict[str, Any]]:
+        jobs = list(reversed(self.store.list(status="running") + self.store.list(status="queued")))
+        for job in jobs:
+            self.store.update(job["id"], status="queued", progress=0.0)
+        return jobs
+
+    async def shutdown(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+
+    async def submit(self, kind: str, params: Dict[str, Any]) -> str:
+        """Queue a job and return its id"""
+        if kind not in JOB_HANDLERS:
+            raise ValueError(f"Unknown job kind {kind}")
+        if self.pool is None:
+            await self.start()
+        job_id = await self._in_thread(self.store.create, kind, params)
+        self._dispatch(job_id, kind, params)
+        return job_id
+
+    def _dispatch(self, job_id: str, kind: str, params: Dict[str, Any]) -> None:
+        future = asyncio.get_running_loop().run_in_executor(self.pool, _run_job, self.db_path, job_id, kind, params)
+        self.futures[job_id] = future
+        future.add_done_callback(lambda done: self._finished(job_id, done))
+
+    def _finished(self, job_id: str, future: asyncio.Future) -> None:
+        self.futures.pop(job_id, None)
+        if future.cancelled():
+            # Dropped at shutdown before starting; left queued for the next start
+            return
+        error = future.exception()
+        asyncio.get_running_loop().run_in_executor(None, self._record_exit, job_id, error)
+
+    def _record_exit(self, job_id: str, error: Optional[BaseException]) -> None:
+        job = self.store.get(job_id)
+        if job is None or job["status"] in TERMINAL_STATES:
+            return
+        # The worker process died before recording an outcome
+        self.store.update(job_id, status="failed", message=str(error), finished_at=time.time())
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self._in_thread(self.store.get, job_id)
+
+    async def list(self, status: str = None, limit: int = 100) -> List[Dict[str, Any]]:
+        return await self._in_thread(self.store.list, status, limit)
+
+    async def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Request cancellation; jobs still waiting for a worker are cancelled immediately"""
+        return await self._in_thread(self._cancel, job_id)
+
+    def _cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self.store.get(job_id)
+        if job is None or job["status"] in TERMINAL_STATES:
+            return job
+        if job["status"] == "queued":
+            # The worker sees the flag and skips the job when it gets to it
+            self.store.update(job_id, cancel_requested=1, status="cancelled", finished_at=time.time())
+        else:
+            self.store.update(job_id, cancel_requested=1)
+        return self.store.get(job_id)
+
+    async def watch(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the job whenever its status or progress changes, until it finishes"""
+        last = None
+        while True:
+            job = await self.get(job_id)
+            if job is None:
+                return
+            state = (job["status"], job["progress"])
+            if state != last:
+                last = state
+                yield job
+            if job["status"] in TERMINAL_STATES:
+                return
+            await asyncio.sleep(self.poll_interval)
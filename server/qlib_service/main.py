@@ -1,8 +1,12 @@
 import os
-from fastapi import FastAPI, HTTPException
+import json
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-import yfinance as yf
-from typing import Dict
+from fastapi.responses import StreamingResponse
+from typing import Dict, List, Any
+from .quantum_service import QuantumTradingService
+from .jobs import JobQueue
+from .quotes import QuoteBoard
 
 app = FastAPI(title="Quantum Trading Service")
 
@@ -17,75 +21,68 @@ app.add_middleware(
 
 
 @app.get("/api/market-status")
-async def get_market_status() -> Dict:
+async def get_market_status(symbols: List[str] = Query(["AAPL"])) -> Dict:
+    """Latest quotes from the in-memory snapshot; the first symbol's are also top-level"""
     try:
-        # Get real market data for AAPL
-        ticker = yf.Ticker("AAPL")
-        info = ticker.info
-
-        return {
-            "status": "success",
-            "price": info.get('regularMarketPrice', 0),
-            "change": info.get('regularMarketChangePercent', 0),
-            "volume": info.get('regularMarketVolume', 0)
-        }
+        quotes = await quote_board.get(symbols)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=502, detail=str(e))
+    if quotes[symbols[0]] is None:
+        raise HTTPException(status_code=404, detail=f"No quote for {symbols[0]}")
+    return {"status": "success", **quotes[symbols[0]], "quotes": quotes}
+
+@app.get("/api/market-status/stats")
+async def get_market_status_stats():
+    """Snapshot hits, misses and upstream refreshes of the quote board"""
+    return {"status": "success", "stats": quote_board.stats, "symbols": sorted(quote_board.symbols)}
 
 # Initialize Qlib
 #provider_uri = "~/.qlib/qlib_data/cn_data"  # target_dir
 #qlib.init(provider_uri=provider_uri, region=REG_CN)
 
 # Initialize services
-#quantum_service = QuantumTradingService()
+quantum_service = QuantumTradingService()
+job_queue = JobQueue(max_workers=int(os.environ.get("QLIB_JOB_WORKERS", 2)))
+quote_board = QuoteBoard(
+    symbols=os.environ.get("QLIB_QUOTE_SYMBOLS", "AAPL").split(","),
+    refresh_interval=float(os.environ.get("QLIB_QUOTE_REFRESH", 15))
+)
 
-#@app.on_event("startup")
-#async def startup_event():
-#    await quantum_service.initialize_services()
+@app.on_event("startup")
+async def startup_event():
+    await quantum_service.initialize_services()
+    await job_queue.start()
+    await quote_board.start()
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    await job_queue.shutdown()
+    await quote_board.stop()
 
-@app.post("/api/train-model")
-async def train_model(model_config: dict):
+async def submit_job(kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Queue a long-running job and return its id for polling"""
     try:
-        #model = init_instance_by_config(model_config)
-        #dataset = R.get_data()
-        #model.fit(dataset)
-        
-        return {
-            "status": "success",
-            #"model_id": str(model.id)
-            "model_id": "placeholder"
-        }
+        return {"status": "success", "job_id": await job_queue.submit(kind, params)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+
+@app.post("/api/train-model")
+async def train_model(model_config: dict):
+    """Queue model training; the trained model id is in the job result"""
+    return await submit_job("train_model", model_config)
+
 @app.post("/api/backtest")
 async def run_backtest(config: dict):
-    try:
-        #backtest_config = {
-        #    "start_time": "2023-01-01",
-        #    "end_time": "2024-01-01",
-        #    "account": 100000,
-        #    "benchmark": "AAPL",
-        #    "exchange_kwargs": {
-        #        "limit_threshold": 0.095,
-        #        "deal_price": "close",
-        #        "open_cost": 0.0005,
-        #        "close_cost": 0.0015,
-        #        "min_cost": 5,
-        #    },
-        #}
-        
-        # Initialize backtest environment
-        #backtest = R.get_backtest(backtest_config)
-        #results = backtest.run()
-        
-        return {
-            "status": "success",
-            "results": [] #placeholder
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    # e.g. {"instruments": [...], "start_time": "2023-01-01", "end_time": "2024-01-01",
+    #       "account": 100000, "exchange_kwargs": {"limit_threshold": 0.095,
+    #       "open_cost": 0.0005, "close_cost": 0.0015, "min_cost": 5}}
+    return await submit_job("backtest", config)
+
+@app.post("/api/backtest/sweep")
+async def run_backtest_sweep(config: dict):
+    """Backtest a parameter grid, e.g. {"grid": {"fast_window": [10, 20], "slow_window": [50, 100]}}"""
+    return await submit_job("parameter_sweep", config)
 
 @app.get("/api/portfolio-analysis")
 async def get_portfolio_analysis():
@@ -128,10 +125,12 @@ async def get_alpha_signals(symbols: List[str]):
 @app.post("/api/portfolio/optimize")
 async def optimize_portfolio(portfolio_id: str, constraints: Dict[str, Any]):
     """Optimize portfolio with given constraints"""
-    try:
-        return {"status": "success", "optimized_portfolio": {}} #placeholder
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await submit_job("optimize_portfolio", {"portfolio_id": portfolio_id, "constraints": constraints})
+
+@app.post("/api/portfolio/frontier")
+async def efficient_frontier(config: dict):
+    """Queue an efficient frontier, e.g. {"instruments": [...], "risk_aversions": [0.5, 1, 2, 4]}"""
+    return await submit_job("efficient_frontier", config)
 
 @app.get("/api/portfolio/analytics/{portfolio_id}")
 async def get_portfolio_analytics(portfolio_id: str):
@@ -145,22 +144,53 @@ async def get_portfolio_analytics(portfolio_id: str):
 async def execute_trades(trades: List[Dict[str, Any]], execution_style: str = "vwap"):
     """Execute trades with specified algorithm"""
     try:
-        return {"status": "success", "execution_report": []} #placeholder
+        result = await quantum_service.execute_trades(trades, execution_style)
+        if result["status"] != "success":
+            raise HTTPException(status_code=500, detail=result["message"])
+        return {"status": "success", "execution_report": result["execution_results"]}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/models/inference-stats")
+async def get_inference_stats():
+    """Latency percentiles and batch sizes of the model inference server"""
+    return {"status": "success", "stats": quantum_service.model_manager.inference.stats()}
+
+@app.get("/api/jobs")
+async def list_jobs(status: str = None, limit: int = 100):
+    """List recent jobs, newest first"""
+    return {"status": "success", "jobs": await job_queue.list(status, limit)}
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Job status, progress and, once finished, its result"""
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return {"status": "success", "job": job}
+
+@app.post("/api/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """Cancel a queued job, or ask a running one to stop at its next progress update"""
+    job = await job_queue.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return {"status": "success", "job": job}
+
+@app.get("/api/jobs/{job_id}/events")
+async def stream_job(job_id: str):
+    """Server-sent events with the job state on every change until it finishes"""
+    if await job_queue.get(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+
+    async def events():
+        async for job in job_queue.watch(job_id):
+            yield f"data: {json.dumps(job, default=str)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=5000)
-from typing import List, Dict, Any
-#import qlib
-#from qlib.constant import REG_CN
-#from qlib.utils import init_instance_by_config
-#from qlib.workflow import R
-#from qlib.workflow.record_temp import SignalRecord, PortAnaRecord
-#from qlib.data.dataset.handler import DataHandlerLP
-#import pandas as pd
-#from datetime import datetime
-#import pytz
-#import numpy as np
-#from .quantum_service import QuantumTradingService
\ No newline at end of file
@@ -1,3 +1,5 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Any, Optional
@@ -6,102 +8,129 @@ import talib as ta
 from sklearn.cluster import KMeans
 from statsmodels.tsa.stattools import adfuller
 import ccxt
+from .ohlcv_cache import OHLCVCache
 
 class MarketAnalysisService:
-    def __init__(self):
-        self.exchange = ccxt.binance()
-        self.cache = {}
+    def __init__(self,
+                 exchange: Any = None,
+                 max_workers: int = 16,
+                 cache_ttl: float = 10.0,
+                 cache_bytes: int = 64 * 2 ** 20):
+        self.exchange = exchange or ccxt.binance()
+        # ccxt's sync client blocks, so exchange calls run on this pool, as
+        # do the CPU-bound analyses so a caller's timeout can bound them
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        # Candles are shared by every analysis of the same symbol/timeframe
+        self.cache = OHLCVCache(self._fetch_ohlcv_rows, ttl=cache_ttl, max_bytes=cache_bytes)
+
+    async def _call_exchange(self, method: str, *args) -> Any:
+        """Run a blocking exchange call without stalling the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, getattr(self.exchange, method), *args)
+
+    async def _compute(self, function, *args) -> Any:
+        """Run a CPU-bound analysis step without stalling the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, function, *args)
+
+    async def _fetch_ohlcv_rows(self, symbol: str, timeframe: str, since: Optional[int]) -> List[List[float]]:
+        """Fetch raw candles from the exchange, optionally only from ``since`` (ms)"""
+        return await self._call_exchange("fetch_ohlcv", symbol, timeframe, since)
+
+    async def _fetch_ohlcv(self, symbol: str, timeframe: str) -> pd.DataFrame:
+        """Fetch candles for a symbol as a DataFrame, served from the shared cache"""
+        return await self.cache.get(symbol, timeframe)
         
     async def analyze_price_action(self, symbol: str, timeframe: str = '1d') -> Dict[str, Any]:
         """Analyze price action patterns and trends"""
         try:
-            ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe)
-            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            
-            # Calculate key levels
-            pivots = self._calculate_pivot_points(df)
-            
-            # Identify candlestick patterns
-            patterns = self._identify_candlestick_patterns(df)
-            
-            # Calculate trend strength
-            trend = self._calculate_trend_strength(df)
-            
-            return {
-                "status": "success",
-                "pivots": pivots,
-                "patterns": patterns,
-                "trend": trend
-            }
+            df = await self._fetch_ohlcv(symbol, timeframe)
+            return {"status": "success", **await self._compute(self._price_action, df)}
         except Exception as e:
             return {"status": "error", "message": str(e)}
+
+    def _price_action(self, df: pd.DataFrame) -> Dict[str, Any]:
+        # Calculate key levels
+        pivots = self._calculate_pivot_points(df)
+        
+        # Identify candlestick patterns
+        patterns = self._identify_candlestick_patterns(df)
+        
+        # Calculate trend strength
+        trend = self._calculate_trend_strength(df)
+        
+        return {
+            "pivots": pivots,
+            "patterns": patterns,
+            "trend": trend
+        }
     
     async def analyze_volume_profile(self, symbol: str, timeframe: str = '1d') -> Dict[str, Any]:
         """Analyze volume profile and identify key levels"""
         try:
-            ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe)
-            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            
-            # Calculate Volume Profile
-            price_volume = pd.DataFrame({
-                'price': df['close'],
-                'volume': df['volume']
-            })
-            
-            # Use KMeans to identify volume clusters
-            kmeans = KMeans(n_clusters=5)
-            price_volume['cluster'] = kmeans.fit_predict(price_volume[['price', 'volume']])
-            
-            # Identify high volume nodes
-            volume_nodes = []
-            for cluster in range(5):
-                cluster_data = price_volume[price_volume['cluster'] == cluster]
-                volume_nodes.append({
-                    'price_level': cluster_data['price'].mean(),
-                    'volume': cluster_data['volume'].sum()
-                })
-                
-            return {
-                "status": "success",
-                "volume_nodes": volume_nodes,
-                "profile": price_volume.to_dict('records')
-            }
+            df = await self._fetch_ohlcv(symbol, timeframe)
+            return {"status": "success", **await self._compute(self._volume_profile, df)}
         except Exception as e:
             return {"status": "error", "message": str(e)}
+
+    def _volume_profile(self, df: pd.DataFrame) -> Dict[str, Any]:
+        # Calculate Volume Profile
+        price_volume = pd.DataFrame({
+            'price': df['close'],
+            'volume': df['volume']
+        })
+        
+        # Use KMeans to identify volume clusters
+        kmeans = KMeans(n_clusters=5)
+        price_volume['cluster'] = kmeans.fit_predict(price_volume[['price', 'volume']])
+        
+        # Identify high volume nodes
+        volume_nodes = []
+        for cluster in range(5):
+            cluster_data = price_volume[price_volume['cluster'] == cluster]
+            volume_nodes.append({
+                'price_level': cluster_data['price'].mean(),
+                'volume': cluster_data['volume'].sum()
+            })
+            
+        return {
+            "volume_nodes": volume_nodes,
+            "profile": price_volume.to_dict('records')
+        }
     
     async def detect_market_regime(self, symbol: str) -> Dict[str, Any]:
         """Detect current market regime using multiple indicators"""
         try:
-            ohlcv = self.exchange.fetch_ohlcv(symbol, '1d')
-            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            
-            # Calculate volatility regime
-            returns = df['close'].pct_change()
-            volatility = returns.rolling(20).std() * np.sqrt(252)
-            current_vol = volatility.iloc[-1]
-            
-            # Calculate trend regime
-            sma_20 = df['close'].rolling(20).mean()
-            sma_50 = df['close'].rolling(50).mean()
-            trend = "bullish" if sma_20.iloc[-1] > sma_50.iloc[-1] else "bearish"
-            
-            # Test for mean reversion
-            adf_result = adfuller(df['close'])
-            mean_reverting = adf_result[1] < 0.05
-            
-            return {
-                "status": "success",
-                "volatility_regime": "high" if current_vol > volatility.mean() + volatility.std() else "low",
-                "trend_regime": trend,
-                "mean_reverting": mean_reverting
-            }
+            df = await self._fetch_ohlcv(symbol, '1d')
+            return {"status": "success", **await self._compute(self._market_regime, df)}
         except Exception as e:
             return {"status": "error", "message": str(e)}
+
+    def _market_regime(self, df: pd.DataFrame) -> Dict[str, Any]:
+        # Calculate volatility regime
+        returns = df['close'].pct_change()
+        volatility = returns.rolling(20).std() * np.sqrt(252)
+        current_vol = volatility.iloc[-1]
+        
+        # Calculate trend regime
+        sma_20 = df['close'].rolling(20).mean()
+        sma_50 = df['close'].rolling(50).mean()
+        trend = "bullish" if sma_20.iloc[-1] > sma_50.iloc[-1] else "bearish"
+        
+        # Test for mean reversion
+        adf_result = adfuller(df['close'])
+        mean_reverting = adf_result[1] < 0.05
+        
+        return {
+            "volatility_regime": "high" if current_vol > volatility.mean() + volatility.std() else "low",
+            "trend_regime": trend,
+            "mean_reverting": mean_reverting
+        }
     
     async def analyze_institutional_flow(self, symbol: str) -> Dict[str, Any]:
         """Analyze institutional trading flows"""
         try:
-            trades = self.exchange.fetch_trades(symbol)
+            trades = await self._call_exchange("fetch_trades", symbol)
             df = pd.DataFrame(trades)
             
             # Identify large trades
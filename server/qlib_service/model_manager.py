@@ -1,4 +1,10 @@
-from typing import List, Dict, Any, Optional
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 import numpy as np
 import pandas as pd
 from qlib.model.base import Model
@@ -6,14 +12,118 @@ from qlib.workflow import R
 from qlib.workflow.record_temp import SignalRecord
 import torch
 import torch.nn as nn
-from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
-from datetime import datetime
+from torch.utils.data import Dataset, DataLoader, BatchSampler, RandomSampler, SequentialSampler
+from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor, HistGradientBoostingRegressor
+from sklearn.metrics import r2_score
+from .rolling import rolling_mean, rolling_std, pct_change, derive_inputs
+from .model_registry import ModelRegistry
+from .inference import InferenceServer
+from .feature_cache import FeatureCache
+
+# Bar fields read by _engineer_features; only these invalidate cached features
+FEATURE_SOURCE_FIELDS = ["$close", "$high", "$low", "$volume"]
+
+class MemmapBatchDataset(Dataset):
+    """Rows of memory-mapped feature and target arrays, read one batch at a time
+
+    Indexed with a list of positions (via a BatchSampler) so each batch is a
+    single fancy-indexed read. The arrays are opened lazily so DataLoader
+    workers map the files themselves instead of receiving pickled copies.
+    """
+
+    def __init__(self, x_path: str, y_path: str, indices: np.ndarray):
+        self.x_path = x_path
+        self.y_path = y_path
+        self.indices = indices
+        self.X = None
+        self.y = None
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __getitem__(self, positions: List[int]):
+        if self.X is None:
+            self.X = np.load(self.x_path, mmap_mode="r")
+            self.y = np.load(self.y_path, mmap_mode="r")
+        rows = np.sort(self.indices[positions])
+        return torch.from_numpy(self.X[rows]), torch.from_numpy(self.y[rows]).view(-1, 1)
+
+
+def _fit_ensemble_member(name: str, model: Any, x_path: str, y_path: str) -> Tuple[str, Any, np.ndarray, float]:
+    """Fit one ensemble member in a worker process and predict the training set once"""
+    X = np.load(x_path, mmap_mode="r")
+    y = np.load(y_path, mmap_mode="r")
+    started = time.perf_counter()
+    model.fit(X, y)
+    fit_time = time.perf_counter() - started
+    return name, model, model.predict(X), fit_time
+
+
+def _run_walk_forward_chain(windows: List[Dict[str, Any]],
+                            x_path: str,
+                            y_path: str,
+                            architecture: Dict[str, Any],
+                            model_config: Dict[str, Any],
+                            warm_start: bool,
+                            threads: int) -> Tuple[List[Dict[str, Any]], Dict[str, torch.Tensor]]:
+    """Train consecutive walk-forward windows in a worker process
+
+    Each window after the first starts from the previous window's weights
+    and trains for ``warm_epochs`` instead of ``epochs``. Returns per-window
+    results with out-of-sample predictions and the last model's weights.
+    """
+    torch.set_num_threads(threads)
+    X = np.load(x_path, mmap_mode="r")
+    results, state = [], None
+    for window in windows:
+        model = AdvancedModelManager._build_deep_learning_model(**architecture)
+        config = model_config
+        if warm_start and state is not None:
+            model.load_state_dict(state)
+            config = {**model_config, "epochs": model_config.get("warm_epochs", 10)}
+
+        started = time.perf_counter()
+        history = AdvancedModelManager._fit_streaming(model, x_path, y_path, window["train_rows"], config)
+        fit_time = time.perf_counter() - started
+
+        with torch.inference_mode():
+            predictions = model(torch.from_numpy(X[window["test_rows"]])).numpy().ravel()
+        state = model.state_dict()
+        results.append({
+            "test_rows": window["test_rows"],
+            "predictions": predictions,
+            "summary": {
+                "train_start": window["train_start"],
+                "test_start": window["test_start"],
+                "test_end": window["test_end"],
+                "warm_started": config is not model_config,
+                "epochs_trained": len(history),
+                "validation_loss": min(epoch["val_loss"] for epoch in history),
+                "fit_time": fit_time
+            }
+        })
+    return results, state
+
 
 class AdvancedModelManager:
-    def __init__(self):
-        self.models = {}
+    def __init__(self, feature_dir: str = None, registry_dir: str = None, max_model_bytes: int = 512 * 2 ** 20):
         self.feature_processors = {}
         self.performance_metrics = {}
+        self.feature_dir = os.path.expanduser(
+            feature_dir or os.environ.get("QLIB_FEATURE_STORE", "~/.qlib/feature_store")
+        )
+        # Trained models are persisted and loaded lazily, so they survive
+        # restarts and can be shared by worker processes
+        self.models = ModelRegistry(
+            registry_dir or os.environ.get("QLIB_MODEL_REGISTRY", "~/.qlib/model_registry"),
+            builders={"dl_model": self._build_deep_learning_model},
+            max_bytes=max_model_bytes
+        )
+        self.feature_cache = FeatureCache(os.path.join(self.feature_dir, "cache"))
+        self.inference = InferenceServer(
+            self.models.get, backend=os.environ.get("QLIB_INFERENCE_BACKEND", "eager"),
+            max_bytes=max_model_bytes, size_of=lambda model_id: self.models.metadata(model_id)["bytes"]
+        )
 
     async def train_deep_learning_model(self, 
                                      data: pd.DataFrame,
@@ -22,41 +132,46 @@ class AdvancedModelManager:
         """Train a deep learning model for market prediction"""
         try:
             # Feature engineering
-            features = self._engineer_features(data)
-
-            # Prepare data
-            X = features.values
-            y = data[target_column].values
-
-            # Define model architecture
-            model = self._build_deep_learning_model(
-                input_dim=X.shape[1],
-                hidden_dims=model_config.get("hidden_dims", [64, 32]),
-                dropout=model_config.get("dropout", 0.2)
-            )
+            features = self._cached_features(data)
 
-            # Train model
-            criterion = nn.MSELoss()
-            optimizer = torch.optim.Adam(model.parameters(), lr=model_config.get("learning_rate", 0.001))
+            # Write features and targets to memory-mapped float32 arrays
+            os.makedirs(self.feature_dir, exist_ok=True)
+            run_dir = tempfile.mkdtemp(dir=self.feature_dir, prefix="train-")
+            try:
+                x_path = os.path.join(run_dir, "X.npy")
+                y_path = os.path.join(run_dir, "y.npy")
+                np.save(x_path, features.to_numpy(dtype=np.float32))
+                np.save(y_path, data[target_column].to_numpy(dtype=np.float32))
 
-            X_tensor = torch.FloatTensor(X)
-            y_tensor = torch.FloatTensor(y)
+                architecture = {
+                    "input_dim": features.shape[1],
+                    "hidden_dims": model_config.get("hidden_dims", [64, 32]),
+                    "dropout": model_config.get("dropout", 0.2)
+                }
+                model = self._build_deep_learning_model(**architecture)
+                history = self._fit_streaming(model, x_path, y_path, np.arange(len(features)), model_config)
+            finally:
+                shutil.rmtree(run_dir, ignore_errors=True)
 
-            for epoch in range(model_config.get("epochs", 100)):
-                optimizer.zero_grad()
-                outputs = model(X_tensor)
-                loss = criterion(outputs, y_tensor)
-                loss.backward()
-                optimizer.step()
+            metrics = {
+                "training_loss": history[-1]["train_loss"],
+                "validation_loss": min(epoch["val_loss"] for epoch in history),
+                "epochs_trained": len(history)
+            }
 
             # Save model
-            model_id = f"dl_model_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            self.models[model_id] = model
+            model_id = self.models.new_id("dl_model")
+            self.models.save(
+                model_id, model, "dl_model",
+                metadata=self._training_metadata(features, data, target_column, metrics),
+                architecture=architecture
+            )
 
             return {
                 "status": "success",
                 "model_id": model_id,
-                "training_loss": loss.item()
+                **metrics,
+                "history": history
             }
         except Exception as e:
             return {
@@ -64,50 +179,272 @@ class AdvancedModelManager:
                 "message": str(e)
             }
 
+    @staticmethod
+    def _fit_streaming(model: nn.Module,
+                       x_path: str,
+                       y_path: str,
+                       indices: np.ndarray,
+                       model_config: Dict[str, Any]) -> List[Dict[str, float]]:
+        """Mini-batch training from memory-mapped arrays with early stopping
+
+        Trains on the rows at ``indices``. The last ``validation_split`` of
+        them (chronologically) is held out; training stops after ``patience``
+        epochs without a validation improvement and the best weights are
+        restored. An ``on_epoch`` callable in the config is called with each
+        epoch's history entry.
+        """
+        batch_size = model_config.get("batch_size", 1024)
+        num_workers = model_config.get("num_workers", 2)
+        patience = model_config.get("patience", 10)
+        n_val = max(int(len(indices) * model_config.get("validation_split", 0.2)), 1)
+        train_set = MemmapBatchDataset(x_path, y_path, indices[:-n_val])
+        val_set = MemmapBatchDataset(x_path, y_path, indices[-n_val:])
+
+        loader_args = {"batch_size": None, "num_workers": num_workers, "persistent_workers": num_workers > 0}
+        train_loader = DataLoader(
+            train_set,
+            sampler=BatchSampler(
+                RandomSampler(train_set), batch_size,
+                # BatchNorm cannot train on a single-row batch
+                drop_last=len(train_set) % batch_size == 1
+            ),
+            **loader_args
+        )
+        val_loader = DataLoader(
+            val_set, sampler=BatchSampler(SequentialSampler(val_set), batch_size, drop_last=False), **loader_args
+        )
+
+        criterion = nn.MSELoss()
+        optimizer = torch.optim.Adam(model.parameters(), lr=model_config.get("learning_rate", 0.001))
+
+        history = []
+        best_loss, best_state, stale_epochs = np.inf, None, 0
+        for epoch in range(model_config.get("epochs", 100)):
+            started = time.perf_counter()
+            model.train()
+            train_loss, seen = 0.0, 0
+            for X_batch, y_batch in train_loader:
+                optimizer.zero_grad()
+                loss = criterion(model(X_batch), y_batch)
+                loss.backward()
+                optimizer.step()
+                train_loss += loss.item() * len(X_batch)
+                seen += len(X_batch)
+            elapsed = time.perf_counter() - started
+
+            model.eval()
+            val_loss = 0.0
+            with torch.no_grad():
+                for X_batch, y_batch in val_loader:
+                    val_loss += criterion(model(X_batch), y_batch).item() * len(X_batch)
+            val_loss /= len(val_set)
+
+            history.append({
+                "epoch": epoch + 1,
+                "train_loss": train_loss / max(seen, 1),
+                "val_loss": val_loss,
+                "samples_per_sec": seen / elapsed if elapsed > 0 else float("inf")
+            })
+
+            if model_config.get("on_epoch") is not None:
+                model_config["on_epoch"](history[-1])
+
+            if val_loss < best_loss:
+                best_loss, stale_epochs = val_loss, 0
+                best_state = {k: v.detach().clone() for k, v in model.state_dict().items()}
+            else:
+                stale_epochs += 1
+                if stale_epochs >= patience:
+                    break
+
+        if best_state is not None:
+            model.load_state_dict(best_state)
+        model.eval()
+        return history
+
     async def train_ensemble_model(self,
                                 data: pd.DataFrame,
                                 target_column: str,
                                 ensemble_config: Dict[str, Any]) -> Dict[str, Any]:
-        """Train an ensemble of models"""
+        """Train an ensemble of models
+
+        Members are fitted concurrently in a process pool, the random forest
+        using every core. Above ``hist_threshold`` rows the gradient boosting
+        member switches to the histogram-based implementation.
+        """
         try:
-            features = self._engineer_features(data)
-            X = features.values
-            y = data[target_column].values
+            features = self._cached_features(data)
+            n_estimators = ensemble_config.get("n_estimators", 100)
+            learning_rate = ensemble_config.get("learning_rate", 0.1)
 
             # Train multiple models
+            if len(features) > ensemble_config.get("hist_threshold", 10000):
+                gbm = HistGradientBoostingRegressor(max_iter=n_estimators, learning_rate=learning_rate)
+            else:
+                gbm = GradientBoostingRegressor(n_estimators=n_estimators, learning_rate=learning_rate)
             models = {
                 "rf": RandomForestRegressor(
-                    n_estimators=ensemble_config.get("n_estimators", 100),
-                    max_depth=ensemble_config.get("max_depth", 10)
+                    n_estimators=n_estimators,
+                    max_depth=ensemble_config.get("max_depth", 10),
+                    n_jobs=-1
                 ),
-                "gbm": GradientBoostingRegressor(
-                    n_estimators=ensemble_config.get("n_estimators", 100),
-                    learning_rate=ensemble_config.get("learning_rate", 0.1)
-                )
+                "gbm": gbm
             }
 
-            for name, model in models.items():
-                model.fit(X, y)
+            # Workers read the training set from memory-mapped files instead of
+            # receiving a pickled copy each
+            os.makedirs(self.feature_dir, exist_ok=True)
+            run_dir = tempfile.mkdtemp(dir=self.feature_dir, prefix="ensemble-")
+            try:
+                x_path = os.path.join(run_dir, "X.npy")
+                y_path = os.path.join(run_dir, "y.npy")
+                np.save(x_path, features.to_numpy(dtype=np.float32))
+                y = data[target_column].to_numpy(dtype=np.float32)
+                np.save(y_path, y)
+
+                loop = asyncio.get_running_loop()
+                with ProcessPoolExecutor(max_workers=len(models)) as pool:
+                    fitted = await asyncio.gather(*[
+                        loop.run_in_executor(pool, _fit_ensemble_member, name, model, x_path, y_path)
+                        for name, model in models.items()
+                    ])
+            finally:
+                shutil.rmtree(run_dir, ignore_errors=True)
 
-            # Create ensemble predictions
-            predictions = {}
-            for name, model in models.items():
-                predictions[name] = model.predict(X)
+            models = {name: model for name, model, _, _ in fitted}
+            predictions = {name: prediction for name, _, prediction, _ in fitted}
+            fit_times = {name: fit_time for name, _, _, fit_time in fitted}
 
             # Combine predictions
             ensemble_predictions = np.mean([pred for pred in predictions.values()], axis=0)
 
+            performances = {
+                name: {
+                    "r2_score": float(r2_score(y, predictions[name])),
+                    "fit_time": fit_times[name]
+                }
+                for name in models
+            }
+            ensemble_r2 = float(r2_score(y, ensemble_predictions))
+
             # Save ensemble
-            ensemble_id = f"ensemble_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            self.models[ensemble_id] = models
+            ensemble_id = self.models.new_id("ensemble")
+            self.models.save(
+                ensemble_id, models, "ensemble",
+                metadata=self._training_metadata(
+                    features, data, target_column,
+                    {"model_performances": performances, "ensemble_r2_score": ensemble_r2}
+                )
+            )
 
             return {
                 "status": "success",
                 "ensemble_id": ensemble_id,
-                "model_performances": {
-                    name: {"r2_score": model.score(X, y)}
-                    for name, model in models.items()
-                }
+                "model_performances": performances,
+                "ensemble_r2_score": ensemble_r2
+            }
+        except Exception as e:
+            return {
+                "status": "error",
+                "message": str(e)
+            }
+
+    async def walk_forward(self,
+                           data: pd.DataFrame,
+                           target_column: str,
+                           model_config: Dict[str, Any]) -> Dict[str, Any]:
+        """Walk-forward retraining over rolling windows with stitched out-of-sample predictions
+
+        Windows train on ``train_months`` and predict the following
+        ``test_months``, stepping by ``step_months``. ``horizon`` is how many
+        bars ahead the target looks (0 for a contemporaneous target); that
+        many bars before each test period are purged from its training set,
+        since their labels are only known inside the test period.
+
+        With ``warm_start`` the windows are split into one contiguous chain
+        per worker; within a chain each window continues from the previous
+        weights, and the chains run in parallel processes. Without it every
+        window trains from scratch and all windows run in parallel.
+        """
+        try:
+            features = self._cached_features(data)
+            windows = self._walk_forward_windows(
+                data,
+                model_config.get("train_months", 24),
+                model_config.get("test_months", 1),
+                model_config.get("step_months", 1),
+                model_config.get("horizon", 0)
+            )
+            if not windows:
+                raise ValueError("Not enough history for a single walk-forward window")
+
+            warm_start = model_config.get("warm_start", True)
+            max_workers = min(model_config.get("max_workers", os.cpu_count() or 1), len(windows))
+            chains = np.array_split(np.arange(len(windows)), max_workers if warm_start else len(windows))
+            threads = max((os.cpu_count() or 1) // max_workers, 1)
+            # DataLoader workers cannot be spawned from inside pool workers,
+            # and epoch callbacks cannot be sent to them
+            worker_config = {**model_config, "num_workers": 0, "on_epoch": None}
+            architecture = {
+                "input_dim": features.shape[1],
+                "hidden_dims": model_config.get("hidden_dims", [64, 32]),
+                "dropout": model_config.get("dropout", 0.2)
+            }
+
+            os.makedirs(self.feature_dir, exist_ok=True)
+            run_dir = tempfile.mkdtemp(dir=self.feature_dir, prefix="walk-forward-")
+            try:
+                x_path = os.path.join(run_dir, "X.npy")
+                y_path = os.path.join(run_dir, "y.npy")
+                np.save(x_path, features.to_numpy(dtype=np.float32))
+                np.save(y_path, data[target_column].to_numpy(dtype=np.float32))
+
+                loop = asyncio.get_running_loop()
+                with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                    chain_results = await asyncio.gather(*[
+                        loop.run_in_executor(
+                            pool, _run_walk_forward_chain, [windows[i] for i in chain],
+                            x_path, y_path, architecture, worker_config, warm_start, threads
+                        )
+                        for chain in chains if len(chain)
+                    ])
+            finally:
+                shutil.rmtree(run_dir, ignore_errors=True)
+
+            # Stitch the test windows back into one out-of-sample series
+            oos = np.full(len(data), np.nan)
+            summaries = []
+            for results, _ in chain_results:
+                for result in results:
+                    oos[result["test_rows"]] = result["predictions"]
+                    summaries.append(result["summary"])
+            predictions = pd.Series(oos, index=data.index, name="prediction").dropna()
+            actual = data[target_column].loc[predictions.index]
+
+            metrics = {
+                "oos_mse": float(np.mean((predictions - actual) ** 2)),
+                "oos_correlation": float(np.corrcoef(predictions, actual)[0, 1]),
+                "windows": len(windows),
+                "total_fit_time": sum(summary["fit_time"] for summary in summaries)
+            }
+
+            # The most recent window's model is the one to trade with
+            model = self._build_deep_learning_model(**architecture)
+            model.load_state_dict(chain_results[-1][1])
+            model.eval()
+            model_id = self.models.new_id("dl_model")
+            self.models.save(
+                model_id, model, "dl_model",
+                metadata=self._training_metadata(features, data, target_column, metrics),
+                architecture=architecture
+            )
+
+            return {
+                "status": "success",
+                "model_id": model_id,
+                "metrics": metrics,
+                "windows": summaries,
+                "predictions": predictions
             }
         except Exception as e:
             return {
@@ -115,10 +452,60 @@ class AdvancedModelManager:
                 "message": str(e)
             }
 
-    def _build_deep_learning_model(self, 
-                                input_dim: int,
-                                hidden_dims: List[int],
-                                dropout: float) -> nn.Module:
+    def _walk_forward_windows(self,
+                              data: pd.DataFrame,
+                              train_months: int,
+                              test_months: int,
+                              step_months: int,
+                              horizon: int = 0) -> List[Dict[str, Any]]:
+        """Row positions of each walk-forward window's training and test periods
+
+        Training stops ``horizon`` bars (distinct timestamps) before the test
+        period so no training label overlaps it.
+        """
+        index = data.index.get_level_values(-1) if isinstance(data.index, pd.MultiIndex) else data.index
+        times = pd.DatetimeIndex(index)
+        bars = times.unique().sort_values()
+        windows = []
+        test_start = times.min() + pd.DateOffset(months=train_months)
+        while test_start <= times.max():
+            train_start = test_start - pd.DateOffset(months=train_months)
+            test_end = test_start + pd.DateOffset(months=test_months)
+            purge_from = bars.searchsorted(test_start) - horizon
+            train_end = bars[purge_from] if purge_from >= 0 else bars[0]
+            train_rows = np.flatnonzero((times >= train_start) & (times < train_end))
+            test_rows = np.flatnonzero((times >= test_start) & (times < test_end))
+            if len(train_rows) > 1 and len(test_rows):
+                windows.append({
+                    "train_start": str(train_start),
+                    "train_end": str(train_end),
+                    "test_start": str(test_start),
+                    "test_end": str(test_end),
+                    "train_rows": train_rows,
+                    "test_rows": test_rows
+                })
+            test_start += pd.DateOffset(months=step_months)
+        return windows
+
+    def _training_metadata(self,
+                           features: pd.DataFrame,
+                           data: pd.DataFrame,
+                           target_column: str,
+                           metrics: Dict[str, Any]) -> Dict[str, Any]:
+        """Feature schema, training range and metrics stored alongside a model"""
+        index = data.index.get_level_values(-1) if isinstance(data.index, pd.MultiIndex) else data.index
+        return {
+            "feature_schema": list(features.columns),
+            "target_column": target_column,
+            "training_range": [str(index.min()), str(index.max())] if len(index) else None,
+            "n_samples": len(features),
+            "metrics": metrics
+        }
+
+    @staticmethod
+    def _build_deep_learning_model(input_dim: int,
+                                   hidden_dims: List[int],
+                                   dropout: float) -> nn.Module:
         """Build a deep learning model architecture"""
         layers = []
         prev_dim = input_dim
@@ -136,24 +523,28 @@ class AdvancedModelManager:
 
         return nn.Sequential(*layers)
 
+    def _cached_features(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Engineered features, reused across training and evaluation of the same bars"""
+        return self.feature_cache.get(self._engineer_features, data, FEATURE_SOURCE_FIELDS)
+
     def _engineer_features(self, data: pd.DataFrame) -> pd.DataFrame:
         """Create advanced features for model training"""
         features = pd.DataFrame()
+        inputs = derive_inputs(data)
 
         # Technical indicators
-        features["sma_ratio"] = data["$close"] / data["$close"].rolling(20).mean()
-        features["volatility"] = data["$close"].pct_change().rolling(20).std()
+        features["sma_ratio"] = data["$close"] / rolling_mean(data["$close"], 20)
+        features["volatility"] = rolling_std(inputs["returns"], 20)
         features["volume_price_ratio"] = data["$volume"] / data["$close"]
 
         # Price momentum
         for window in [5, 10, 20, 60]:
-            features[f"momentum_{window}"] = data["$close"].pct_change(window)
+            features[f"momentum_{window}"] = pct_change(data["$close"], window)
 
         # Volatility features
-        log_returns = np.log(data["$close"]).diff()
-        features["realized_vol"] = log_returns.rolling(20).std() * np.sqrt(252)
+        features["realized_vol"] = rolling_std(inputs["log_returns"], 20) * np.sqrt(252)
         features["parkinson_vol"] = np.sqrt(
-            (np.log(data["$high"] / data["$low"]) ** 2).rolling(20).mean() / (4 * np.log(2))
+            rolling_mean(inputs["parkinson"], 20) / (4 * np.log(2))
         )
 
         return features.fillna(0)
@@ -164,19 +555,14 @@ class AdvancedModelManager:
                           target_column: str) -> Dict[str, Any]:
         """Evaluate model performance"""
         try:
-            model = self.models.get(model_id)
-            if model is None:
+            if model_id not in self.models:
                 raise ValueError(f"Model {model_id} not found")
 
-            features = self._engineer_features(test_data)
-            X = features.values
+            features = self._cached_features(test_data)
             y = test_data[target_column].values
 
-            if isinstance(model, dict):  # Ensemble
-                predictions = np.mean([m.predict(X) for m in model.values()], axis=0)
-            else:  # Single model
-                X_tensor = torch.FloatTensor(X)
-                predictions = model(X_tensor).detach().numpy().flatten()
+            # Ensembles and networks alike go through the warm, batched server
+            predictions = await self.inference.predict(model_id, features.to_numpy(dtype=np.float32))
 
             # Calculate metrics
             metrics = {
@@ -0,0 +1,155 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import List, Dict, Any, Callable, Optional
+import joblib
+import torch
+import torch.nn as nn
+
+METADATA_FILE = "metadata.json"
+TORCH_ARTIFACT = "model.pt"
+JOBLIB_ARTIFACT = "model.joblib"
+
+
+class ModelRegistry:
+    """On-disk model registry with a bounded in-memory cache of loaded models
+
+    Layout: ``<root>/<model_id>/metadata.json`` next to either a torch
+    ``state_dict`` (``model.pt``) or a joblib pickle (``model.joblib``).
+    Torch models are rebuilt from the ``architecture`` recorded in their
+    metadata with the builder registered for their ``kind``. Entries are
+    written to a temporary directory and renamed into place, so several
+    processes can share one registry directory and only ever see complete
+    models. Models are loaded on first use and kept least recently used
+    first until the artifacts held exceed ``max_bytes``.
+    """
+
+    def __init__(self,
+                 root: str,
+                 builders: Dict[str, Callable[..., nn.Module]] = None,
+                 max_bytes: int = 512 * 2 ** 20):
+        self.root = os.path.expanduser(root)
+        self.builders = builders or {}
+        self.max_bytes = max_bytes
+        self.loaded: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "loads": 0, "evictions": 0}
+        os.makedirs(self.root, exist_ok=True)
+
+    def _model_dir(self, model_id: str) -> str:
+        return os.path.join(self.root, model_id)
+
+    @staticmethod
+    def new_id(prefix: str) -> str:
+        """Unique model id; the random suffix keeps same-second trainings apart"""
+        return f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+
+    def save(self,
+             model_id: str,
+             model: Any,
+             kind: str,
+             metadata: Dict[str, Any] = None,
+             architecture: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Persist a model with its metadata and keep it loaded"""
+        staging = tempfile.mkdtemp(dir=self.root, prefix=".tmp-")
+        try:
+            if isinstance(model, nn.Module):
+                if kind not in self.builders:
+                    raise ValueError(f"No builder registered for model kind {kind}")
+                artifact = TORCH_ARTIFACT
+                torch.save(model.state_dict(), os.path.join(staging, artifact))
+            else:
+                artifact = JOBLIB_ARTIFACT
+                joblib.dump(model, os.path.join(staging, artifact))
+
+            record = {
+                **(metadata or {}),
+                "model_id": model_id,
+                "kind": kind,
+                "artifact": artifact,
+                "architecture": architecture,
+                "bytes": os.path.getsize(os.path.join(staging, artifact)),
+                "created_at": datetime.now().isoformat()
+            }
+            with open(os.path.join(staging, METADATA_FILE), "w") as f:
+                json.dump(record, f, default=str)
+            os.replace(staging, self._model_dir(model_id))
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        self._cache(model_id, model, record["bytes"])
+        return record
+
+    def metadata(self, model_id: str) -> Dict[str, Any]:
+        """Read a model's metadata without loading the model"""
+        path = os.path.join(self._model_dir(model_id), METADATA_FILE)
+        if not os.path.exists(path):
+            raise KeyError(f"Model {model_id} not found")
+        with open(path) as f:
+            return json.load(f)
+
+    def get(self, model_id: str) -> Any:
+        """Return a model, loading it from disk on first use"""
+        with self.lock:
+            entry = self.loaded.get(model_id)
+            if entry is not None:
+                self.loaded.move_to_end(model_id)
+                self.stats["hits"] += 1
+                return entry["model"]
+
+        record = self.metadata(model_id)
+        path = os.path.join(self._model_dir(model_id), record["artifact"])
+        if record["artifact"] == TORCH_ARTIFACT:
+            model = self.builders[record["kind"]](**record["architecture"])
+            model.load_state_dict(torch.load(path, map_location="cpu"))
+            model.eval()
+        else:
+            model = joblib.load(path)
+
+        self.stats["loads"] += 1
+        self._cache(model_id, model, record["bytes"])
+        return model
+
+    def _cache(self, model_id: str, model: Any, size: int) -> None:
+        with self.lock:
+            if model_id in self.loaded:
+                self.total_bytes -= self.loaded.pop(model_id)["bytes"]
+            self.loaded[model_id] = {"model": model, "bytes": size}
+            self.total_bytes += size
+
+            # Always keep the model just used, even if it alone exceeds the cap
+            while self.total_bytes > self.max_bytes and len(self.loaded) > 1:
+                _, evicted = self.loaded.popitem(last=False)
+                self.total_bytes -= evicted["bytes"]
+                self.stats["evictions"] += 1
+
+    def __contains__(self, model_id: str) -> bool:
+        return os.path.exists(os.path.join(self._model_dir(model_id), METADATA_FILE))
+
+    def list_models(self, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Metadata of every stored model, oldest first"""
+        records = []
+        for name in os.listdir(self.root):
+            if name.startswith("."):
+                continue
+            try:
+                record = self.metadata(name)
+            except (KeyError, ValueError):
+                continue
+            if kind is None or record["kind"] == kind:
+                records.append(record)
+        return sorted(records, key=lambda record: record["created_at"])
+
+    def delete(self, model_id: str) -> None:
+        """Remove a model from disk and from memory"""
+        with self.lock:
+            if model_id in self.loaded:
+                self.total_bytes -= self.loaded.pop(model_id)["bytes"]
+        shutil.rmtree(self._model_dir(model_id), ignore_errors=True)
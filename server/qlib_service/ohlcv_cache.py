@@ -0,0 +1,116 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, Callable, Awaitable, Optional, Tuple
+import pandas as pd
+
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+TIMEFRAME_UNITS = {
+    's': 1,
+    'm': 60,
+    'h': 3600,
+    'd': 86400,
+    'w': 604800,
+    'M': 2592000,
+    'y': 31536000
+}
+
+
+def timeframe_seconds(timeframe: str) -> int:
+    """Length of a ccxt timeframe such as '1m', '4h' or '1d' in seconds"""
+    return int(timeframe[:-1]) * TIMEFRAME_UNITS[timeframe[-1]]
+
+
+class OHLCVCache:
+    """Candle cache shared by every analysis of a symbol and timeframe
+
+    An entry is fresh until ``ttl`` seconds have passed or the candle after
+    the last cached one has opened, whichever comes first. Stale entries are
+    refreshed incrementally by fetching only candles from the last cached
+    timestamp onwards (the last candle is re-fetched as it may still have
+    been forming). Concurrent requests for the same key share one in-flight
+    fetch, which keeps running if the request that started it is cancelled,
+    and entries are evicted least recently used first once the
+    cached frames exceed ``max_bytes``.
+    """
+
+    def __init__(self,
+                 fetch: Callable[[str, str, Optional[int]], Awaitable[List[List[float]]]],
+                 ttl: float = 10.0,
+                 max_bytes: int = 64 * 2 ** 20,
+                 max_bars: int = 1000):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_bars = max_bars
+        self.entries: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self.inflight: Dict[Tuple[str, str], asyncio.Task] = {}
+        self.total_bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "refreshes": 0, "coalesced": 0, "evictions": 0}
+
+    async def get(self, symbol: str, timeframe: str) -> pd.DataFrame:
+        """Return candles for a symbol, fetching or refreshing only when needed"""
+        key = (symbol, timeframe)
+        entry = self.entries.get(key)
+        if entry is not None and time.time() < entry["expires_at"]:
+            self.entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry["frame"].copy(deep=False)
+
+        task = self.inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+        else:
+            # The fetch runs in its own task, so a request cancelled while
+            # waiting (say by a caller's timeout) leaves it running for the rest
+            task = self.inflight[key] = asyncio.ensure_future(self._load(key, entry))
+            task.add_done_callback(lambda done: self._finished(key, done))
+        frame = await asyncio.shield(task)
+        return frame.copy(deep=False)
+
+    def _finished(self, key: Tuple[str, str], task: asyncio.Task) -> None:
+        del self.inflight[key]
+        # Retrieve the error so it is not reported as unhandled when no
+        # request was left waiting on this fetch
+        if not task.cancelled():
+            task.exception()
+
+    async def _load(self, key: Tuple[str, str], entry: Optional[Dict[str, Any]]) -> pd.DataFrame:
+        symbol, timeframe = key
+        if entry is None or not len(entry["frame"]):
+            self.stats["misses"] += 1
+            frame = pd.DataFrame(await self.fetch(symbol, timeframe, None), columns=OHLCV_COLUMNS)
+        else:
+            self.stats["refreshes"] += 1
+            cached = entry["frame"]
+            since = int(cached['timestamp'].iloc[-1])
+            newer = pd.DataFrame(await self.fetch(symbol, timeframe, since), columns=OHLCV_COLUMNS)
+            frame = pd.concat([cached[cached['timestamp'] < since], newer], ignore_index=True)
+        frame = frame.drop_duplicates('timestamp', keep='last').tail(self.max_bars).reset_index(drop=True)
+        self._store(key, frame)
+        return frame
+
+    def _store(self, key: Tuple[str, str], frame: pd.DataFrame) -> None:
+        now = time.time()
+        expires_at = now + self.ttl
+        if len(frame):
+            # The next candle opens one timeframe after the last one did
+            next_bar = frame['timestamp'].iloc[-1] / 1000 + timeframe_seconds(key[1])
+            expires_at = min(expires_at, max(next_bar, now))
+
+        size = int(frame.memory_usage(index=True).sum())
+        if key in self.entries:
+            self.total_bytes -= self.entries.pop(key)["bytes"]
+        self.entries[key] = {"frame": frame, "expires_at": expires_at, "bytes": size}
+        self.total_bytes += size
+
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            _, evicted = self.entries.popitem(last=False)
+            self.total_bytes -= evicted["bytes"]
+            self.stats["evictions"] += 1
+
+    def invalidate(self, symbol: str = None) -> None:
+        """Drop cached candles for one symbol, or for every symbol"""
+        for key in [k for k in self.entries if symbol is None or k[0] == symbol]:
+            self.total_bytes -= self.entries.pop(key)["bytes"]
@@ -1,11 +1,13 @@
 from typing import List, Dict, Any
 import numpy as np
 import pandas as pd
-from scipy.optimize import minimize
+from scipy.optimize import Bounds, minimize
+import cvxpy as cp
 from qlib.workflow import R
 from qlib.portfolio import BasePortfolio
 import torch
 import torch.nn as nn
+from .factor_risk import FACTOR_MODEL_MIN_ASSETS, FactorCovariance, factor_exposures, fit_factor_model
 
 class AdvancedPortfolioOptimizer:
     def __init__(self):
@@ -25,7 +27,9 @@ class AdvancedPortfolioOptimizer:
             
             # Calculate risk metrics
             self.risk_factors = self._calculate_risk_factors(data)
-            self.covariance_matrix = self._calculate_covariance_matrix(data)
+            self.covariance_matrix = self._calculate_covariance_matrix(
+                data, constraints.get('risk_model', 'auto')
+            )
             self.expected_returns = self._calculate_expected_returns(data)
             
             # Optimize with multiple objectives
@@ -58,21 +62,39 @@ class AdvancedPortfolioOptimizer:
             fields=['$close', '$volume', '$factor']
         )
         
-    def _calculate_risk_factors(self, data: pd.DataFrame) -> Dict[str, np.ndarray]:
-        """Calculate multiple risk factors"""
-        returns = data.groupby(level=1)['$close'].pct_change()
-        
+    def _panels(self, data: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+        """[time, instrument] returns, close and volume"""
+        close = data['$close'].unstack(level=1)
         return {
-            'beta': self._calculate_market_betas(returns),
-            'momentum': self._calculate_momentum_factor(returns),
-            'volatility': self._calculate_volatility_factor(returns),
-            'liquidity': self._calculate_liquidity_factor(data),
-            'size': self._calculate_size_factor(data)
+            'returns': close.pct_change().iloc[1:],
+            'close': close.iloc[1:],
+            'volume': data['$volume'].unstack(level=1).iloc[1:]
         }
+
+    def _calculate_risk_factors(self, data: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Calculate multiple risk factors: beta, momentum, volatility, liquidity and size"""
+        panels = self._panels(data)
+        exposures = factor_exposures(panels['returns'], panels['volume'], panels['close'])
+        return {name: exposures[name].to_numpy() for name in exposures.columns}
         
-    def _calculate_covariance_matrix(self, data: pd.DataFrame) -> np.ndarray:
-        """Calculate covariance matrix with shrinkage"""
-        returns = data.groupby(level=1)['$close'].pct_change()
+    def _calculate_covariance_matrix(self, data: pd.DataFrame, risk_model: str = 'auto'):
+        """Calculate covariance matrix with shrinkage, or its factor form
+
+        ``risk_model`` is ``'sample'`` for the shrunk N x N sample
+        covariance, ``'factor'`` for a ``FactorCovariance`` on the
+        exposures from ``_calculate_risk_factors``, or ``'auto'``, which
+        picks the factor model above ``FACTOR_MODEL_MIN_ASSETS`` assets.
+        Both support ``covariance @ weights``.
+        """
+        returns = self._panels(data)['returns']
+        if risk_model == 'auto':
+            risk_model = 'factor' if len(returns.columns) > FACTOR_MODEL_MIN_ASSETS else 'sample'
+        if risk_model == 'factor':
+            exposures = pd.DataFrame(self.risk_factors, index=returns.columns)
+            return fit_factor_model(returns, exposures)
+        if risk_model != 'sample':
+            raise ValueError(f'Unknown risk model {risk_model}')
+
         sample_cov = returns.cov()
         
         # Ledoit-Wolf shrinkage
@@ -84,10 +106,10 @@ class AdvancedPortfolioOptimizer:
         
     def _calculate_expected_returns(self, data: pd.DataFrame) -> np.ndarray:
         """Calculate expected returns using multiple models"""
-        returns = data.groupby(level=1)['$close'].pct_change()
+        returns = self._panels(data)['returns']
         
         # Combine multiple return forecasting models
-        historical_mean = returns.mean()
+        historical_mean = returns.mean().fillna(0.0)
         momentum_forecast = self._momentum_based_forecast(returns)
         factor_forecast = self._factor_based_forecast(returns)
         
@@ -95,43 +117,109 @@ class AdvancedPortfolioOptimizer:
         return (0.3 * historical_mean + 
                 0.4 * momentum_forecast + 
                 0.3 * factor_forecast).values
+
+    def _momentum_based_forecast(self, returns: pd.DataFrame, lookback: int = 63) -> pd.Series:
+        """Mean return over the most recent ``lookback`` periods"""
+        return returns.iloc[-lookback:].mean().fillna(0.0)
+
+    def _factor_based_forecast(self, returns: pd.DataFrame) -> pd.Series:
+        """Mean returns explained by the exposures from ``_calculate_risk_factors``
+
+        One cross-sectional least-squares fit of the assets' mean returns
+        on their exposures; the fitted values leave out the asset-specific
+        part of the historical mean.
+        """
+        exposures = pd.DataFrame(self.risk_factors, index=returns.columns)
+        design = np.column_stack([np.ones(len(exposures)), exposures.to_numpy()])
+        premia, *_ = np.linalg.lstsq(design, returns.mean().fillna(0.0).to_numpy(), rcond=None)
+        return pd.Series(design @ premia, index=returns.columns)
         
     def _run_optimization(self, constraints: Dict[str, Any],
                          risk_preferences: Dict[str, float]) -> np.ndarray:
-        """Run portfolio optimization with multiple objectives"""
+        """Run portfolio optimization with multiple objectives
+
+        Maximizes ``return * mu'w - risk * sqrt(w'Sw) - diversification *
+        sum(w^2)`` for fully invested weights within ``min_weight`` /
+        ``max_weight``. ``constraints['solver']`` picks SLSQP with analytic
+        gradients (``'slsqp'``, the default) or the equivalent convex SOCP
+        in cvxpy (``'convex'``), which needs non-negative risk and
+        diversification preferences for the objective to be concave.
+        """
         n_assets = len(self.expected_returns)
-        
+        # The weight limits are bounds rather than 2N inequality constraints
+        lower = max(constraints.get('min_weight', 0.0), 0.0)
+        upper = min(constraints.get('max_weight', 1.0), 1.0)
+
+        solver = constraints.get('solver', 'slsqp')
+        if solver == 'convex':
+            if risk_preferences['risk'] < 0 or risk_preferences['diversification'] < 0:
+                raise ValueError('The convex solver needs non-negative risk and diversification preferences')
+            return self._run_convex_optimization(lower, upper, risk_preferences)
+        if solver != 'slsqp':
+            raise ValueError(f'Unknown solver {solver}')
+
         def objective(weights):
+            covariance_weights = self.covariance_matrix @ weights
             portfolio_return = np.dot(weights, self.expected_returns)
-            portfolio_risk = np.sqrt(np.dot(weights.T, np.dot(self.covariance_matrix, weights)))
-            
-            # Multi-objective function
-            return -(risk_preferences['return'] * portfolio_return - 
-                    risk_preferences['risk'] * portfolio_risk -
-                    risk_preferences['diversification'] * self._diversification_penalty(weights))
+            portfolio_risk = max(np.sqrt(weights @ covariance_weights), 1e-12)
+
+            # Multi-objective function and its gradient
+            value = -(risk_preferences['return'] * portfolio_return - 
+                      risk_preferences['risk'] * portfolio_risk -
+                      risk_preferences['diversification'] * self._diversification_penalty(weights))
+            gradient = -(risk_preferences['return'] * self.expected_returns -
+                         risk_preferences['risk'] * covariance_weights / portfolio_risk -
+                         risk_preferences['diversification'] * 2 * weights)
+            return value, gradient
         
         # Constraints
+        ones = np.ones(n_assets)
         constraints_list = [
-            {'type': 'eq', 'fun': lambda x: np.sum(x) - 1},  # Sum to 1
-            {'type': 'ineq', 'fun': lambda x: x - constraints['min_weight']},  # Minimum weights
-            {'type': 'ineq', 'fun': lambda x: constraints['max_weight'] - x}   # Maximum weights
+            {'type': 'eq', 'fun': lambda x: np.sum(x) - 1, 'jac': lambda x: ones}  # Sum to 1
         ]
         
         # Initial guess: equal weights
-        initial_weights = np.array([1/n_assets] * n_assets)
+        initial_weights = np.full(n_assets, 1 / n_assets)
         
         # Run optimization
         result = minimize(objective, initial_weights,
                         method='SLSQP',
+                        jac=True,
                         constraints=constraints_list,
-                        bounds=[(0, 1) for _ in range(n_assets)])
+                        bounds=Bounds(np.full(n_assets, lower), np.full(n_assets, upper)))
         
         return result.x
+
+    def _run_convex_optimization(self, lower: float, upper: float,
+                                 risk_preferences: Dict[str, float]) -> np.ndarray:
+        """The same objective as an SOCP, with risk as the norm of a covariance root"""
+        n_assets = len(self.expected_returns)
+        weights = cp.Variable(n_assets)
+        if isinstance(self.covariance_matrix, FactorCovariance):
+            # [G w; sqrt(D) w] keeps the factor model's O(NK) size
+            risk = cp.norm(cp.hstack([
+                self.covariance_matrix.factor_root() @ weights,
+                cp.multiply(np.sqrt(self.covariance_matrix.specific_variance), weights)
+            ]))
+        else:
+            eigenvalues, eigenvectors = np.linalg.eigh(self.covariance_matrix)
+            risk = cp.norm((np.sqrt(np.clip(eigenvalues, 0, None))[:, None] * eigenvectors.T) @ weights)
+
+        problem = cp.Problem(
+            cp.Maximize(risk_preferences['return'] * (self.expected_returns @ weights) -
+                        risk_preferences['risk'] * risk -
+                        risk_preferences['diversification'] * cp.sum_squares(weights)),
+            [cp.sum(weights) == 1, weights >= lower, weights <= upper]
+        )
+        problem.solve()
+        if problem.status not in (cp.OPTIMAL, cp.OPTIMAL_INACCURATE):
+            raise ValueError(f'Portfolio optimization {problem.status}')
+        return weights.value
         
     def _calculate_portfolio_metrics(self, weights: np.ndarray) -> Dict[str, float]:
         """Calculate comprehensive portfolio metrics"""
         portfolio_return = np.dot(weights, self.expected_returns)
-        portfolio_risk = np.sqrt(np.dot(weights.T, np.dot(self.covariance_matrix, weights)))
+        portfolio_risk = np.sqrt(weights @ (self.covariance_matrix @ weights))
         
         return {
             'expected_return': portfolio_return,
@@ -152,8 +240,8 @@ class AdvancedPortfolioOptimizer:
         
     def _calculate_risk_contribution(self, weights: np.ndarray) -> Dict[str, float]:
         """Calculate risk contribution of each asset"""
-        portfolio_risk = np.sqrt(np.dot(weights.T, np.dot(self.covariance_matrix, weights)))
-        marginal_risk_contribution = np.dot(self.covariance_matrix, weights) / portfolio_risk
+        portfolio_risk = np.sqrt(weights @ (self.covariance_matrix @ weights))
+        marginal_risk_contribution = (self.covariance_matrix @ weights) / portfolio_risk
         risk_contribution = weights * marginal_risk_contribution
         
         return {
@@ -1,4 +1,5 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable
+import asyncio
 import numpy as np
 import pandas as pd
 from datetime import datetime
@@ -6,13 +7,26 @@ from .market_analysis_service import MarketAnalysisService
 from .risk_management_service import RiskManagementService
 from .data_manager import AdvancedDataManager
 from .model_manager import AdvancedModelManager
+from .strategy_engine import AdvancedStrategyEngine
+from .backtest import run_backtest, signals_to_weights
+from .sweep import SWEEP_FIELDS, sweep_backtests
+from .execution import (
+    FIXED_COST_BPS, SimulatedExchange, almgren_chriss_schedule, schedule_to_trajectory,
+    intraday_volume_profile, split_quantity, work_parent_order
+)
 
 class QuantumTradingService:
     def __init__(self):
         self.market_analysis = MarketAnalysisService()
         self.risk_management = RiskManagementService()
         self.data_manager = AdvancedDataManager()
+        self.daily_data_manager = AdvancedDataManager(freq="day")
         self.model_manager = AdvancedModelManager()
+        self.strategy_engine = AdvancedStrategyEngine(
+            inference=self.model_manager.inference,
+            feature_cache=self.model_manager.feature_cache
+        )
+        self.exchange = SimulatedExchange()
         self.market_state = {}
         self.cached_signals = {}
 
@@ -20,6 +34,7 @@ class QuantumTradingService:
         """Initialize all trading services"""
         try:
             await self.data_manager.initialize_data()
+            await self.daily_data_manager.initialize_data()
             self.market_state = {
                 "regime": "normal",
                 "volatility": "medium",
@@ -30,32 +45,56 @@ class QuantumTradingService:
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
-    async def get_market_analysis(self, symbols: List[str], timeframe: str = '1d') -> Dict[str, Any]:
-        """Get comprehensive market analysis"""
+    async def get_market_analysis(self,
+                                  symbols: List[str],
+                                  timeframe: str = '1d',
+                                  max_concurrency: int = 8,
+                                  timeout: float = 30.0) -> Dict[str, Any]:
+        """Get comprehensive market analysis
+
+        All analyses for all symbols run concurrently, at most
+        ``max_concurrency`` at a time. Analyses still running after
+        ``timeout`` seconds are cancelled and reported as errors. Their
+        CPU-bound steps run in the analysis service's thread pool, so the
+        event loop stays free to enforce the timeout; a step cut off that
+        way finishes in its thread and its result is dropped.
+        """
         try:
-            analysis = {}
+            if not symbols:
+                # asyncio.wait rejects an empty set of tasks
+                return {"status": "success", "analysis": {}}
+            semaphore = asyncio.Semaphore(max_concurrency)
+
+            async def bounded(call):
+                async with semaphore:
+                    return await call
+
+            analyses = {
+                "price_action": lambda symbol: self.market_analysis.analyze_price_action(symbol, timeframe),
+                "volume_profile": lambda symbol: self.market_analysis.analyze_volume_profile(symbol, timeframe),
+                "market_regime": lambda symbol: self.market_analysis.detect_market_regime(symbol),
+                "institutional_flow": lambda symbol: self.market_analysis.analyze_institutional_flow(symbol)
+            }
 
             # Parallel analysis for each symbol
-            for symbol in symbols:
-                symbol_analysis = {}
-
-                # Price Action Analysis
-                price_action = await self.market_analysis.analyze_price_action(symbol, timeframe)
-                symbol_analysis["price_action"] = price_action
-
-                # Volume Profile Analysis
-                volume_profile = await self.market_analysis.analyze_volume_profile(symbol, timeframe)
-                symbol_analysis["volume_profile"] = volume_profile
-
-                # Market Regime Detection
-                market_regime = await self.market_analysis.detect_market_regime(symbol)
-                symbol_analysis["market_regime"] = market_regime
-
-                # Institutional Flow Analysis
-                institutional_flow = await self.market_analysis.analyze_institutional_flow(symbol)
-                symbol_analysis["institutional_flow"] = institutional_flow
+            tasks = {
+                (symbol, name): asyncio.ensure_future(bounded(analyze(symbol)))
+                for symbol in symbols
+                for name, analyze in analyses.items()
+            }
+            done, pending = await asyncio.wait(tasks.values(), timeout=timeout)
+            for task in pending:
+                task.cancel()
 
-                analysis[symbol] = symbol_analysis
+            analysis = {}
+            for (symbol, name), task in tasks.items():
+                if task not in done:
+                    result = {"status": "error", "message": f"Timed out after {timeout}s"}
+                elif task.exception() is not None:
+                    result = {"status": "error", "message": str(task.exception())}
+                else:
+                    result = task.result()
+                analysis.setdefault(symbol, {})[name] = result
 
             return {
                 "status": "success",
@@ -67,22 +106,15 @@ class QuantumTradingService:
     async def optimize_portfolio(self, portfolio_id: str, constraints: Dict[str, Any]) -> Dict[str, Any]:
         """Optimize portfolio with given constraints"""
         try:
-            # Get historical data for portfolio assets
-            portfolio_data = await self.data_manager.fetch_market_data(
-                instruments=constraints.get("instruments", []),
-                start_time=constraints.get("start_time", "1y"),
-                end_time=constraints.get("end_time", "now")
-            )
-
-            # Calculate returns
-            returns = pd.DataFrame(portfolio_data["data"])
-            returns = returns.pct_change().dropna()
+            returns, volume, close = await self._portfolio_panels(constraints)
 
             # Optimize portfolio
             optimization_result = await self.risk_management.optimize_portfolio(
                 returns=returns,
                 risk_aversion=constraints.get("risk_aversion", 1.0),
-                constraints=constraints
+                constraints=constraints,
+                volume=volume,
+                close=close
             )
 
             # Calculate risk metrics
@@ -99,6 +131,38 @@ class QuantumTradingService:
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
+    async def efficient_frontier(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """Frontier for the instruments in ``config`` over its ``risk_aversions`` or ``target_returns``"""
+        try:
+            returns, volume, close = await self._portfolio_panels(config)
+            return await self.risk_management.efficient_frontier(
+                returns=returns,
+                risk_aversions=config.get("risk_aversions"),
+                target_returns=config.get("target_returns"),
+                constraints=config,
+                volume=volume,
+                close=close
+            )
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+
+    async def _portfolio_panels(self, constraints: Dict[str, Any]):
+        """[time, instrument] returns, volume and close for the portfolio's instruments"""
+        portfolio_data = await self.data_manager.fetch_market_data(
+            instruments=constraints.get("instruments", []),
+            start_time=constraints.get("start_time", "1y"),
+            end_time=constraints.get("end_time", "now"),
+            fields=["$close", "$volume"],
+            output="frame"
+        )
+        returns = self._calculate_returns(portfolio_data)
+        bars = portfolio_data["data"]
+        return (
+            returns,
+            bars["$volume"].unstack(level=0).reindex(returns.index),
+            bars["$close"].unstack(level=0).reindex(returns.index)
+        )
+
     async def get_portfolio_analytics(self, portfolio_id: str) -> Dict[str, Any]:
         """Get comprehensive portfolio analytics"""
         try:
@@ -106,12 +170,13 @@ class QuantumTradingService:
             portfolio_data = await self.data_manager.fetch_market_data(
                 instruments=["AAPL", "GOOGL", "MSFT"],  # Example instruments
                 start_time="1y",
-                end_time="now"
+                end_time="now",
+                fields=["$close"],
+                output="frame"
             )
 
             # Calculate returns
-            returns = pd.DataFrame(portfolio_data["data"])
-            returns = returns.pct_change().dropna()
+            returns = self._calculate_returns(portfolio_data)
 
             # Calculate risk metrics
             risk_metrics = await self.risk_management.calculate_risk_metrics(returns=returns)
@@ -122,7 +187,8 @@ class QuantumTradingService:
                 {"name": "high_volatility", "type": "volatility", "factor": 2},
                 {"name": "trend_reversal", "type": "trend", "drift": -0.01}
             ]
-            stress_test = await self.risk_management.stress_test_portfolio(returns, scenarios)
+            # One Monte Carlo pass covers every scenario and confidence level
+            stress_test = await self.risk_management.simulate_risk(returns, scenarios=scenarios)
 
             return {
                 "status": "success",
@@ -137,84 +203,240 @@ class QuantumTradingService:
                            execution_style: str = "vwap") -> Dict[str, Any]:
         """Smart order execution"""
         try:
-            execution_results = []
+            # Intraday volume curves and daily volumes from the bar store, one
+            # request per basket, shared by impact estimation and execution
+            profiles = await self._load_volume_profiles(trades)
+
+            # Analyze market impact and optimize trajectories for the whole basket
+            trajectories = await self._plan_executions(trades, profiles)
+            for trade, trajectory in zip(trades, trajectories):
+                trajectory["volume_curve"], trajectory["daily_volume"] = profiles[
+                    (trade.get("symbol", ""), trade.get("time_slots", 10))
+                ]
+
+            # Work every parent order concurrently on the event loop
+            execution_results = await asyncio.gather(*[
+                self._execute_with_algorithm(trade, trajectory, execution_style)
+                for trade, trajectory in zip(trades, trajectories)
+            ])
+
+            return {
+                "status": "success",
+                "execution_results": list(execution_results)
+            }
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+
+    async def train_model(self,
+                          config: Dict[str, Any],
+                          on_progress: Callable[[float], None] = None) -> Dict[str, Any]:
+        """Train a model on one instrument's daily bars to predict its forward return
+
+        ``config`` names the ``instrument``, the ``start_time`` / ``end_time``
+        range, the forward ``horizon`` in bars (5), the ``model_type``
+        (``"deep_learning"``, ``"ensemble"`` or ``"walk_forward"``) and the
+        ``model_config`` passed to the model manager.
+        """
+        try:
+            bars = (await self._daily_bars({**config, "instruments": [config["instrument"]]})).droplevel(0)
+            horizon = config.get("horizon", 5)
+            bars["target"] = bars["$close"].pct_change(horizon).shift(-horizon)
+            bars = bars.dropna(subset=["target"])
+
+            model_type = config.get("model_type", "deep_learning")
+            # Walk-forward windows purge the bars whose labels reach into the test period
+            model_config = {**config.get("model_config", {}), "horizon": horizon}
+            if model_type == "deep_learning":
+                epochs = model_config.get("epochs", 100)
+                if on_progress is not None:
+                    model_config["on_epoch"] = lambda epoch: on_progress(epoch["epoch"] / epochs)
+                return await self.model_manager.train_deep_learning_model(bars, "target", model_config)
+            if model_type == "ensemble":
+                return await self.model_manager.train_ensemble_model(bars, "target", model_config)
+            if model_type == "walk_forward":
+                result = await self.model_manager.walk_forward(bars, "target", model_config)
+                result.pop("predictions", None)
+                return result
+            raise ValueError(f"Unknown model type {model_type}")
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
 
-            for trade in trades:
-                # Analyze market impact
-                impact = await self._estimate_market_impact(trade)
+    async def run_backtest(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """Backtest strategy engine signals on daily bars
 
-                # Optimize execution trajectory
-                trajectory = await self._optimize_execution_trajectory(trade, impact)
+        ``config`` names the ``instruments`` and the ``start_time`` /
+        ``end_time`` range, optionally the ``signals`` to use, per-group
+        ``signal_weights`` and ``long_only``; signals are combined by
+        ``combine_alpha_signals``, as in the parameter sweep. ``account`` and
+        the qlib-style ``exchange_kwargs`` (``open_cost``, ``close_cost``,
+        ``min_cost``, ``limit_threshold``) are passed on to the simulator.
+        """
+        try:
+            bars = await self._daily_bars(config)
+
+            signals = {}
+            for instrument, instrument_bars in bars.groupby(level=0):
+                instrument_bars = instrument_bars.droplevel(0)
+                generated = await self.strategy_engine.generate_alpha_signals(instrument_bars, config)
+                if generated["status"] != "success":
+                    raise ValueError(generated["message"])
+                signals[instrument] = pd.Series(
+                    self.strategy_engine.combine_alpha_signals(
+                        generated["signals"], config.get("signals"), config.get("signal_weights")
+                    ),
+                    index=instrument_bars.index
+                )
+
+            close = bars["$close"].unstack(level=0)
+            weights = signals_to_weights(
+                pd.DataFrame(signals).reindex(index=close.index, columns=close.columns),
+                long_only=config.get("long_only", False)
+            )
+            result = await asyncio.get_running_loop().run_in_executor(
+                None, run_backtest, close, weights, self._backtest_settings(config)
+            )
+
+            return {
+                "status": "success",
+                "metrics": result["metrics"],
+                "nav": {str(date): value for date, value in result["nav"].items()},
+                "elapsed": result["elapsed"]
+            }
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
 
-                # Execute with selected algorithm
-                result = await self._execute_with_algorithm(trade, trajectory, execution_style)
+    async def run_parameter_sweep(self,
+                                  config: Dict[str, Any],
+                                  on_result: Callable[[Dict[str, Any]], None] = None) -> Dict[str, Any]:
+        """Backtest a grid of strategy parameters in parallel, resuming any earlier partial run
 
-                execution_results.append(result)
+        Takes the same ``config`` as ``run_backtest`` plus a ``grid`` of
+        parameter values and optionally ``rank_by`` and ``max_workers``.
+        """
+        try:
+            bars = await self._daily_bars(config)
+            panel = {field: bars[field].unstack(level=0) for field in SWEEP_FIELDS}
+            sweep = await sweep_backtests(
+                panel,
+                config["grid"],
+                backtest_config=self._backtest_settings(config),
+                max_workers=config.get("max_workers"),
+                rank_by=config.get("rank_by", "sharpe_ratio"),
+                long_only=config.get("long_only", False),
+                on_result=on_result
+            )
 
             return {
                 "status": "success",
-                "execution_results": execution_results
+                "sweep_id": sweep["sweep_id"],
+                "resumed": sweep["resumed"],
+                "results": sweep["results"].to_dict("records")
             }
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
+    async def _daily_bars(self, config: Dict[str, Any]) -> pd.DataFrame:
+        """Daily bars for a backtest config, indexed by (instrument, datetime)"""
+        market_data = await self.daily_data_manager.fetch_market_data(
+            config["instruments"],
+            config.get("start_time", "1y"),
+            config.get("end_time", "now"),
+            fields=SWEEP_FIELDS,
+            output="frame"
+        )
+        if market_data["status"] != "success":
+            raise ValueError(market_data["message"])
+        return market_data["data"]
+
+    def _backtest_settings(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """Simulator settings from the qlib-style exchange_kwargs and top-level overrides"""
+        return {
+            **config.get("exchange_kwargs", {}),
+            **{key: config[key] for key in ("account", "rebalance", "signal_lag", "trade_unit") if key in config}
+        }
+
+    async def _plan_executions(self,
+                               trades: List[Dict[str, Any]],
+                               profiles: Dict[Any, Any] = None) -> List[Dict[str, Any]]:
+        """Estimate impact for a basket in one pass and plan every trajectory concurrently"""
+        impacts = await self._estimate_market_impact_batch(trades, profiles)
+        return await asyncio.gather(*[
+            self._optimize_execution_trajectory(trade, impact)
+            for trade, impact in zip(trades, impacts)
+        ])
+
+    def _calculate_returns(self, market_data: Dict[str, Any]) -> pd.DataFrame:
+        """Turn a frame-mode fetch_market_data result into per-instrument returns"""
+        if market_data["status"] != "success":
+            raise ValueError(market_data["message"])
+        prices = market_data["data"]["$close"].unstack(level=0)
+        return prices.pct_change().dropna()
+
     # Helper methods for market impact analysis
     async def _estimate_market_impact(self, trade: Dict[str, Any]) -> float:
-        volume = trade.get("volume", 0)
-        price = trade.get("price", 0)
-        symbol = trade.get("symbol", "")
-        
-        # Get market data
-        market_data = await self.data_manager.fetch_market_data([symbol], "1d", "now")
+        return float((await self._estimate_market_impact_batch([trade]))[0])
+
+    async def _estimate_market_impact_batch(self,
+                                            trades: List[Dict[str, Any]],
+                                            profiles: Dict[Any, Any] = None) -> np.ndarray:
+        """Square-root impact for many trades against their mean daily volume
+
+        ``profiles`` is a ``_load_volume_profiles`` result for the trades;
+        it is loaded, in one request for the basket, when not given.
+        """
+        if profiles is None:
+            profiles = await self._load_volume_profiles(trades)
+        volume = np.array([abs(trade.get("volume", 0)) for trade in trades], dtype=float)
+        price = np.array([trade.get("price", 0) for trade in trades], dtype=float)
         
         # Calculate market impact using square root model
-        daily_volume = market_data["$volume"].mean()
+        daily_volume = np.array([
+            profiles[(trade.get("symbol", ""), trade.get("time_slots", 10))][1] for trade in trades
+        ], dtype=float)
         participation_rate = volume / daily_volume
-        impact = 0.1 * (price * volume)**0.5 * participation_rate
+        impact = 0.1 * np.sqrt(price * volume) * participation_rate
         
         return impact
 
     # Helper methods for execution trajectory optimization
     async def _optimize_execution_trajectory(self, 
                                           trade: Dict[str, Any], 
-                                          impact: float) -> List[Dict[str, Any]]:
-        """Optimize execution trajectory using dynamic programming"""
-        total_volume = trade["volume"]
-        time_slots = 10  # Number of execution slots
-        
-        # Initialize dynamic programming table
-        dp = np.zeros((time_slots + 1, int(total_volume) + 1))
-        
-        # Fill dynamic programming table
-        for t in range(time_slots):
-            for v in range(int(total_volume) + 1):
-                for x in range(v + 1):
-                    cost = self._calculate_execution_cost(x, impact)
-                    dp[t + 1][v] = min(dp[t + 1][v], dp[t][v - x] + cost)
-        
-        # Reconstruct optimal trajectory
-        trajectory = []
-        remaining_volume = total_volume
-        
-        for t in range(time_slots, 0, -1):
-            volume_t = remaining_volume - dp[t][int(remaining_volume)]
-            trajectory.append({
-                "time_slot": t,
-                "volume": volume_t,
-                "expected_impact": self._calculate_execution_cost(volume_t, impact)
-            })
-            remaining_volume -= volume_t
-        
-        return trajectory
-
-    def _calculate_execution_cost(self, volume: float, impact: float) -> float:
-        """Calculate execution cost using a simplified market impact model"""
-        fixed_cost = 0.0001  # 1 bps fixed cost
-        return fixed_cost * volume + impact * (volume**0.5)
+                                          impact: float) -> Dict[str, Any]:
+        """Optimize execution trajectory with the Almgren-Chriss closed form
+
+        ``impact`` is the estimated cost of working the whole order evenly
+        over the horizon, which calibrates the linear temporary impact
+        coefficient: trading X evenly over T costs eta * X^2 / T.
+        """
+        total_volume = abs(trade["volume"])
+        price = trade.get("price", 0)
+        horizon = trade.get("horizon", 1.0)  # in days
+        if total_volume == 0:
+            return {"trajectory": [], "expected_cost": 0.0, "cost_variance": 0.0}
+        if not np.isfinite(impact):
+            raise ValueError(f"No market impact estimate for {trade.get('symbol')}: daily volume is unavailable")
+
+        schedule = almgren_chriss_schedule(
+            total_volume=total_volume,
+            time_slots=trade.get("time_slots", 10),
+            volatility=trade.get("volatility", 0.02) * price,
+            temporary_impact=max(impact * horizon / total_volume ** 2, 1e-12),
+            permanent_impact=trade.get("permanent_impact", 0.0),
+            fixed_cost=FIXED_COST_BPS * price,
+            risk_aversion=trade.get("risk_aversion", 1e-6),
+            horizon=horizon,
+            lot_size=trade.get("lot_size", 1)
+        )
+
+        return {
+            "trajectory": schedule_to_trajectory(schedule),
+            "expected_cost": schedule["expected_cost"],
+            "cost_variance": schedule["cost_variance"]
+        }
 
     async def _execute_with_algorithm(self, 
                                     trade: Dict[str, Any],
-                                    trajectory: List[Dict[str, Any]],
+                                    trajectory: Dict[str, Any],
                                     style: str) -> Dict[str, Any]:
         """Execute trade using specified algorithm"""
         if style == "vwap":
@@ -224,24 +446,64 @@ class QuantumTradingService:
         else:
             return await self._execute_smart(trade, trajectory)
 
+    async def _load_volume_profiles(self, trades: List[Dict[str, Any]], lookback: str = "20d") -> Dict[Any, Any]:
+        """Intraday volume curve and mean daily volume per (symbol, slot count)"""
+        symbols = sorted({trade.get("symbol", "") for trade in trades})
+        market_data = await self.data_manager.fetch_market_data(
+            symbols, lookback, "now", fields=["$volume"], output="frame"
+        )
+        bars = market_data["data"] if market_data["status"] == "success" else None
+        available = set(bars.index.get_level_values(0)) if bars is not None else set()
+
+        profiles = {}
+        for trade in trades:
+            key = (trade.get("symbol", ""), trade.get("time_slots", 10))
+            if key not in profiles:
+                symbol_bars = bars.xs(key[0], level=0) if key[0] in available else None
+                profiles[key] = intraday_volume_profile(symbol_bars, key[1])
+        return profiles
+
     # Implementation of specific execution algorithms
     async def _execute_vwap(self, 
                            trade: Dict[str, Any],
-                           trajectory: List[Dict[str, Any]]) -> Dict[str, Any]:
+                           trajectory: Dict[str, Any]) -> Dict[str, Any]:
         """Execute trade using VWAP algorithm"""
-        # Implementation details for VWAP execution
-        pass
+        # Child orders follow the historical intraday volume curve
+        children = split_quantity(abs(trade["volume"]), trajectory["volume_curve"], trade.get("lot_size", 1))
+        return await self._work_order(trade, trajectory, children, "vwap")
 
     async def _execute_twap(self, 
                            trade: Dict[str, Any],
-                           trajectory: List[Dict[str, Any]]) -> Dict[str, Any]:
+                           trajectory: Dict[str, Any]) -> Dict[str, Any]:
         """Execute trade using TWAP algorithm"""
-        # Implementation details for TWAP execution
-        pass
+        # Equal child orders in every slot
+        slots = len(trajectory["volume_curve"])
+        children = split_quantity(abs(trade["volume"]), np.ones(slots), trade.get("lot_size", 1))
+        return await self._work_order(trade, trajectory, children, "twap")
 
     async def _execute_smart(self, 
                            trade: Dict[str, Any],
-                           trajectory: List[Dict[str, Any]]) -> Dict[str, Any]:
+                           trajectory: Dict[str, Any]) -> Dict[str, Any]:
         """Execute trade using smart routing algorithm"""
-        # Implementation details for smart routing
-        pass
\ No newline at end of file
+        # Child orders follow the Almgren-Chriss optimal trajectory
+        children = np.array([slot["volume"] for slot in trajectory["trajectory"]])
+        return await self._work_order(trade, trajectory, children, "smart")
+
+    async def _work_order(self,
+                          trade: Dict[str, Any],
+                          trajectory: Dict[str, Any],
+                          children: np.ndarray,
+                          style: str) -> Dict[str, Any]:
+        """Work a parent order's child orders on the simulated exchange"""
+        volume = trade["volume"]
+        side = -1 if trade.get("side", "buy" if volume >= 0 else "sell") == "sell" else 1
+        daily_volume = trajectory["daily_volume"]
+        if not np.isfinite(daily_volume) or daily_volume <= 0:
+            daily_volume = trade.get("daily_volume", 10 * abs(volume))
+
+        market = self.exchange.register(
+            trade.get("symbol", ""), trade.get("price", 0), daily_volume, trajectory["volume_curve"]
+        )
+        report = await work_parent_order(self.exchange, market, side, children, style)
+        report["expected_cost"] = trajectory["expected_cost"]
+        return report
@@ -0,0 +1,159 @@
+import asyncio
+import time
+from typing import Dict, List, Any, Callable, Awaitable, Iterable, Optional
+
+QuoteProvider = Callable[[List[str]], Awaitable[Dict[str, Dict[str, Any]]]]
+
+
+def _yahoo_quotes(symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+    import yfinance as yf
+
+    tickers = yf.Tickers(" ".join(symbols))
+    quotes = {}
+    for symbol in symbols:
+        try:
+            info = tickers.tickers[symbol].fast_info
+            price, previous = info.last_price, info.previous_close
+        except Exception:
+            # Unknown or delisted symbols are left out rather than failing the batch
+            continue
+        quotes[symbol] = {
+            "price": price,
+            "change": (price / previous - 1) * 100 if previous else 0.0,
+            "volume": info.last_volume
+        }
+    return quotes
+
+
+async def yahoo_quote_provider(symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Latest price, percent change and volume for each symbol from Yahoo Finance"""
+    return await asyncio.get_running_loop().run_in_executor(None, _yahoo_quotes, symbols)
+
+
+class QuoteBoard:
+    """In-memory quote snapshot kept current by a background refresher
+
+    Every ``refresh_interval`` seconds the refresher asks ``provider`` for
+    quotes of all watched symbols in one call. Requests are answered from
+    the snapshot; only symbols that have never been asked for wait for
+    upstream, and they join the watchlist so later requests do not. At most
+    one upstream call is in flight at a time: requests arriving while one
+    is running wait on it instead of starting another. The call runs in its
+    own task, so a request cancelled while waiting leaves it running for
+    the others. A failed refresh keeps the previous quotes, which report
+    their ``as_of`` time.
+
+    Before each refresh, requested symbols upstream never quoted are dropped
+    once nobody has asked for them for ``unknown_ttl`` seconds, and beyond
+    ``max_symbols`` the least recently requested ones go; the initial
+    ``symbols`` are always kept.
+    """
+
+    def __init__(self,
+                 provider: QuoteProvider = yahoo_quote_provider,
+                 symbols: Iterable[str] = ("AAPL",),
+                 refresh_interval: float = 15.0,
+                 timeout: float = 10.0,
+                 max_symbols: int = 1000,
+                 unknown_ttl: float = 600.0):
+        self.provider = provider
+        self.pinned = set(symbols)
+        self.symbols = set(symbols)
+        self.refresh_interval = refresh_interval
+        self.timeout = timeout
+        self.max_symbols = max_symbols
+        self.unknown_ttl = unknown_ttl
+        self.snapshot: Dict[str, Dict[str, Any]] = {}
+        self.inflight: Optional[asyncio.Task] = None
+        self.inflight_symbols: set = set()
+        self.attempted: set = set()
+        # Monotonic time each symbol was last asked for by a request
+        self.requested: Dict[str, float] = {}
+        self.task: Optional[asyncio.Task] = None
+        self.stats = {"hits": 0, "misses": 0, "refreshes": 0, "coalesced": 0, "errors": 0}
+
+    async def start(self) -> None:
+        if self.task is None:
+            self.task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                # Counted in stats; the snapshot keeps serving the last quotes
+                pass
+            await asyncio.sleep(self.refresh_interval)
+
+    async def refresh(self) -> Dict[str, Dict[str, Any]]:
+        """Fetch all watched symbols, sharing a call already in flight"""
+        if self.inflight is not None:
+            self.stats["coalesced"] += 1
+        else:
+            self.inflight = asyncio.ensure_future(self._load())
+            # Retrieve the error so it is not reported as unhandled when no
+            # request was waiting on this refresh
+            self.inflight.add_done_callback(lambda task: task.cancelled() or task.exception())
+        return await asyncio.shield(self.inflight)
+
+    async def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            self.stats["refreshes"] += 1
+            self._prune()
+            symbols = sorted(self.symbols)
+            self.inflight_symbols = set(symbols)
+            quotes = await asyncio.wait_for(self.provider(symbols), self.timeout) if symbols else {}
+            as_of = time.time()
+            self.snapshot.update({symbol: {**quote, "as_of": as_of} for symbol, quote in quotes.items()})
+            self.attempted.update(symbols)
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+        finally:
+            self.inflight = None
+        return self.snapshot
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        evicted = {
+            symbol for symbol in self.symbols - self.pinned
+            if symbol in self.attempted and symbol not in self.snapshot
+            and now - self.requested.get(symbol, 0.0) > self.unknown_ttl
+        }
+        excess = len(self.symbols) - len(evicted) - self.max_symbols
+        if excess > 0:
+            by_age = sorted(self.symbols - self.pinned - evicted, key=lambda symbol: self.requested.get(symbol, 0.0))
+            evicted.update(by_age[:excess])
+        for symbol in evicted:
+            self.symbols.discard(symbol)
+            self.attempted.discard(symbol)
+            self.requested.pop(symbol, None)
+            self.snapshot.pop(symbol, None)
+
+    async def get(self, symbols: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Quotes for ``symbols``; symbols upstream does not know map to None"""
+        symbols = list(dict.fromkeys(symbols))
+        now = time.monotonic()
+        self.requested.update((symbol, now) for symbol in symbols)
+        # Symbols upstream already failed to quote are retried by the
+        # refresher rather than on every request
+        missing = [symbol for symbol in symbols if symbol not in self.snapshot and symbol not in self.attempted]
+        self.stats["hits"] += len(symbols) - len(missing)
+        if missing:
+            self.stats["misses"] += len(missing)
+            self.symbols.update(missing)
+            # A refresh already in flight may have started before these
+            # symbols were watched
+            if self.inflight is not None and not self.inflight_symbols.issuperset(missing):
+                await self.refresh()
+            await self.refresh()
+        return {symbol: self.snapshot.get(symbol) for symbol in symbols}
@@ -1,60 +1,294 @@
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 from scipy.optimize import minimize
 import empyrical as ep
 import cvxpy as cp
+from .factor_risk import FACTOR_MODEL_MIN_ASSETS, RISK_FACTORS, factor_risk_model
+from .risk_simulation import DEFAULT_CHUNK_BYTES, simulate_portfolio_risk, to_report
+
+def _build_mean_variance_problem(n: int, mode: str, objective: str = "risk_aversion") -> Dict[str, Any]:
+    """A long-only, fully invested mean-variance problem over parameters
+
+    ``objective`` ``"risk_aversion"`` maximizes mu'w - risk and
+    ``"target_return"`` minimizes risk subject to mu'w >= ``target``.
+    """
+    w = cp.Variable(n)
+    mu = cp.Parameter(n)
+    # G with G.T @ G the (factor part of the) covariance, scaled by
+    # sqrt(risk_aversion), so the objective stays DPP and recompiles
+    # nothing when values change. G is N x N for the sample covariance and
+    # K x N for the factor model, whose specific risk is a separate
+    # diagonal term.
+    root = cp.Parameter((n if mode == "sample" else len(RISK_FACTORS) + 1, n))
+    risk = cp.sum_squares(root @ w)
+    specific = None
+    if mode == "factor":
+        specific = cp.Parameter(n, nonneg=True)
+        risk = risk + cp.sum_squares(cp.multiply(specific, w))
+    max_weight = cp.Parameter(nonneg=True)
+    constraints = [
+        cp.sum(w) == 1,  # Full investment
+        w >= 0,  # Long only
+        w <= max_weight
+    ]
+    target = None
+    if objective == "target_return":
+        target = cp.Parameter()
+        problem = cp.Problem(cp.Minimize(risk), constraints + [mu @ w >= target])
+    else:
+        problem = cp.Problem(cp.Maximize(mu @ w - risk), constraints)
+    return {
+        "problem": problem, "weights": w, "mu": mu, "root": root, "specific": specific,
+        "max_weight": max_weight, "target": target, "mode": mode, "fingerprint": None, "risk_model": None
+    }
+
+
+def _solve_frontier_chain(mu: np.ndarray,
+                          root: np.ndarray,
+                          specific: Optional[np.ndarray],
+                          max_weight: float,
+                          objective: str,
+                          values: np.ndarray) -> Dict[str, Any]:
+    """Solve neighbouring frontier points in order, each warm-started from the last
+
+    Runs in a pool worker, which compiles its own copy of the problem once.
+    Points the solver cannot solve get NaN weights.
+    """
+    entry = _build_mean_variance_problem(len(mu), "sample" if specific is None else "factor", objective)
+    entry["mu"].value = mu
+    entry["max_weight"].value = max_weight
+    if objective == "target_return":
+        entry["root"].value = root
+        if specific is not None:
+            entry["specific"].value = specific
+
+    weights = np.full((len(values), len(mu)), np.nan)
+    statuses, solver_time = [], 0.0
+    for i, value in enumerate(values):
+        if objective == "target_return":
+            entry["target"].value = value
+        else:
+            entry["root"].value = np.sqrt(value) * root
+            if specific is not None:
+                entry["specific"].value = np.sqrt(value) * specific
+        try:
+            entry["problem"].solve(warm_start=True)
+            status = entry["problem"].status
+            solver_time += entry["problem"].solver_stats.solve_time or 0.0
+        except cp.SolverError as e:
+            status = str(e)
+        if status in (cp.OPTIMAL, cp.OPTIMAL_INACCURATE):
+            weights[i] = entry["weights"].value
+        statuses.append(status)
+    return {"weights": weights, "status": statuses, "solver_time": solver_time}
+
+
+def _nan_to_none(values: np.ndarray) -> List[Optional[float]]:
+    return [None if np.isnan(value) else float(value) for value in values]
+
 
 class RiskManagementService:
-    def __init__(self):
+    def __init__(self, max_problems: int = 32):
         self.risk_metrics = {}
         self.portfolio_weights = {}
+        # Compiled mean-variance problems, least recently used first
+        self.problems: "OrderedDict[Tuple[Tuple[str, ...], str], Dict[str, Any]]" = OrderedDict()
+        self.max_problems = max_problems
         
     async def optimize_portfolio(self, 
                                returns: pd.DataFrame, 
                                risk_aversion: float = 1.0,
-                               constraints: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Optimize portfolio using mean-variance optimization"""
+                               constraints: Dict[str, Any] = None,
+                               volume: pd.DataFrame = None,
+                               close: pd.DataFrame = None) -> Dict[str, Any]:
+        """Optimize portfolio using mean-variance optimization
+
+        The long-only, fully invested problem is compiled once per asset
+        set, with the expected returns, a covariance root scaled by
+        ``risk_aversion`` and ``max_weight`` (from ``constraints``) as
+        parameters. Later calls for the same assets only update the
+        parameters and re-solve from the previous solution.
+
+        ``constraints["risk_model"]`` picks the covariance: ``"sample"``
+        (dense N x N), ``"factor"`` (B F B' + D from the style factors in
+        ``factor_risk``, never formed densely; ``volume`` and ``close``
+        panels add the liquidity and size factors) or ``"auto"``, which
+        uses the factor model above ``FACTOR_MODEL_MIN_ASSETS`` assets.
+        """
         try:
-            # Calculate expected returns and covariance
-            mu = returns.mean()
-            sigma = returns.cov()
-            
-            # Define variables
-            n = len(returns.columns)
-            w = cp.Variable(n)
-            
-            # Define objective function (maximize Sharpe ratio)
-            ret = mu @ w
-            risk = cp.quad_form(w, sigma)
-            objective = cp.Maximize(ret - risk_aversion * risk)
-            
-            # Define constraints
-            constraints = [
-                cp.sum(w) == 1,  # Full investment
-                w >= 0,  # Long only
-            ]
-            
-            # Add custom constraints if provided
-            if constraints and "max_weight" in constraints:
-                constraints.append(w <= constraints["max_weight"])
-            
-            # Solve optimization problem
-            prob = cp.Problem(objective, constraints)
-            prob.solve()
-            
+            constraints = constraints or {}
+            started = time.perf_counter()
+            mode = self._risk_model_mode(constraints, len(returns.columns))
+            problem, cached = self._mean_variance_problem(tuple(returns.columns), mode)
+            root, specific = self._risk_model(problem, returns, volume, close)
+
+            scale = np.sqrt(risk_aversion)
+            problem["mu"].value = returns.mean().to_numpy()
+            problem["root"].value = scale * root
+            if specific is not None:
+                problem["specific"].value = scale * specific
+            problem["max_weight"].value = float(constraints.get("max_weight", 1.0))
+            problem["problem"].solve(warm_start=True)
+            if problem["problem"].status not in (cp.OPTIMAL, cp.OPTIMAL_INACCURATE):
+                raise ValueError(f"Portfolio optimization {problem['problem'].status}")
+            elapsed = time.perf_counter() - started
+
+            weights = problem["weights"].value
+            expected_return = float(problem["mu"].value @ weights)
+            variance = np.sum((root @ weights) ** 2)
+            if specific is not None:
+                variance += np.sum((specific * weights) ** 2)
+            expected_risk = float(np.sqrt(variance))
+
             # Store optimized weights
-            self.portfolio_weights = pd.Series(w.value, index=returns.columns)
+            self.portfolio_weights = pd.Series(weights, index=returns.columns)
             
             return {
                 "status": "success",
                 "weights": self.portfolio_weights.to_dict(),
-                "expected_return": float(ret.value),
-                "expected_risk": float(np.sqrt(risk.value)),
-                "sharpe_ratio": float(ret.value / np.sqrt(risk.value))
+                "expected_return": expected_return,
+                "expected_risk": expected_risk,
+                "sharpe_ratio": expected_return / expected_risk if expected_risk > 0 else 0.0,
+                "risk_model": mode,
+                "solve_time": elapsed,
+                "solver_time": problem["problem"].solver_stats.solve_time,
+                "compiled": not cached
             }
         except Exception as e:
             return {"status": "error", "message": str(e)}
+
+    async def efficient_frontier(self,
+                                 returns: pd.DataFrame,
+                                 risk_aversions: List[float] = None,
+                                 target_returns: List[float] = None,
+                                 constraints: Dict[str, Any] = None,
+                                 volume: pd.DataFrame = None,
+                                 close: pd.DataFrame = None) -> Dict[str, Any]:
+        """Trace the frontier over a grid of risk aversions or target returns
+
+        The covariance root is computed once (and shared with
+        ``optimize_portfolio``'s cache). The sorted grid is split into
+        contiguous chains solved in a process pool of
+        ``constraints["max_workers"]`` (all cores), each point
+        warm-started from its neighbour. Without a grid, 20 target
+        returns spanning the lowest to the highest expected return are
+        used. Results are lists in grid order: ``weights`` is
+        [point, asset] and points the solver could not solve are None.
+        """
+        try:
+            constraints = constraints or {}
+            started = time.perf_counter()
+            mode = self._risk_model_mode(constraints, len(returns.columns))
+            problem, _ = self._mean_variance_problem(tuple(returns.columns), mode)
+            root, specific = self._risk_model(problem, returns, volume, close)
+            mu = returns.mean().to_numpy()
+            max_weight = float(constraints.get("max_weight", 1.0))
+
+            if risk_aversions is not None:
+                objective, grid = "risk_aversion", np.sort(np.asarray(risk_aversions, dtype=np.float64))
+            else:
+                objective = "target_return"
+                grid = np.sort(np.asarray(
+                    target_returns if target_returns is not None else np.linspace(mu.min(), mu.max(), 20),
+                    dtype=np.float64
+                ))
+
+            max_workers = min(constraints.get("max_workers", os.cpu_count() or 1), len(grid))
+            chains = [chain for chain in np.array_split(grid, max_workers) if len(chain)]
+            if len(chains) == 1:
+                solved = [_solve_frontier_chain(mu, root, specific, max_weight, objective, grid)]
+            else:
+                loop = asyncio.get_running_loop()
+                with ProcessPoolExecutor(max_workers=len(chains)) as pool:
+                    solved = await asyncio.gather(*[
+                        loop.run_in_executor(
+                            pool, _solve_frontier_chain, mu, root, specific, max_weight, objective, chain
+                        )
+                        for chain in chains
+                    ])
+
+            weights = np.vstack([chain["weights"] for chain in solved])
+            feasible = ~np.isnan(weights).any(axis=1)
+            expected_return = weights @ mu
+            variance = np.sum((weights @ root.T) ** 2, axis=1)
+            if specific is not None:
+                variance += np.sum((weights * specific) ** 2, axis=1)
+            expected_risk = np.sqrt(variance)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                sharpe_ratio = np.where(expected_risk > 0, expected_return / expected_risk, 0.0)
+
+            return {
+                "status": "success",
+                "objective": objective,
+                "grid": grid.tolist(),
+                "assets": list(returns.columns),
+                "weights": [row.tolist() if solved_point else None for row, solved_point in zip(weights, feasible)],
+                "expected_return": _nan_to_none(expected_return),
+                "expected_risk": _nan_to_none(expected_risk),
+                "sharpe_ratio": _nan_to_none(sharpe_ratio),
+                "solver_status": [status for chain in solved for status in chain["status"]],
+                "risk_model": mode,
+                "solve_time": time.perf_counter() - started,
+                "solver_time": sum(chain["solver_time"] for chain in solved)
+            }
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+
+    @staticmethod
+    def _risk_model_mode(constraints: Dict[str, Any], n_assets: int) -> str:
+        mode = constraints.get("risk_model", "auto")
+        if mode == "auto":
+            mode = "factor" if n_assets > FACTOR_MODEL_MIN_ASSETS else "sample"
+        if mode not in ("sample", "factor"):
+            raise ValueError(f"Unknown risk model {mode}")
+        return mode
+
+    def _mean_variance_problem(self, assets: Tuple[str, ...], mode: str) -> Tuple[Dict[str, Any], bool]:
+        """The parametrized problem for an asset set and risk model, and whether it was cached"""
+        key = (assets, mode)
+        if key in self.problems:
+            self.problems.move_to_end(key)
+            return self.problems[key], True
+
+        entry = _build_mean_variance_problem(len(assets), mode)
+        self.problems[key] = entry
+        while len(self.problems) > self.max_problems:
+            self.problems.popitem(last=False)
+        return entry, False
+
+    @staticmethod
+    def _risk_model(problem: Dict[str, Any],
+                    returns: pd.DataFrame,
+                    volume: pd.DataFrame = None,
+                    close: pd.DataFrame = None) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Covariance root and specific volatilities, reused while the inputs are unchanged"""
+        digest = hashlib.blake2b(digest_size=16)
+        for frame in (returns, volume, close):
+            if frame is not None:
+                digest.update(np.ascontiguousarray(frame.to_numpy(dtype=np.float64)).tobytes())
+        fingerprint = digest.hexdigest()
+        if problem["fingerprint"] != fingerprint:
+            if problem["mode"] == "sample":
+                # An eigendecomposition rather than Cholesky, since the sample
+                # covariance is singular when there are fewer periods than assets
+                eigenvalues, eigenvectors = np.linalg.eigh(returns.cov().to_numpy())
+                problem["risk_model"] = (np.sqrt(np.clip(eigenvalues, 0, None))[:, None] * eigenvectors.T, None)
+            else:
+                covariance = factor_risk_model(returns, volume, close)["covariance"]
+                root = covariance.factor_root()
+                # Without volume the liquidity and size rows are zero
+                padded = np.zeros(problem["root"].shape)
+                padded[:len(root)] = root
+                problem["risk_model"] = (padded, np.sqrt(covariance.specific_variance))
+            problem["fingerprint"] = fingerprint
+        return problem["risk_model"]
     
     async def calculate_risk_metrics(self, 
                                    returns: pd.DataFrame,
@@ -84,6 +318,56 @@ class RiskManagementService:
         except Exception as e:
             return {"status": "error", "message": str(e)}
     
+    async def simulate_risk(self,
+                            returns: pd.DataFrame,
+                            weights: Dict[str, float] = None,
+                            scenarios: List[Dict[str, Any]] = (),
+                            config: Dict[str, Any] = None,
+                            volume: pd.DataFrame = None,
+                            close: pd.DataFrame = None) -> Dict[str, Any]:
+        """Monte Carlo VaR, CVaR and drawdown for every scenario and confidence level
+
+        Paths are drawn from the same covariance root ``optimize_portfolio``
+        uses (``config["risk_model"]`` as there), so a factor model keeps
+        the simulation at K + 1 draws per step. ``config`` also sets the
+        ``confidences`` (0.95, 0.99), ``horizon`` in periods (1),
+        ``n_paths`` (100000), ``seed`` and ``chunk_bytes``; see
+        ``risk_simulation.simulate_portfolio_risk``. Weights default to the
+        last optimized portfolio, or equal weights without one.
+        """
+        try:
+            config = config or {}
+            if weights is None:
+                weights = self.portfolio_weights
+            weights = pd.Series(weights, dtype=np.float64).reindex(returns.columns).fillna(0.0)
+            if not weights.any():
+                weights[:] = 1 / len(weights)
+
+            mode = self._risk_model_mode(config, len(returns.columns))
+            problem, _ = self._mean_variance_problem(tuple(returns.columns), mode)
+            root, specific = self._risk_model(problem, returns, volume, close)
+
+            result = simulate_portfolio_risk(
+                returns.mean().to_numpy(), root, weights.to_numpy(), specific,
+                scenarios=scenarios,
+                confidences=config.get("confidences", (0.95, 0.99)),
+                horizon=config.get("horizon", 1),
+                n_paths=config.get("n_paths", 100_000),
+                seed=config.get("seed"),
+                chunk_bytes=config.get("chunk_bytes", DEFAULT_CHUNK_BYTES)
+            )
+            return {
+                "status": "success",
+                "scenario_results": to_report(result),
+                "risk_model": mode,
+                "n_paths": result["n_paths"],
+                "horizon": result["horizon"],
+                "elapsed": result["elapsed"],
+                "scenarios_per_sec": result["scenarios_per_sec"]
+            }
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+    
     async def stress_test_portfolio(self, 
                                   returns: pd.DataFrame,
                                   scenarios: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -0,0 +1,424 @@
+from collections import deque
+from typing import Dict, Callable, Tuple, Union
+import numpy as np
+import pandas as pd
+
+ArrayLike = Union[pd.Series, pd.DataFrame, np.ndarray]
+
+# Running sums are rebuilt from the window contents this often to stop
+# floating point drift from accumulating over long intraday sessions
+RESYNC_INTERVAL = 10000
+
+# Rolling min/max windows up to this length are reduced directly; longer
+# ones use the O(T) block scan
+DIRECT_EXTREME_WINDOW = 32
+
+
+# ---------------------------------------------------------------------------
+# Batch evaluation over a full history
+#
+# These mirror ``pandas.Series.rolling(window)`` semantics (NaN until the
+# window is full, NaN while any value in the window is NaN) but work on
+# Series, DataFrames and 1D/2D arrays along axis 0, so a [time, instrument]
+# panel is evaluated in one pass.
+# ---------------------------------------------------------------------------
+
+def _as_2d(values: ArrayLike) -> Tuple[np.ndarray, Callable[[np.ndarray], ArrayLike]]:
+    if isinstance(values, pd.DataFrame):
+        return values.to_numpy(dtype=np.float64), \
+            lambda out: pd.DataFrame(out, index=values.index, columns=values.columns)
+    if isinstance(values, pd.Series):
+        return values.to_numpy(dtype=np.float64)[:, None], \
+            lambda out: pd.Series(out[:, 0], index=values.index, name=values.name)
+    array = np.asarray(values, dtype=np.float64)
+    if array.ndim == 1:
+        return array[:, None], lambda out: out[:, 0]
+    return array, lambda out: out
+
+
+def _window_sums(array: np.ndarray, window: int, *columns: np.ndarray):
+    """Windowed sums of each column plus a mask of windows containing NaN"""
+    invalid = np.isnan(array)
+    counts = np.cumsum(np.vstack([np.zeros((1, array.shape[1])), invalid]), axis=0)
+    bad = (counts[window:] - counts[:-window]) > 0
+    sums = []
+    for column in columns:
+        filled = np.where(invalid, 0.0, column)
+        cumulative = np.cumsum(np.vstack([np.zeros((1, array.shape[1])), filled]), axis=0)
+        sums.append(cumulative[window:] - cumulative[:-window])
+    return bad, sums
+
+
+def _pad(array: np.ndarray, values: np.ndarray, window: int) -> np.ndarray:
+    out = np.full(array.shape, np.nan)
+    if len(values):
+        out[window - 1:] = values
+    return out
+
+
+def rolling_sum(values: ArrayLike, window: int) -> ArrayLike:
+    """Rolling sum over ``window`` rows"""
+    array, wrap = _as_2d(values)
+    if len(array) < window:
+        return wrap(np.full(array.shape, np.nan))
+    bad, (total,) = _window_sums(array, window, array)
+    total[bad] = np.nan
+    return wrap(_pad(array, total, window))
+
+
+def rolling_mean(values: ArrayLike, window: int) -> ArrayLike:
+    """Rolling mean over ``window`` rows"""
+    array, wrap = _as_2d(values)
+    if len(array) < window:
+        return wrap(np.full(array.shape, np.nan))
+    bad, (total,) = _window_sums(array, window, array)
+    mean = total / window
+    mean[bad] = np.nan
+    return wrap(_pad(array, mean, window))
+
+
+def rolling_std(values: ArrayLike, window: int, ddof: int = 1) -> ArrayLike:
+    """Rolling standard deviation over ``window`` rows"""
+    array, wrap = _as_2d(values)
+    if len(array) < window or window <= ddof:
+        return wrap(np.full(array.shape, np.nan))
+    # Centering on the column mean keeps the sum-of-squares formula stable
+    with np.errstate(all="ignore"):
+        centered = array - np.nanmean(array, axis=0)
+    bad, (s1, s2) = _window_sums(array, window, centered, centered ** 2)
+    variance = np.maximum((s2 - s1 ** 2 / window) / (window - ddof), 0.0)
+    std = np.sqrt(variance)
+    std[bad] = np.nan
+    return wrap(_pad(array, std, window))
+
+
+def _rolling_extreme(values: ArrayLike, window: int, reducer: np.ufunc) -> ArrayLike:
+    """Rolling min or max in O(T) regardless of ``window`` (van Herk / Gil-Werman)
+
+    Rows are cut into blocks of ``window``; a window starting at row ``i``
+    spans the rest of one block and the start of the next, so it is the
+    extreme of a running extreme to the end of ``i``'s block and one from
+    the start of the block holding its last row. This is the batch
+    counterpart of the monotonic deques in ``RollingWindow``. Windows up to
+    ``DIRECT_EXTREME_WINDOW`` are reduced directly, which is cheaper than
+    the block scan's fixed number of passes. ``reducer`` (``np.minimum`` /
+    ``np.maximum``) propagates NaN like pandas does.
+    """
+    array, wrap = _as_2d(values)
+    n = len(array)
+    if n < window:
+        return wrap(np.full(array.shape, np.nan))
+    if window <= DIRECT_EXTREME_WINDOW:
+        windows = np.lib.stride_tricks.sliding_window_view(array, window, axis=0)
+        return wrap(_pad(array, reducer.reduce(windows, axis=-1), window))
+
+    blocks = -(-n // window)
+    padded = np.full((blocks * window, array.shape[1]), np.nan)
+    padded[:n] = array
+    from_start = padded.reshape(blocks, window, array.shape[1])
+    to_end = from_start.copy()
+    # One vectorized step per position in the block, each over every block
+    for k in range(1, window):
+        reducer(from_start[:, k - 1], from_start[:, k], out=from_start[:, k])
+        reducer(to_end[:, window - k], to_end[:, window - k - 1], out=to_end[:, window - k - 1])
+    from_start = from_start.reshape(padded.shape)
+    to_end = to_end.reshape(padded.shape)
+    extreme = reducer(to_end[:n - window + 1], from_start[window - 1:n])
+    return wrap(_pad(array, extreme, window))
+
+
+def rolling_min(values: ArrayLike, window: int) -> ArrayLike:
+    """Rolling minimum over ``window`` rows"""
+    return _rolling_extreme(values, window, np.minimum)
+
+
+def rolling_max(values: ArrayLike, window: int) -> ArrayLike:
+    """Rolling maximum over ``window`` rows"""
+    return _rolling_extreme(values, window, np.maximum)
+
+
+def rolling_corr(x: ArrayLike, y: ArrayLike, window: int) -> ArrayLike:
+    """Rolling Pearson correlation of two aligned inputs"""
+    a, wrap = _as_2d(x)
+    b, _ = _as_2d(y)
+    b = np.broadcast_to(b, a.shape)
+    if len(a) < window:
+        return wrap(np.full(a.shape, np.nan))
+    joint = np.where(np.isnan(b), np.nan, a)
+    with np.errstate(all="ignore"):
+        ca = a - np.nanmean(a, axis=0)
+        cb = b - np.nanmean(b, axis=0)
+        bad, (sa, sb, saa, sbb, sab) = _window_sums(joint, window, ca, cb, ca ** 2, cb ** 2, ca * cb)
+        cov = sab - sa * sb / window
+        var_a = saa - sa ** 2 / window
+        var_b = sbb - sb ** 2 / window
+        corr = cov / np.sqrt(var_a * var_b)
+    corr[bad | (var_a <= 0) | (var_b <= 0)] = np.nan
+    return wrap(_pad(a, np.clip(corr, -1.0, 1.0), window))
+
+
+def pct_change(values: ArrayLike, periods: int = 1) -> ArrayLike:
+    """Percentage change over ``periods`` rows"""
+    array, wrap = _as_2d(values)
+    out = np.full(array.shape, np.nan)
+    if len(array) > periods:
+        with np.errstate(all="ignore"):
+            out[periods:] = array[periods:] / array[:-periods] - 1
+    return wrap(out)
+
+
+# ---------------------------------------------------------------------------
+# Derived inputs
+#
+# Every feature builder works from the same handful of per-bar inputs. They
+# are defined once here, for whole frames and for a single new bar.
+# ---------------------------------------------------------------------------
+
+def derive_inputs(data: pd.DataFrame) -> pd.DataFrame:
+    """Per-bar inputs shared by the feature builders, for a full history"""
+    inputs = pd.DataFrame(index=data.index)
+    if "$close" in data:
+        inputs["returns"] = pct_change(data["$close"])
+        inputs["log_returns"] = np.log(data["$close"]).diff()
+    if "$high" in data and "$low" in data:
+        inputs["parkinson"] = np.log(data["$high"] / data["$low"]) ** 2
+        if "$close" in data:
+            inputs["range"] = (data["$high"] - data["$low"]) / data["$close"]
+    return inputs
+
+
+def derive_bar_inputs(bar: Dict[str, float], previous: Dict[str, float]) -> Dict[str, float]:
+    """Per-bar inputs shared by the feature builders, for one new bar"""
+    inputs = {}
+    if "$close" in bar:
+        prev_close = previous.get("$close", np.nan) if previous else np.nan
+        inputs["returns"] = bar["$close"] / prev_close - 1
+        inputs["log_returns"] = np.log(bar["$close"]) - np.log(prev_close)
+    if "$high" in bar and "$low" in bar:
+        inputs["parkinson"] = np.log(bar["$high"] / bar["$low"]) ** 2
+        if "$close" in bar:
+            inputs["range"] = (bar["$high"] - bar["$low"]) / bar["$close"]
+    return inputs
+
+
+# ---------------------------------------------------------------------------
+# Streaming evaluation, O(1) per new bar
+# ---------------------------------------------------------------------------
+
+class RollingWindow:
+    """Fixed-size window with O(1) updates of sum, sum of squares, min and max
+
+    Sums are kept of ``value - shift`` so that the variance of prices far
+    from zero does not cancel catastrophically; ``shift`` is the first value
+    and is moved to the window mean whenever the sums are rebuilt.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque()
+        self.shift = None
+        self.sum = 0.0
+        self.sumsq = 0.0
+        self.nans = 0
+        self.count = 0
+        self._min = deque()  # (position, value), values increasing
+        self._max = deque()  # (position, value), values decreasing
+
+    def update(self, value: float) -> None:
+        position = self.count
+        self.count += 1
+        self.values.append(value)
+        if np.isnan(value):
+            self.nans += 1
+        else:
+            if self.shift is None:
+                self.shift = value
+            self.sum += value - self.shift
+            self.sumsq += (value - self.shift) ** 2
+            while self._min and self._min[-1][1] >= value:
+                self._min.pop()
+            self._min.append((position, value))
+            while self._max and self._max[-1][1] <= value:
+                self._max.pop()
+            self._max.append((position, value))
+
+        if len(self.values) > self.window:
+            old = self.values.popleft()
+            if np.isnan(old):
+                self.nans -= 1
+            else:
+                self.sum -= old - self.shift
+                self.sumsq -= (old - self.shift) ** 2
+            expired = position - self.window
+            while self._min and self._min[0][0] <= expired:
+                self._min.popleft()
+            while self._max and self._max[0][0] <= expired:
+                self._max.popleft()
+
+        if self.count % RESYNC_INTERVAL == 0:
+            valid = np.array([v for v in self.values if not np.isnan(v)])
+            if len(valid):
+                self.shift = float(valid.mean())
+                self.sum = float(np.sum(valid - self.shift))
+                self.sumsq = float(np.dot(valid - self.shift, valid - self.shift))
+
+    @property
+    def ready(self) -> bool:
+        return len(self.values) == self.window and self.nans == 0
+
+    @property
+    def mean(self) -> float:
+        return self.shift + self.sum / self.window if self.ready else np.nan
+
+    def var(self, ddof: int = 1) -> float:
+        if not self.ready or self.window <= ddof:
+            return np.nan
+        return max((self.sumsq - self.sum ** 2 / self.window) / (self.window - ddof), 0.0)
+
+    def std(self, ddof: int = 1) -> float:
+        return float(np.sqrt(self.var(ddof)))
+
+    @property
+    def min(self) -> float:
+        return self._min[0][1] if self.ready else np.nan
+
+    @property
+    def max(self) -> float:
+        return self._max[0][1] if self.ready else np.nan
+
+
+class RollingCorrelation:
+    """Rolling Pearson correlation of two inputs with O(1) updates
+
+    Like ``RollingWindow``, sums are of inputs shifted by the first pair.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self.pairs = deque()
+        self.shift = None
+        self.sums = np.zeros(5)  # x, y, xx, yy, xy
+        self.nans = 0
+        self.count = 0
+
+    def _terms(self, x: float, y: float) -> np.ndarray:
+        x, y = x - self.shift[0], y - self.shift[1]
+        return np.array([x, y, x * x, y * y, x * y])
+
+    def update(self, x: float, y: float) -> None:
+        self.count += 1
+        self.pairs.append((x, y))
+        if np.isnan(x) or np.isnan(y):
+            self.nans += 1
+        else:
+            if self.shift is None:
+                self.shift = (x, y)
+            self.sums += self._terms(x, y)
+
+        if len(self.pairs) > self.window:
+            old_x, old_y = self.pairs.popleft()
+            if np.isnan(old_x) or np.isnan(old_y):
+                self.nans -= 1
+            else:
+                self.sums -= self._terms(old_x, old_y)
+
+        if self.count % RESYNC_INTERVAL == 0:
+            self.sums = sum(
+                (self._terms(x, y) for x, y in self.pairs if not (np.isnan(x) or np.isnan(y))),
+                np.zeros(5)
+            )
+
+    @property
+    def value(self) -> float:
+        if len(self.pairs) < self.window or self.nans:
+            return np.nan
+        sx, sy, sxx, syy, sxy = self.sums
+        n = self.window
+        var_x = sxx - sx * sx / n
+        var_y = syy - sy * sy / n
+        if var_x <= 0 or var_y <= 0:
+            return np.nan
+        return float(np.clip((sxy - sx * sy / n) / np.sqrt(var_x * var_y), -1.0, 1.0))
+
+
+class RollingFeatureEngine:
+    """Shared streaming rolling statistics for one instrument
+
+    Serves bar-by-bar updates (``AdvancedDataManager.update_features``).
+    Builders that need values for a whole history (model, strategy and
+    alpha features) use the batch functions above instead, which are
+    already O(T) per window and vectorized across instruments.
+
+    Windows are registered lazily the first time a feature asks for them and
+    are shared between every caller, so a 20-bar mean of ``$close`` is kept
+    once no matter how many features use it. Newly registered windows are
+    seeded from the last ``max_window`` retained bars.
+    """
+
+    def __init__(self, max_window: int = 252):
+        self.max_window = max_window
+        self.history = deque(maxlen=max_window + 1)
+        self.windows = {}
+        self.correlations = {}
+
+    def update(self, bar: Dict[str, float]) -> Dict[str, float]:
+        """Append a new bar and update every registered statistic"""
+        previous = self.history[-1] if self.history else None
+        row = {key: float(value) for key, value in bar.items()}
+        row.update(derive_bar_inputs(row, previous))
+        self.history.append(row)
+
+        for (column, _), stream in self.windows.items():
+            stream.update(row.get(column, np.nan))
+        for (x, y, _), stream in self.correlations.items():
+            stream.update(row.get(x, np.nan), row.get(y, np.nan))
+        return row
+
+    def extend(self, data: pd.DataFrame) -> None:
+        """Feed a block of historical bars, oldest first"""
+        for bar in data.to_dict("records"):
+            self.update(bar)
+
+    def _window(self, column: str, window: int) -> RollingWindow:
+        key = (column, window)
+        if key not in self.windows:
+            if window > self.max_window:
+                raise ValueError(f"Window {window} exceeds max_window {self.max_window}")
+            stream = RollingWindow(window)
+            for row in list(self.history)[-window:]:
+                stream.update(row.get(column, np.nan))
+            self.windows[key] = stream
+        return self.windows[key]
+
+    def mean(self, column: str, window: int) -> float:
+        return self._window(column, window).mean
+
+    def std(self, column: str, window: int, ddof: int = 1) -> float:
+        return self._window(column, window).std(ddof)
+
+    def min(self, column: str, window: int) -> float:
+        return self._window(column, window).min
+
+    def max(self, column: str, window: int) -> float:
+        return self._window(column, window).max
+
+    def corr(self, x: str, y: str, window: int) -> float:
+        key = (x, y, window)
+        if key not in self.correlations:
+            if window > self.max_window:
+                raise ValueError(f"Window {window} exceeds max_window {self.max_window}")
+            stream = RollingCorrelation(window)
+            for row in list(self.history)[-window:]:
+                stream.update(row.get(x, np.nan), row.get(y, np.nan))
+            self.correlations[key] = stream
+        return self.correlations[key].value
+
+    def pct_change(self, column: str, periods: int = 1) -> float:
+        if len(self.history) <= periods:
+            return np.nan
+        return self.history[-1].get(column, np.nan) / self.history[-1 - periods].get(column, np.nan) - 1
+
+    def latest(self, column: str, offset: int = 0) -> float:
+        if len(self.history) <= offset:
+            return np.nan
+        return self.history[-1 - offset].get(column, np.nan)
@@ -1,4 +1,3 @@
-```python
 from typing import List, Dict, Any
 import numpy as np
 import pandas as pd
@@ -8,12 +7,41 @@ import torch
 import torch.nn as nn
 from scipy.optimize import minimize
 from datetime import datetime, timedelta
+from .rolling import rolling_mean, rolling_std, rolling_corr, pct_change, derive_inputs
+from .backtest import strategy_signal
+from .inference import InferenceServer
+from .feature_cache import FeatureCache
+
+SIGNAL_WEIGHTS = {
+    "technical": 0.3,
+    "stat_arb": 0.2,
+    "ml": 0.3,
+    "microstructure": 0.2
+}
+
+
+def _vote(condition, *inputs) -> np.ndarray:
+    """Vote +1 where ``condition`` holds and -1 elsewhere
+
+    Rows where any of ``inputs`` is NaN (rolling warm-up) get NaN rather
+    than a -1 vote.
+    """
+    votes = np.where(condition, 1.0, -1.0)
+    for values in inputs:
+        votes[np.isnan(np.asarray(values, dtype=float))] = np.nan
+    return votes
 
 class AdvancedStrategyEngine:
-    def __init__(self):
+    def __init__(self,
+                 inference: InferenceServer = None,
+                 ml_model_id: str = None,
+                 feature_cache: FeatureCache = None):
         self.active_strategies = {}
         self.signals_cache = {}
         self.position_manager = None
+        self.inference = inference
+        self.ml_model_id = ml_model_id
+        self.feature_cache = feature_cache
         
     async def generate_alpha_signals(self,
                                    data: pd.DataFrame,
@@ -23,7 +51,7 @@ class AdvancedStrategyEngine:
             signals = {}
             
             # Technical analysis signals
-            signals.update(self._generate_technical_signals(data))
+            signals.update(self._generate_technical_signals(data, config))
             
             # Statistical arbitrage signals
             signals.update(self._generate_stat_arb_signals(data))
@@ -44,26 +72,35 @@ class AdvancedStrategyEngine:
                 "message": str(e)
             }
     
-    def _generate_technical_signals(self, data: pd.DataFrame) -> Dict[str, Any]:
-        """Generate technical analysis based signals"""
+    def _generate_technical_signals(self, data: pd.DataFrame, config: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Generate technical analysis based signals
+
+        ``config`` may override ``fast_window`` (20), ``slow_window`` (50)
+        and ``zscore_clip`` (2).
+        """
+        config = config or {}
+        fast_window = config.get("fast_window", 20)
+        slow_window = config.get("slow_window", 50)
+        zscore_clip = config.get("zscore_clip", 2)
         signals = {}
         
         # Trend following
-        sma_20 = data["$close"].rolling(20).mean()
-        sma_50 = data["$close"].rolling(50).mean()
-        signals["trend_signal"] = np.where(sma_20 > sma_50, 1, -1)
+        sma_fast = rolling_mean(data["$close"], fast_window)
+        sma_slow = rolling_mean(data["$close"], slow_window)
+        signals["trend_signal"] = _vote(sma_fast > sma_slow, sma_fast, sma_slow)
         
         # Momentum
-        momentum = data["$close"].pct_change(20)
-        signals["momentum_signal"] = np.where(momentum > 0, 1, -1)
+        momentum = pct_change(data["$close"], fast_window)
+        signals["momentum_signal"] = _vote(momentum > 0, momentum)
         
         # Mean reversion
-        zscore = (data["$close"] - data["$close"].rolling(20).mean()) / data["$close"].rolling(20).std()
-        signals["mean_reversion_signal"] = -np.clip(zscore, -2, 2) / 2
+        zscore = (data["$close"] - sma_fast) / rolling_std(data["$close"], fast_window)
+        signals["mean_reversion_signal"] = -np.clip(zscore, -zscore_clip, zscore_clip) / zscore_clip
         
         # Volatility breakout
-        high_low_range = (data["$high"] - data["$low"]) / data["$close"]
-        signals["volatility_breakout"] = np.where(high_low_range > high_low_range.rolling(20).mean(), 1, -1)
+        high_low_range = derive_inputs(data)["range"]
+        range_ma = rolling_mean(high_low_range, fast_window)
+        signals["volatility_breakout"] = _vote(high_low_range > range_ma, range_ma)
         
         return {
             "technical_signals": signals
@@ -76,13 +113,13 @@ class AdvancedStrategyEngine:
         # Pair trading signals
         if "pair_asset" in data.columns:
             spread = data["$close"] - data["pair_asset"]
-            zscore = (spread - spread.rolling(20).mean()) / spread.rolling(20).std()
+            zscore = (spread - rolling_mean(spread, 20)) / rolling_std(spread, 20)
             signals["pair_trading_signal"] = -np.clip(zscore, -2, 2) / 2
         
         # Cointegration signals
         if len(data) > 60:
-            rolling_corr = data["$close"].rolling(60).corr(data["$volume"])
-            signals["cointegration_signal"] = np.where(rolling_corr > 0.7, 1, -1)
+            close_volume_corr = rolling_corr(data["$close"], data["$volume"], 60)
+            signals["cointegration_signal"] = _vote(close_volume_corr > 0.7, close_volume_corr)
         
         return {
             "stat_arb_signals": signals
@@ -92,15 +129,22 @@ class AdvancedStrategyEngine:
         """Generate machine learning based signals"""
         signals = {}
         
+        # Without a model there is nothing to predict, so no features are built or cached
+        if self.inference is None or self.ml_model_id is None:
+            return {
+                "ml_signals": signals
+            }
+        
         # Feature engineering
-        features = self._engineer_ml_features(data)
+        if self.feature_cache is not None:
+            features = self.feature_cache.get(self._engineer_ml_features, data, ["$close", "$volume"])
+        else:
+            features = self._engineer_ml_features(data)
         
         # Prediction signals
         try:
-            if hasattr(self, "ml_model"):
-                X = torch.FloatTensor(features.values)
-                predictions = self.ml_model(X).detach().numpy()
-                signals["ml_prediction"] = np.where(predictions > 0, 1, -1)
+            predictions = await self.inference.predict(self.ml_model_id, features.to_numpy(dtype=np.float32))
+            signals["ml_prediction"] = _vote(predictions > 0, predictions)
         except Exception:
             signals["ml_prediction"] = np.zeros(len(data))
         
@@ -113,12 +157,13 @@ class AdvancedStrategyEngine:
         signals = {}
         
         # Volume pressure
-        volume_ma = data["$volume"].rolling(20).mean()
-        signals["volume_pressure"] = np.where(data["$volume"] > volume_ma * 1.5, 1, -1)
+        volume_ma = rolling_mean(data["$volume"], 20)
+        signals["volume_pressure"] = _vote(data["$volume"] > volume_ma * 1.5, volume_ma)
         
         # Price impact
         price_impact = (data["$high"] - data["$low"]) / (data["$volume"] * data["$close"])
-        signals["price_impact"] = np.where(price_impact > price_impact.rolling(20).mean(), -1, 1)
+        impact_ma = rolling_mean(price_impact, 20)
+        signals["price_impact"] = -_vote(price_impact > impact_ma, impact_ma)
         
         return {
             "microstructure_signals": signals
@@ -129,15 +174,15 @@ class AdvancedStrategyEngine:
         features = pd.DataFrame()
         
         # Price features
-        features["returns"] = data["$close"].pct_change()
-        features["volatility"] = features["returns"].rolling(20).std()
+        features["returns"] = derive_inputs(data)["returns"]
+        features["volatility"] = rolling_std(features["returns"], 20)
         
         # Volume features
-        features["volume_ma_ratio"] = data["$volume"] / data["$volume"].rolling(20).mean()
+        features["volume_ma_ratio"] = data["$volume"] / rolling_mean(data["$volume"], 20)
         
         # Technical features
         for window in [5, 10, 20, 60]:
-            features[f"sma_{window}"] = data["$close"].rolling(window).mean() / data["$close"]
+            features[f"sma_{window}"] = rolling_mean(data["$close"], window) / data["$close"]
         
         return features.fillna(0)
     
@@ -148,7 +193,7 @@ class AdvancedStrategyEngine:
         """Execute trading strategy based on signals"""
         try:
             # Combine signals
-            combined_signal = self._combine_signals(signals)
+            combined_signal = self._combine_signals(signals, constraints.get("signal_weights"))
             
             # Position sizing
             position_sizes = self._calculate_position_sizes(
@@ -180,19 +225,33 @@ class AdvancedStrategyEngine:
                 "message": str(e)
             }
     
-    def _combine_signals(self, signals: Dict[str, Any]) -> np.ndarray:
-        """Combine multiple signals using weighted approach"""
-        weights = {
-            "technical": 0.3,
-            "stat_arb": 0.2,
-            "ml": 0.3,
-            "microstructure": 0.2
-        }
+    def combine_alpha_signals(self,
+                              signals: Dict[str, Any],
+                              names: List[str] = None,
+                              weights: Dict[str, float] = None) -> np.ndarray:
+        """One signal from a ``generate_alpha_signals`` payload
+
+        The signals of each group (only those in ``names`` when given) are
+        averaged, and the group averages are combined by ``_combine_signals``
+        with ``weights`` keyed by group (``technical``, ``stat_arb``, ...).
+        """
+        groups = {}
+        for group, group_signals in signals.items():
+            picked = {name: values for name, values in group_signals.items() if names is None or name in names}
+            if picked:
+                groups[group.removesuffix("_signals")] = strategy_signal({group: picked})
+        if not groups:
+            raise ValueError("No matching signals")
+        return self._combine_signals(groups, weights)
+
+    def _combine_signals(self, signals: Dict[str, Any], weights: Dict[str, float] = None) -> np.ndarray:
+        """Combine multiple signals using weighted approach; NaN (warm-up) values count as 0"""
+        weights = weights or SIGNAL_WEIGHTS
         
         combined = np.zeros(len(next(iter(signals.values()))))
         for signal_type, signal_values in signals.items():
             if signal_type in weights:
-                combined += weights[signal_type] * np.array(signal_values)
+                combined += weights[signal_type] * np.nan_to_num(np.asarray(signal_values, dtype=float))
         
         return np.clip(combined, -1, 1)
     
@@ -257,4 +316,3 @@ class AdvancedStrategyEngine:
                 })
         
         return orders
-```
@@ -0,0 +1,167 @@
+import asyncio
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Callable, Tuple
+import numpy as np
+import pandas as pd
+from .backtest import run_backtest, signals_to_weights
+from .feature_cache import bars_fingerprint
+from .strategy_engine import AdvancedStrategyEngine
+
+SWEEP_FIELDS = ["$close", "$high", "$low", "$volume"]
+META_FILE = "panel.json"
+RESULTS_FILE = "results.jsonl"
+
+# Panels already mapped by this worker process, by sweep directory
+_PANELS: Dict[str, Tuple[pd.DatetimeIndex, List[str], Dict[str, np.ndarray]]] = {}
+
+
+def parameter_grid(grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """Every combination of the listed parameter values"""
+    names = sorted(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def params_key(params: Dict[str, Any]) -> str:
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+def _write_panel(sweep_dir: str, panel: Dict[str, pd.DataFrame]) -> None:
+    close = panel["$close"]
+    for i, field in enumerate(SWEEP_FIELDS):
+        frame = panel[field].reindex(index=close.index, columns=close.columns)
+        np.save(os.path.join(sweep_dir, f"{i}.npy"), frame.to_numpy(dtype=float))
+    # Written last, so its presence marks a complete panel
+    with open(os.path.join(sweep_dir, META_FILE), "w") as f:
+        json.dump({"index": [str(t) for t in close.index], "columns": [str(c) for c in close.columns]}, f)
+
+
+def _load_panel(sweep_dir: str) -> Tuple[pd.DatetimeIndex, List[str], Dict[str, np.ndarray]]:
+    if sweep_dir not in _PANELS:
+        with open(os.path.join(sweep_dir, META_FILE)) as f:
+            meta = json.load(f)
+        arrays = {
+            field: np.load(os.path.join(sweep_dir, f"{i}.npy"), mmap_mode="r")
+            for i, field in enumerate(SWEEP_FIELDS)
+        }
+        _PANELS[sweep_dir] = (pd.DatetimeIndex(meta["index"]), meta["columns"], arrays)
+    return _PANELS[sweep_dir]
+
+
+def _instrument_signal(engine: AdvancedStrategyEngine, bars: pd.DataFrame, params: Dict[str, Any]) -> np.ndarray:
+    """Combined strategy signal for one instrument under one parameter set"""
+    signals = {
+        **engine._generate_technical_signals(bars, params),
+        **engine._generate_stat_arb_signals(bars),
+        **engine._generate_microstructure_signals(bars)
+    }
+    return engine.combine_alpha_signals(signals, weights=params.get("signal_weights"))
+
+
+def _run_sweep_task(sweep_dir: str,
+                    params: Dict[str, Any],
+                    backtest_config: Dict[str, Any],
+                    long_only: bool) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Backtest one parameter set against the memory-mapped panel"""
+    index, columns, arrays = _load_panel(sweep_dir)
+    engine = AdvancedStrategyEngine()
+    signals = np.empty((len(index), len(columns)))
+    for j in range(len(columns)):
+        bars = pd.DataFrame({field: arrays[field][:, j] for field in SWEEP_FIELDS}, index=index)
+        signals[:, j] = _instrument_signal(engine, bars, params)
+
+    close = pd.DataFrame(arrays["$close"], index=index, columns=columns)
+    weights = signals_to_weights(pd.DataFrame(signals, index=index, columns=columns), long_only=long_only)
+    result = run_backtest(close, weights, backtest_config)
+    return params, {**result["metrics"], "elapsed": result["elapsed"]}
+
+
+def _read_checkpoint(path: str) -> Dict[str, Dict[str, Any]]:
+    done = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A line cut short by a crash is simply run again
+                    continue
+                done[params_key(record["params"])] = record
+    return done
+
+
+async def sweep_backtests(panel: Dict[str, pd.DataFrame],
+                          grid: Dict[str, List[Any]],
+                          backtest_config: Dict[str, Any] = None,
+                          checkpoint_root: str = "~/.qlib/sweeps",
+                          max_workers: int = None,
+                          rank_by: str = "sharpe_ratio",
+                          long_only: bool = False,
+                          on_result: Callable[[Dict[str, Any]], None] = None) -> Dict[str, Any]:
+    """Backtest every parameter combination in ``grid`` on a process pool
+
+    ``panel`` maps each of ``SWEEP_FIELDS`` to a [time, instrument] frame.
+    It is written once to ``.npy`` files that workers memory-map, so each
+    task ships only its parameters. Grid keys are ``fast_window``,
+    ``slow_window``, ``zscore_clip`` and ``signal_weights``. Finished
+    results are appended to a JSON-lines checkpoint as they arrive (and
+    passed to ``on_result``); rerunning the same sweep on the same bars
+    skips them and only runs what is left.
+    """
+    backtest_config = backtest_config or {}
+    combinations = parameter_grid(grid)
+    sweep_id = hashlib.blake2b(
+        "|".join([
+            params_key(grid), params_key(backtest_config), str(long_only),
+            bars_fingerprint(panel["$close"])
+        ]).encode(),
+        digest_size=12
+    ).hexdigest()
+    sweep_dir = os.path.join(os.path.expanduser(checkpoint_root), sweep_id)
+    os.makedirs(sweep_dir, exist_ok=True)
+    if not os.path.exists(os.path.join(sweep_dir, META_FILE)):
+        _write_panel(sweep_dir, panel)
+
+    checkpoint = os.path.join(sweep_dir, RESULTS_FILE)
+    done = _read_checkpoint(checkpoint)
+    resumed = len(done)
+    remaining = [params for params in combinations if params_key(params) not in done]
+
+    if remaining:
+        loop = asyncio.get_running_loop()
+        pool = ProcessPoolExecutor(max_workers=min(max_workers or os.cpu_count() or 1, len(remaining)))
+        try:
+            tasks = [
+                loop.run_in_executor(pool, _run_sweep_task, sweep_dir, params, backtest_config, long_only)
+                for params in remaining
+            ]
+            with open(checkpoint, "a") as f:
+                for finished in asyncio.as_completed(tasks):
+                    params, metrics = await finished
+                    record = {"params": params, "metrics": metrics}
+                    f.write(json.dumps(record, default=str) + "\n")
+                    f.flush()
+                    done[params_key(params)] = record
+                    if on_result is not None:
+                        on_result(record)
+        finally:
+            # On cancellation or an on_result error, drop the queued parameter
+            # sets instead of waiting for the rest of the grid; finished ones
+            # are already checkpointed
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    table = pd.DataFrame([
+        {**done[params_key(params)]["params"], **done[params_key(params)]["metrics"]}
+        for params in combinations
+    ])
+    table = table.sort_values(rank_by, ascending=False).reset_index(drop=True)
+
+    return {
+        "sweep_id": sweep_id,
+        "results": table,
+        "completed": len(combinations),
+        "resumed": resumed
+    }
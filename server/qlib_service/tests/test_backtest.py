@@ -0,0 +1,111 @@
+"""run_backtest against hand-computed cases and a bar-by-bar reference loop
+
+Run from the repository root:
+
+    python -m pytest server/qlib_service/tests
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from server.qlib_service.backtest import BACKTEST_DEFAULTS, run_backtest
+
+FREE = {"open_cost": 0.0, "close_cost": 0.0, "min_cost": 0.0, "account": 1000.0}
+
+
+def _reference_nav(close: pd.DataFrame, weights: pd.DataFrame, config: dict) -> np.ndarray:
+    """Every bar and every instrument stepped through one at a time"""
+    config = {**BACKTEST_DEFAULTS, **config}
+    prices = close.to_numpy(dtype=float)
+    target = weights.shift(config["signal_lag"]).fillna(0.0).to_numpy(dtype=float)
+    n_bars, n_instruments = prices.shape
+    cash, shares = config["account"], np.zeros(n_instruments)
+    pending = np.zeros(n_instruments, dtype=bool)
+    last_price = np.zeros(n_instruments)
+    previous = np.full(n_instruments, np.nan)
+    nav = np.empty(n_bars)
+    for t in range(n_bars):
+        for j in range(n_instruments):
+            if np.isfinite(prices[t, j]):
+                last_price[j] = prices[t, j]
+        value = cash + last_price @ shares
+        blocked = np.zeros(n_instruments, dtype=bool)
+        for j in range(n_instruments):
+            price = last_price[j]
+            changed = t == 0 or target[t, j] != target[t - 1, j]
+            working = pending[j] or config["rebalance"] == "always" or changed
+            if not working:
+                continue
+            delta = target[t, j] * value / price - shares[j] if price > 0 else 0.0
+            if config["trade_unit"]:
+                delta = round(delta / config["trade_unit"]) * config["trade_unit"]
+            tradable = np.isfinite(prices[t, j]) and prices[t, j] > 0
+            change = prices[t, j] / previous[j] - 1 if np.isfinite(previous[j]) else np.nan
+            if delta > 0:
+                fillable = tradable and not change >= config["limit_threshold"]
+            else:
+                fillable = tradable and not change <= -config["limit_threshold"]
+            if not fillable:
+                blocked[j] = delta != 0 or (price <= 0 and target[t, j] != 0)
+                continue
+            if delta != 0:
+                traded = abs(delta) * price
+                fee = max((config["open_cost"] if delta > 0 else config["close_cost"]) * traded, config["min_cost"])
+                shares[j] += delta
+                cash -= delta * price + fee
+        pending = blocked
+        previous = np.where(np.isfinite(prices[t]), prices[t], np.nan)
+        nav[t] = cash + last_price @ shares
+    return nav
+
+
+def test_single_instrument_nav_by_hand():
+    close = pd.DataFrame({"AAA": [10.0, 10.5, 11.55]}, index=pd.bdate_range("2024-01-01", periods=3))
+    weights = pd.DataFrame({"AAA": [1.0, 1.0, 1.0]}, index=close.index)
+
+    # Bought at the close of bar 1 (one bar of signal lag), then up 10%
+    free = run_backtest(close, weights, FREE)
+    np.testing.assert_allclose(free["nav"], [1000.0, 1000.0, 1100.0])
+
+    # 10 bps on the 1000 bought
+    costly = run_backtest(close, weights, {**FREE, "open_cost": 0.001})
+    np.testing.assert_allclose(costly["nav"], [1000.0, 999.0, 1099.0])
+    assert costly["metrics"]["total_costs"] == pytest.approx(1.0)
+
+
+def test_limit_up_delays_the_buy():
+    close = pd.DataFrame({"AAA": [10.0, 11.0, 11.0]}, index=pd.bdate_range("2024-01-01", periods=3))
+    weights = pd.DataFrame({"AAA": [1.0, 1.0, 1.0]}, index=close.index)
+    result = run_backtest(close, weights, FREE)
+    # +10% on bar 1 is limit up, so the order fills on bar 2 instead
+    np.testing.assert_allclose(result["nav"], [1000.0, 1000.0, 1000.0])
+    assert result["metrics"]["blocked_orders"] == 1 and result["metrics"]["orders"] == 1
+
+
+@pytest.mark.parametrize("config", [
+    {},
+    {"rebalance": "always"},
+    {"trade_unit": 100, "signal_lag": 2},
+    {**FREE, "limit_threshold": 0.02}
+])
+def test_matches_bar_by_bar_reference(config):
+    rng = np.random.default_rng(0)
+    index = pd.bdate_range("2022-01-03", periods=300)
+    close = pd.DataFrame(
+        20 * np.exp(np.cumsum(rng.normal(0, 0.02, (300, 6)), axis=0)),
+        index=index, columns=[f"SYM{i}" for i in range(6)]
+    )
+    close.iloc[:40, 0] = np.nan  # listed late
+    close.iloc[rng.choice(300, 15, replace=False), 1] = np.nan  # suspended
+    # Signals that hold for weeks at a time, so most bars have no orders
+    signal = pd.DataFrame(rng.normal(size=(300, 6)), index=index, columns=close.columns)
+    signal = signal.where(np.repeat(np.arange(300)[:, None] % 15 == 0, 6, axis=1)).ffill()
+    weights = signal.div(signal.abs().sum(axis=1), axis=0)
+
+    result = run_backtest(close, weights, config)
+    np.testing.assert_allclose(result["nav"].to_numpy(), _reference_nav(close, weights, config), rtol=1e-10)
+
+
+def test_empty_panel_raises():
+    close = pd.DataFrame(columns=["AAA"], index=pd.DatetimeIndex([]), dtype=float)
+    with pytest.raises(ValueError, match="No bars"):
+        run_backtest(close, close)
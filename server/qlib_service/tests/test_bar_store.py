@@ -0,0 +1,163 @@
+"""Columnar bar store layout and the data manager's incremental fetches
+
+Run from the repository root:
+
+    python -m pytest server/qlib_service/tests
+"""
+import os
+import types
+import numpy as np
+import pandas as pd
+import pytest
+from server.qlib_service.bar_store import ColumnarBarStore, INSTRUMENT_PARTITION, contiguous_runs
+
+FIELDS = ["$close", "$volume"]
+
+
+def _bars(instruments, sessions, fields=FIELDS, intraday=True):
+    """Provider-shaped bars: 390 minutes per session, or one bar per session for daily"""
+    sessions = pd.DatetimeIndex(sessions)
+    if intraday:
+        offsets = pd.timedelta_range("09:30:00", periods=390, freq="1min")
+        stamps = pd.DatetimeIndex((sessions.values[:, None] + offsets.values).ravel())
+    else:
+        stamps = sessions
+    frames = []
+    for i, instrument in enumerate(instruments):
+        index = pd.MultiIndex.from_product([[instrument], stamps], names=["instrument", "datetime"])
+        values = {
+            field: (100 * i + j + np.arange(len(stamps)) / 1000).astype(np.float32)
+            for j, field in enumerate(fields)
+        }
+        frames.append(pd.DataFrame(values, index=index))
+    return pd.concat(frames)
+
+
+class FakeProvider:
+    """``D.features`` stand-in serving bars for every weekday, recording each call"""
+
+    def __init__(self, intraday=True):
+        self.intraday = intraday
+        self.calls = []
+
+    def features(self, instruments, fields, start_time, end_time, freq=None):
+        start, end = pd.Timestamp(start_time), pd.Timestamp(end_time)
+        self.calls.append((tuple(instruments), tuple(fields), start, end))
+        data = _bars(instruments, pd.bdate_range(start.normalize(), end.normalize()), list(fields), self.intraday)
+        datetimes = data.index.get_level_values(1)
+        return data[(datetimes >= start) & (datetimes <= end)]
+
+
+def test_intraday_write_read_round_trip(tmp_path):
+    store = ColumnarBarStore(str(tmp_path), freq="1min")
+    sessions = list(pd.bdate_range("2024-01-02", periods=3))
+    data = _bars(["AAA", "B/C"], sessions)
+    store.write(data, ["AAA", "B/C"], sessions, FIELDS)
+
+    pd.testing.assert_frame_equal(store.read(["AAA", "B/C"], sessions, FIELDS), data, check_index_type=False)
+    assert store.missing_sessions("AAA", sessions, FIELDS) == []
+    assert store.stored_fields("B/C") == set(FIELDS)
+
+
+def test_unpublished_sessions_are_not_marked_complete(tmp_path):
+    store = ColumnarBarStore(str(tmp_path), freq="1min")
+    sessions = list(pd.bdate_range("2024-01-02", periods=3))
+    store.write(_bars(["AAA"], sessions[:2]), ["AAA"], sessions, FIELDS)
+    assert store.missing_sessions("AAA", sessions, FIELDS) == [sessions[2]]
+
+
+def test_daily_merge_keeps_earlier_sessions(tmp_path):
+    store = ColumnarBarStore(str(tmp_path), freq="day")
+    january = list(pd.bdate_range("2024-01-01", "2024-01-31"))
+    february = list(pd.bdate_range("2024-02-01", "2024-02-29"))
+    store.write(_bars(["AAA"], january, intraday=False), ["AAA"], january, FIELDS)
+    store.write(_bars(["AAA"], february, intraday=False), ["AAA"], february, FIELDS)
+
+    # One partition per instrument, old generations removed
+    partitions = [name for name in os.listdir(os.path.join(store.root, "AAA")) if not name.startswith(".")]
+    assert len(partitions) == 1 and partitions[0].startswith(INSTRUMENT_PARTITION + "@")
+    assert store.missing_sessions("AAA", january + february, FIELDS) == []
+
+    both = store.read(["AAA"], january + february, FIELDS)
+    assert list(both.index.get_level_values(1)) == january + february
+    np.testing.assert_array_equal(
+        both.xs("AAA", level=0).loc[january[0]:january[-1]].to_numpy(),
+        _bars(["AAA"], january, intraday=False).to_numpy()
+    )
+    # Reads are sliced to the requested sessions even though the partition holds more
+    assert len(store.read(["AAA"], february[:5], FIELDS)) == 5
+
+
+def test_field_change_refetches_the_whole_partition(tmp_path):
+    store = ColumnarBarStore(str(tmp_path), freq="day")
+    sessions = list(pd.bdate_range("2024-01-01", "2024-01-31"))
+    store.write(_bars(["AAA"], sessions, ["$close"], intraday=False), ["AAA"], sessions, ["$close"])
+
+    assert store.missing_sessions("AAA", sessions[:3], ["$close"]) == []
+    # Every covered session comes back, not just the requested ones, so the
+    # rewritten partition has both fields throughout
+    assert store.missing_sessions("AAA", sessions[:3], FIELDS) == sessions
+
+
+def test_contiguous_runs_split_on_calendar_gaps():
+    calendar = list(pd.bdate_range("2024-01-01", periods=10))
+    missing = calendar[:2] + calendar[5:6] + calendar[8:]
+    assert contiguous_runs(missing, calendar) == [
+        (calendar[0], calendar[1]), (calendar[5], calendar[5]), (calendar[8], calendar[9])
+    ]
+
+
+@pytest.fixture
+def manager_factory(tmp_path, monkeypatch):
+    data_manager = pytest.importorskip("server.qlib_service.data_manager")
+
+    def make(freq):
+        provider = FakeProvider(intraday=freq not in data_manager.DAILY_FREQS)
+        monkeypatch.setattr(data_manager, "D", types.SimpleNamespace(features=provider.features))
+        # No exchange calendar: every weekday is a session
+        return data_manager.AdvancedDataManager(store_dir=str(tmp_path), freq=freq), provider
+
+    return make
+
+
+def test_partial_range_fetches_only_missing_sessions(manager_factory):
+    manager, provider = manager_factory("1min")
+    first = manager._load_bars(["AAA", "BBB"], "2024-01-02", "2024-01-05", ["$close"])
+    assert len(first) == 2 * 4 * 390
+
+    provider.calls.clear()
+    second = manager._load_bars(["AAA", "BBB"], "2024-01-02", "2024-01-10", ["$close"])
+    assert len(second) == 2 * 7 * 390
+    (instruments, fields, start, end), = provider.calls
+    assert instruments == ("AAA", "BBB") and fields == ("$close",)
+    assert start == pd.Timestamp("2024-01-08") and end.normalize() == pd.Timestamp("2024-01-10")
+
+    provider.calls.clear()
+    manager._load_bars(["AAA", "BBB"], "2024-01-03", "2024-01-09", ["$close"])
+    assert provider.calls == []
+
+
+def test_intraday_range_is_sliced_to_the_request(manager_factory):
+    manager, _ = manager_factory("1min")
+    data = manager._load_bars(["AAA"], "2024-01-02 10:00", "2024-01-03 12:00", ["$close"])
+    datetimes = data.index.get_level_values(1)
+    assert datetimes.min() == pd.Timestamp("2024-01-02 10:00")
+    assert datetimes.max() == pd.Timestamp("2024-01-03 12:00")
+
+
+def test_new_field_refetches_with_the_stored_fields(manager_factory):
+    manager, provider = manager_factory("day")
+    manager._load_bars(["AAA"], "2024-01-01", "2024-03-29", ["$close"])
+
+    provider.calls.clear()
+    data = manager._load_bars(["AAA"], "2024-02-01", "2024-02-29", ["$volume"])
+    (_, fields, start, end), = provider.calls
+    assert fields == ("$close", "$volume")
+    # The stored January-March partition is rewritten whole with both fields
+    assert start == pd.Timestamp("2024-01-01") and end.normalize() == pd.Timestamp("2024-03-29")
+    assert len(data) == len(pd.bdate_range("2024-02-01", "2024-02-29"))
+
+    provider.calls.clear()
+    both = manager._load_bars(["AAA"], "2024-01-01", "2024-03-29", ["$close", "$volume"])
+    assert provider.calls == []
+    assert not both.isna().any().any()
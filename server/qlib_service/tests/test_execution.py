@@ -0,0 +1,40 @@
+"""Child-order splitting and Almgren-Chriss schedules
+
+Run from the repository root:
+
+    python -m pytest server/qlib_service/tests
+"""
+import numpy as np
+import pytest
+from server.qlib_service.execution import almgren_chriss_schedule, split_quantity
+
+
+@pytest.mark.parametrize("quantity, weights", [
+    (199, [0.1, 0.85, 0.05]),
+    (199, [0.5, 0.5]),
+    (150, [0.05, 0.9, 0.05]),
+    (1000, [0.2, 0.3, 0.5]),
+    (7, [1.0, 1.0, 1.0])
+])
+@pytest.mark.parametrize("lot_size", [0, 1, 100])
+def test_split_quantity_never_overfills(quantity, weights, lot_size):
+    children = split_quantity(quantity, np.asarray(weights), lot_size)
+    assert children.sum() == pytest.approx(quantity)
+    assert (children >= 0).all()
+
+
+def test_split_quantity_odd_lot_parent():
+    np.testing.assert_array_equal(split_quantity(199, np.array([0.1, 0.85, 0.05]), 100), [0, 199, 0])
+
+
+def test_schedule_holdings_stay_within_the_order():
+    schedule = almgren_chriss_schedule(199, 10, 1.0, 1e-3, lot_size=100)
+    holdings = schedule["holdings"]
+    assert holdings[0] == 199 and holdings[-1] == 0
+    assert (np.diff(holdings) <= 0).all()
+    assert (schedule["trades"] >= 0).all()
+
+
+def test_schedule_rejects_non_finite_inputs():
+    with pytest.raises(ValueError):
+        almgren_chriss_schedule(100, 10, 1.0, np.nan)
@@ -0,0 +1,68 @@
+"""OHLCVCache fetch coalescing and cancellation
+
+Run from the repository root:
+
+    python -m pytest server/qlib_service/tests
+"""
+import asyncio
+from server.qlib_service.ohlcv_cache import OHLCVCache
+
+BAR_MS = 60_000
+
+
+def _fetch(latency: float = 0.05):
+    calls = []
+
+    async def fetch(symbol, timeframe, since):
+        calls.append((symbol, timeframe, since))
+        await asyncio.sleep(latency)
+        return [[i * BAR_MS, 1.0, 1.0, 1.0, 1.0, 10.0] for i in range(5)]
+
+    return fetch, calls
+
+
+def test_coalesced_requests_share_one_fetch():
+    async def run():
+        fetch, calls = _fetch()
+        cache = OHLCVCache(fetch)
+        frames = await asyncio.gather(*[cache.get("BTC/USDT", "1m") for _ in range(5)])
+        return frames, calls, cache
+
+    frames, calls, cache = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(len(frame) == 5 for frame in frames)
+    assert cache.stats["coalesced"] == 4
+
+
+def test_cancelled_owner_does_not_strand_waiters():
+    async def run():
+        fetch, calls = _fetch()
+        cache = OHLCVCache(fetch)
+        owner = asyncio.ensure_future(cache.get("BTC/USDT", "1m"))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.ensure_future(cache.get("BTC/USDT", "1m"))
+        await asyncio.sleep(0.01)
+        owner.cancel()
+        frame = await asyncio.wait_for(waiter, 1.0)
+        return owner, frame, calls, cache
+
+    owner, frame, calls, cache = asyncio.run(run())
+    assert owner.cancelled()
+    assert len(frame) == 5
+    assert len(calls) == 1
+    assert not cache.inflight
+
+
+def test_failed_fetch_reaches_every_waiter_and_clears():
+    async def run():
+        async def fetch(symbol, timeframe, since):
+            await asyncio.sleep(0.01)
+            raise ConnectionError("exchange down")
+
+        cache = OHLCVCache(fetch)
+        results = await asyncio.gather(*[cache.get("BTC/USDT", "1m") for _ in range(3)], return_exceptions=True)
+        return results, cache
+
+    results, cache = asyncio.run(run())
+    assert all(isinstance(result, ConnectionError) for result in results)
+    assert not cache.inflight
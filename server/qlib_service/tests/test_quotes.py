@@ -0,0 +1,66 @@
+"""QuoteBoard request coalescing, cancellation and watchlist pruning
+
+Run from the repository root:
+
+    python -m pytest server/qlib_service/tests
+"""
+import asyncio
+from server.qlib_service.quotes import QuoteBoard
+
+
+def _provider(latency: float = 0.05, known=None):
+    calls = []
+
+    async def provider(symbols):
+        calls.append(list(symbols))
+        await asyncio.sleep(latency)
+        return {
+            symbol: {"price": 100.0, "change": 0.0, "volume": 1000}
+            for symbol in symbols if known is None or symbol in known
+        }
+
+    return provider, calls
+
+
+def test_cancelled_request_does_not_strand_coalesced_waiters():
+    async def run():
+        provider, calls = _provider()
+        board = QuoteBoard(provider, symbols=(), refresh_interval=3600)
+        owner = asyncio.ensure_future(board.get(["AAPL"]))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.ensure_future(board.get(["AAPL"]))
+        await asyncio.sleep(0.01)
+        owner.cancel()
+        quotes = await asyncio.wait_for(waiter, 1.0)
+        return quotes, calls, board
+
+    quotes, calls, board = asyncio.run(run())
+    assert quotes["AAPL"]["price"] == 100.0
+    assert calls == [["AAPL"]]
+    assert board.inflight is None
+
+
+def test_unknown_symbols_are_dropped_once_nobody_asks_for_them():
+    async def run():
+        provider, _ = _provider(latency=0.0, known={"AAPL"})
+        board = QuoteBoard(provider, symbols=("AAPL",), refresh_interval=3600, unknown_ttl=0.0)
+        first = await board.get(["BOGUS"])
+        await board.refresh()
+        return first, board
+
+    first, board = asyncio.run(run())
+    assert first["BOGUS"] is None
+    assert board.symbols == {"AAPL"}
+
+
+def test_watchlist_is_capped_by_least_recent_request():
+    async def run():
+        provider, _ = _provider(latency=0.0)
+        board = QuoteBoard(provider, symbols=("AAPL",), refresh_interval=3600, max_symbols=3)
+        for symbol in ["A", "B", "C", "D"]:
+            await board.get([symbol])
+        await board.refresh()
+        return board
+
+    board = asyncio.run(run())
+    assert board.symbols == {"AAPL", "C", "D"}
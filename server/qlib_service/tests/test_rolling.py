@@ -0,0 +1,113 @@
+"""Batch and streaming rolling statistics against pandas.Series.rolling
+
+Run from the repository root:
+
+    python -m pytest server/qlib_service/tests
+"""
+import asyncio
+import numpy as np
+import pandas as pd
+import pytest
+from server.qlib_service.rolling import (
+    RollingFeatureEngine, rolling_sum, rolling_mean, rolling_std, rolling_min, rolling_max,
+    rolling_corr, pct_change
+)
+
+WINDOWS = [1, 2, 5, 20, 63, 100]
+
+
+def _series(seed: int = 0, length: int = 300, nans: bool = True) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    values = 100 + rng.normal(size=length).cumsum()
+    if nans:
+        values[rng.choice(length, 6, replace=False)] = np.nan
+    return pd.Series(values, index=pd.bdate_range("2020-01-01", periods=length))
+
+
+def _bars(length: int = 300) -> pd.DataFrame:
+    rng = np.random.default_rng(1)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, length)))
+    return pd.DataFrame({
+        "$close": close,
+        "$high": close * (1 + rng.uniform(0, 0.02, length)),
+        "$low": close * (1 - rng.uniform(0, 0.02, length)),
+        "$volume": rng.uniform(1e5, 1e6, length)
+    }, index=pd.bdate_range("2020-01-01", periods=length))
+
+
+@pytest.mark.parametrize("window", WINDOWS)
+@pytest.mark.parametrize("name, batch", [
+    ("sum", rolling_sum), ("mean", rolling_mean), ("std", rolling_std), ("min", rolling_min), ("max", rolling_max)
+])
+def test_batch_matches_pandas(name, batch, window):
+    series = _series()
+    expected = getattr(series.rolling(window), name)()
+    pd.testing.assert_series_equal(batch(series, window), expected, rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize("window", WINDOWS)
+def test_batch_panel_matches_pandas_per_column(window):
+    panel = pd.DataFrame({f"SYM{i}": _series(seed=i) for i in range(4)})
+    for batch, name in [(rolling_mean, "mean"), (rolling_std, "std"), (rolling_min, "min"), (rolling_max, "max")]:
+        pd.testing.assert_frame_equal(batch(panel, window), getattr(panel.rolling(window), name)(), rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize("window", [5, 20, 63])
+def test_rolling_corr_matches_pandas(window):
+    x, y = _series(seed=2), _series(seed=3)
+    pd.testing.assert_series_equal(rolling_corr(x, y, window), x.rolling(window).corr(y), rtol=1e-8, atol=1e-10)
+
+
+def test_short_history_is_all_nan():
+    series = _series(length=4, nans=False)
+    assert rolling_max(series, 5).isna().all()
+    assert rolling_mean(series, 5).isna().all()
+
+
+@pytest.mark.parametrize("periods", [1, 5, 21])
+def test_pct_change_matches_pandas(periods):
+    series = _series(nans=False)
+    pd.testing.assert_series_equal(pct_change(series, periods), series.pct_change(periods))
+
+
+@pytest.mark.parametrize("window", [2, 5, 20, 63])
+def test_streaming_engine_matches_pandas(window):
+    close, volume = _series(seed=4), _series(seed=5, nans=False)
+    engine = RollingFeatureEngine(max_window=63)
+    streamed = {name: [] for name in ["mean", "std", "min", "max", "corr"]}
+    for c, v in zip(close, volume):
+        engine.update({"$close": c, "$volume": v})
+        streamed["mean"].append(engine.mean("$close", window))
+        streamed["std"].append(engine.std("$close", window))
+        streamed["min"].append(engine.min("$close", window))
+        streamed["max"].append(engine.max("$close", window))
+        streamed["corr"].append(engine.corr("$close", "$volume", window))
+
+    rolling = close.rolling(window)
+    for name in ["mean", "std", "min", "max"]:
+        np.testing.assert_allclose(streamed[name], getattr(rolling, name)(), rtol=1e-7, atol=1e-9)
+    # pandas does not clip rounding error beyond +-1
+    np.testing.assert_allclose(streamed["corr"], rolling.corr(volume).clip(-1, 1), rtol=1e-7, atol=1e-9)
+
+
+def test_streaming_features_equal_last_batch_row():
+    data_manager = pytest.importorskip("server.qlib_service.data_manager")
+    manager = data_manager.AdvancedDataManager.__new__(data_manager.AdvancedDataManager)
+    manager.feature_engines = {}
+    bars = _bars()
+
+    batch = asyncio.run(manager.calculate_technical_features(bars))["features"]
+    for bar in bars.to_dict("records"):
+        streamed = asyncio.run(manager.update_features("SYM", bar))["features"]
+
+    def flatten(features, prefix=""):
+        for name, value in features.items():
+            if isinstance(value, dict):
+                yield from flatten(value, prefix + name + ".")
+            else:
+                yield prefix + name, value
+
+    last = {name: float(np.asarray(values)[-1]) for name, values in flatten(batch)}
+    assert last.keys() == dict(flatten(streamed)).keys()
+    for name, value in flatten(streamed):
+        assert value == pytest.approx(last[name], rel=1e-7), name